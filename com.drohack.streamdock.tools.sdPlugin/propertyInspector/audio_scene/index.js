@@ -0,0 +1,62 @@
+// Audio Scene PI: capture the current mix, edit it as JSON, try it out.
+
+const $local = false, $back = false,
+    $dom = {
+        main: $('.sdpi-wrapper'),
+        name: document.getElementById("scene_name"),
+        incApps: document.getElementById("inc_apps"),
+        incGame: document.getElementById("inc_game"),
+        incDiscord: document.getElementById("inc_discord"),
+        capture: document.getElementById("capture_btn"),
+        json: document.getElementById("scene_json"),
+        apply: document.getElementById("apply_btn"),
+        report: document.getElementById("scene_report"),
+    };
+
+function showScene(scene) {
+    // don't clobber the textarea while the user is editing it
+    if (document.activeElement !== $dom.json) {
+        $dom.json.value = JSON.stringify(scene || {}, null, 2);
+    }
+}
+
+const $propEvent = {
+    didReceiveSettings(data) {
+        // $settings (action.js) is a proxy: assigning a field saves the settings
+        if (document.activeElement !== $dom.name) $dom.name.value = $settings.name || "";
+        showScene($settings.scene);
+    },
+
+    sendToPropertyInspector(data) {
+        if (data.event === "sceneUpdate") {
+            showScene(data.scene);
+            if (data.report) $dom.report.textContent = data.report;
+        }
+    },
+
+    didReceiveGlobalSettings(data) { },
+};
+
+document.addEventListener("DOMContentLoaded", () => {
+    $dom.name.addEventListener("change", () => {
+        $settings.name = $dom.name.value.trim();
+    });
+    $dom.json.addEventListener("change", () => {
+        try {
+            $settings.scene = JSON.parse($dom.json.value || "{}");
+            $dom.json.style.borderColor = "";
+        } catch (e) {
+            $dom.json.style.borderColor = "#ed4245";
+        }
+    });
+    $dom.capture.addEventListener("click", () => {
+        const include = [];
+        if ($dom.incApps.checked) include.push("apps");
+        if ($dom.incGame.checked) include.push("game_volume");
+        if ($dom.incDiscord.checked) include.push("discord");
+        $websocket.sendToPlugin({ event: "captureScene", include });
+    });
+    $dom.apply.addEventListener("click", () => {
+        $websocket.sendToPlugin({ event: "applyScene" });
+    });
+});
@@ -1,9 +1,36 @@
 // Game Volume PI: pick which apps the knob must NOT control.
+// Besides running apps, custom rules can be added: globs ("*launcher*.exe")
+// and process trees ("tree:Steam.exe" = Steam and everything it starts).
 
 const $dom = {
     excludeList: document.getElementById("exclude_list"),
+    ruleInput: document.getElementById("exclude_rule"),
+    ruleAdd: document.getElementById("exclude_rule_add"),
 };
 
+function sendExclude() {
+    const exclude = Array.from($dom.excludeList.selectedOptions).map(o => o.value);
+    $websocket.sendToPlugin({ event: "setExclude", exclude });
+}
+
+function addRule() {
+    const rule = ($dom.ruleInput.value || "").trim();
+    if (!rule) return;
+    const existing = Array.from($dom.excludeList.options)
+        .find(o => o.value.toLowerCase() === rule.toLowerCase());
+    if (existing) {
+        existing.selected = true;
+    } else {
+        const opt = document.createElement("option");
+        opt.value = rule;
+        opt.textContent = rule.replace(".exe", "");
+        opt.selected = true;
+        $dom.excludeList.appendChild(opt);
+    }
+    $dom.ruleInput.value = "";
+    sendExclude();
+}
+
 function populate(appList, exclude) {
     if (!$dom.excludeList) return;
     const excludeLower = (exclude || []).map(e => e.toLowerCase());
@@ -38,8 +65,9 @@ const $propEvent = {
 };
 
 document.addEventListener("DOMContentLoaded", () => {
-    $dom.excludeList?.addEventListener("change", () => {
-        const exclude = Array.from($dom.excludeList.selectedOptions).map(o => o.value);
-        $websocket.sendToPlugin({ event: "setExclude", exclude });
+    $dom.excludeList?.addEventListener("change", sendExclude);
+    $dom.ruleAdd?.addEventListener("click", addRule);
+    $dom.ruleInput?.addEventListener("keydown", e => {
+        if (e.key === "Enter") addRule();
     });
 });
@@ -4,9 +4,18 @@
 const $dom = {
     gifModeRadios: document.querySelectorAll('input[name="gif_mode"]'),
     gifSelectContainer: document.getElementById('gif-select-container'),
-    gifSelect: document.getElementById('selected_gif')
+    gifSelect: document.getElementById('selected_gif'),
+    thumbsContainer: document.getElementById('gif-thumbs-container'),
+    thumbs: document.getElementById('gif_thumbs')
 };
 
+// Last sprite sheet from the plugin: { image, offsets: {file: [x, y]}, tile }
+let $thumbs = null;
+let $sheetUrl = null;              // object URL of $thumbs.image
+const $sheetStyle = document.head.appendChild(document.createElement("style"));
+const $thumbCells = new Map();     // gif file -> thumbnail cell
+let $selectedCell = null;
+
 // --- Property Inspector Event Handlers ---
 const $propEvent = {
     didReceiveSettings(data) {
@@ -25,6 +34,7 @@ const $propEvent = {
         // Restore selected static GIF
         if (settings.selected_gif && $dom.gifSelect) {
             $dom.gifSelect.value = settings.selected_gif;
+            highlightThumb();
         }
     },
 
@@ -45,6 +55,14 @@ const $propEvent = {
 			if (data.selected_gif && $dom.gifSelect) {
 				$dom.gifSelect.value = data.selected_gif;
 			}
+			if (data.thumbs) setSheet(data.thumbs);
+			renderThumbs();
+		}
+
+		// sheet finished building in the background after the list was sent
+		if (data.event === "updateGifThumbs" && data.thumbs) {
+			setSheet(data.thumbs);
+			renderThumbs();
 		}
 	},
 
@@ -56,6 +74,59 @@ const $propEvent = {
 // --- UI Logic ---
 function toggleGifSelect(mode) {
     $dom.gifSelectContainer.style.display = (mode === "static") ? "flex" : "none";
+    if ($dom.thumbsContainer) {
+        $dom.thumbsContainer.style.display = (mode === "static" && $thumbs) ? "flex" : "none";
+    }
+}
+
+// One shared sheet image, sliced per tile with background-position — no
+// per-GIF requests or decodes. The sheet is decoded once into a blob and
+// referenced from a single CSS rule; cells only carry their offset.
+function setSheet(thumbs) {
+    $thumbs = thumbs;
+    if ($sheetUrl) URL.revokeObjectURL($sheetUrl);
+    const [header, b64] = thumbs.image.split(",");
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    $sheetUrl = URL.createObjectURL(new Blob([bytes], { type: header.slice(5).split(";")[0] }));
+    const size = thumbs.tile;
+    $sheetStyle.textContent =
+        `.gif-thumb{width:${size}px;height:${size}px;cursor:pointer;` +
+        `background:url(${$sheetUrl}) no-repeat}` +
+        `.gif-thumb.selected{outline:2px solid #4a90e2}`;
+}
+
+function renderThumbs() {
+    if (!$dom.thumbs || !$dom.gifSelect) return;
+    $dom.thumbs.innerHTML = "";
+    $thumbCells.clear();
+    $selectedCell = null;
+    if (!$thumbs) return;
+    Array.from($dom.gifSelect.options).forEach(opt => {
+        const pos = $thumbs.offsets[opt.value];
+        if (!pos) return;
+        const cell = document.createElement("div");
+        cell.className = "gif-thumb";
+        cell.title = opt.textContent;
+        cell.style.backgroundPosition = `-${pos[0]}px -${pos[1]}px`;
+        cell.addEventListener("click", () => {
+            $dom.gifSelect.value = opt.value;
+            $dom.gifSelect.dispatchEvent(new Event("change"));
+        });
+        $thumbCells.set(opt.value, cell);
+        $dom.thumbs.appendChild(cell);
+    });
+    highlightThumb();
+    const checked = document.querySelector('input[name="gif_mode"]:checked');
+    toggleGifSelect(checked ? checked.value : "random");
+}
+
+// Move the outline to the selected GIF's cell; the grid itself stays put.
+function highlightThumb() {
+    const cell = $dom.gifSelect ? $thumbCells.get($dom.gifSelect.value) : null;
+    if (cell === $selectedCell) return;
+    if ($selectedCell) $selectedCell.classList.remove("selected");
+    if (cell) cell.classList.add("selected");
+    $selectedCell = cell || null;
 }
 
 function populateGifDropdown(gifFiles) {
@@ -94,6 +165,7 @@ document.addEventListener("DOMContentLoaded", () => {
             const selected = e.target.value;
             console.log("Saving selected_gif", selected);
             $websocket.saveData({ gif_mode: "static", selected_gif: selected });
+            highlightThumb();
         });
     }
 });
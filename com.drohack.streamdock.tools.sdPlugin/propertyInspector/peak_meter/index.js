@@ -0,0 +1,33 @@
+/**
+ * 基础参数说明:
+ *      @local 是否国际化
+ *      @back 自主决定回显时机
+ *      @dom 保存需要的文档元素
+ *      @propEvent 软件回调事件 - 策略模式
+ * ==================================================>
+ */
+const $local = false, $back = false,
+    $dom = {
+        main: $('.sdpi-wrapper'),
+        source: document.getElementById('source'),
+    },
+    $propEvent = {
+        didReceiveSettings(data) {
+            console.log("didReceiveSettings", data);
+            const source = data?.settings?.source;
+            if (source) $dom.source.value = source;
+        },
+        sendToPropertyInspector(data) {
+            console.log("sendToPropertyInspector", data);
+            if (data.event === "updateSource") {
+                $dom.source.value = data.source || "master";
+            }
+        },
+        didReceiveGlobalSettings(data) {
+            console.log("didReceiveGlobalSettings", data);
+        },
+    };
+
+$dom.source.addEventListener("change", e => {
+    $websocket.saveData({ source: e.target.value });
+});
@@ -6,21 +6,50 @@
  *      @propEvent 软件回调事件 - 策略模式
  * ==================================================>
  */
-const $local = true, $back = false,
+const $local = false, $back = false,
     $dom = {
         main: $('.sdpi-wrapper'),
+        device: document.getElementById('device'),
     },
     $propEvent = {
         didReceiveSettings(data) {
-            console.log("didReceiveSettings",data);
-            $settings.test = 121;
-            $websocket.sendToPlugin({ PropertyInspector: 121});
-            $websocket.setGlobalSettings({ PropertyInspector: 165415 });
+            console.log("didReceiveSettings", data);
+            const device = data?.settings?.device;
+            if (device) selectDevice(device);
         },
-        sendToPropertyInspector(data) { 
-            console.log("sendToPropertyInspector",data);
+        sendToPropertyInspector(data) {
+            console.log("sendToPropertyInspector", data);
+            if (data.event === "updateDevices") {
+                populateDevices(data.devices || []);
+                selectDevice(data.device || "default");
+            }
         },
         didReceiveGlobalSettings(data) {
-            console.log("didReceiveGlobalSettings",data);
+            console.log("didReceiveGlobalSettings", data);
         },
-    };
\ No newline at end of file
+    };
+
+function populateDevices(devices) {
+    $dom.device.innerHTML = "";
+    devices.forEach(d => {
+        const opt = document.createElement("option");
+        opt.value = d.value;
+        opt.textContent = d.label;
+        $dom.device.appendChild(opt);
+    });
+}
+
+function selectDevice(device) {
+    // a saved device that is unplugged right now still shows as selected
+    if (!Array.from($dom.device.options).some(o => o.value === device)) {
+        const opt = document.createElement("option");
+        opt.value = device;
+        opt.textContent = "(disconnected device)";
+        $dom.device.appendChild(opt);
+    }
+    $dom.device.value = device;
+}
+
+$dom.device.addEventListener("change", e => {
+    $websocket.saveData({ device: e.target.value });
+});
@@ -9,7 +9,7 @@ a = Analysis(
         ('src/actions', 'src/actions'),
         ('src/core', 'src/core')
     ],
-    hiddenimports=['websocket-client','PIL', 'PIL.Image', 'PIL.ImageDraw', 'PIL.ImageFont', 'PIL.ImageEnhance', 'requests', 'pycaw', 'pycaw.pycaw', 'comtypes', 'uuid', 'actions.volume', 'actions.gif', 'actions.game_volume', 'actions.discord_voice', 'actions.discord_mute', 'win32api', 'win32con', 'win32gui', 'win32process', 'win32file', 'win32pipe', 'pywintypes'],
+    hiddenimports=['websocket-client','PIL', 'PIL.Image', 'PIL.ImageDraw', 'PIL.ImageFont', 'PIL.ImageEnhance', 'requests', 'pycaw', 'pycaw.pycaw', 'pycaw.callbacks', 'comtypes', 'concurrent.futures', 'uuid', 'actions.volume', 'actions.gif', 'actions.game_volume', 'actions.discord_voice', 'actions.discord_mute', 'actions.peak_meter', 'actions.audio_scene', 'win32api', 'win32con', 'win32gui', 'win32process', 'win32file', 'win32pipe', 'win32event', 'pywintypes'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
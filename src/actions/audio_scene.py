@@ -0,0 +1,127 @@
+"""Audio Scene: one press applies a saved mix — per-app levels and mutes,
+the Game Volume level and Discord's output volume / deafen / mute — as one
+transaction (see core/audio_scene.py).
+
+settings:
+    {"name": "Raid", "scene": {"apps": {...}, "game_volume": {...}, "discord": {...}}}
+
+The property inspector captures the current mix into the scene (or takes it
+as JSON) and shows how long the last apply took.
+"""
+
+from src.core.action import Action
+from src.core.logger import Logger
+from src.core.audio_scene import apply_scene, capture, normalize
+from src.core.discord_rpc import get_discord_rpc
+
+
+class AudioScene(Action):
+    def __init__(self, action: str, context: str, settings: dict, plugin):
+        super().__init__(action, context, settings, plugin)
+        self._pi_visible = False
+        self._last_report = None
+        self.rpc = None
+        self.scene = {}
+        self._load(settings)
+        if plugin.global_settings is None:
+            try:
+                plugin.get_global_settings()  # persisted Game Volume level/exclude
+            except Exception as e:
+                Logger.error(f"[AudioScene] get_global_settings failed: {e}")
+        Logger.info(f"[AudioScene] Initialized with context {context}")
+
+    def _load(self, settings):
+        try:
+            self.scene = normalize((settings or {}).get("scene"))
+        except (AttributeError, TypeError, ValueError) as e:
+            Logger.warning(f"[AudioScene] Ignoring malformed scene: {e}")
+            self.scene = {}
+        self.set_title((settings or {}).get("name") or "Scene")
+        self._hold_discord("discord" in self.scene)
+
+    def _hold_discord(self, needed):
+        """Keep the Discord connection up while a scene on screen needs it, so
+        a press doesn't wait for a connect."""
+        if needed and self.rpc is None:
+            self.rpc = get_discord_rpc(self.plugin)
+            self.rpc.acquire(self._on_rpc_status, fields=())
+        elif not needed and self.rpc is not None:
+            self.rpc.release(self._on_rpc_status)
+            self.rpc = None
+
+    def _on_rpc_status(self, status: dict):
+        pass  # connection held for the scene; nothing to draw
+
+    # -------------------------------------------------------------- events
+
+    def on_key_down(self, payload: dict):
+        self.apply()
+
+    def on_dial_down(self, payload: dict):
+        self.apply()
+
+    def apply(self):
+        if not self.scene:
+            self.show_alert()
+            return
+        try:
+            report = apply_scene(self.scene, self.plugin, self.rpc)
+        except Exception as e:
+            Logger.error(f"[AudioScene] apply failed: {e}")
+            self.show_alert()
+            return
+        self._last_report = report
+        Logger.info(f"[AudioScene] Applied {self.settings.get('name') or 'scene'}: {report.summary()}")
+        self.show_ok()
+        if self._pi_visible:
+            self._push_scene()
+
+    # ------------------------------------------------- PI / settings plumbing
+
+    def _push_scene(self):
+        self.send_to_property_inspector({
+            "event": "sceneUpdate",
+            "scene": self.scene,
+            "report": self._last_report.summary() if self._last_report else "",
+        })
+
+    def on_did_receive_settings(self, settings: dict):
+        self.settings = settings
+        self._load(settings)
+
+    def on_send_to_plugin(self, payload: dict):
+        event = payload.get("event")
+        if event == "captureScene":
+            include = payload.get("include") or ("apps", "game_volume", "discord")
+            try:
+                scene = capture(self.plugin, include, get_discord_rpc(self.plugin))
+            except Exception as e:
+                Logger.error(f"[AudioScene] capture failed: {e}")
+                self.show_alert()
+                return
+            self.set_settings(dict(self.settings or {}, scene=scene))
+            self._load(self.settings)
+            self._push_scene()
+        elif event == "applyScene":
+            self.apply()
+
+    def on_did_receive_global_settings(self, settings):
+        # the Discord keys forward credentials too; a scene may be the only
+        # Discord user on screen
+        if self.rpc is not None:
+            self.rpc.update_credentials((settings or {}).get("discord") or {})
+
+    def on_application_did_launch(self, data: dict):
+        if self.rpc is not None:
+            self.rpc.note_app_launched((data.get("payload") or {}).get("application"))
+
+    def on_property_inspector_did_appear(self, data: dict):
+        self._pi_visible = True
+        self._push_scene()
+
+    def on_property_inspector_did_disappear(self, data: dict):
+        self._pi_visible = False
+
+    def on_will_disappear(self):
+        self._hold_discord(False)
+        Logger.info(f"[AudioScene] Will disappear for context {self.context}")
@@ -13,12 +13,15 @@ from src.core import discord_faces
 
 
 class DiscordMute(Action):
+    # what the face and the PI show (input volume isn't one of them)
+    RPC_FIELDS = ("state", "detail", "user", "has_creds", "output_volume", "deaf", "mute")
+
     def __init__(self, action: str, context: str, settings: dict, plugin):
         super().__init__(action, context, settings, plugin)
         self._pi_visible = False
         self._last_face = None
         self.rpc = get_discord_rpc(plugin)
-        self.rpc.acquire(self._on_rpc_status)
+        self.rpc.acquire(self._on_rpc_status, self.RPC_FIELDS)
         self._render(self.rpc.status())
         Logger.info(f"[DiscordMute] Initialized with context {context}")
 
@@ -99,6 +102,9 @@ class DiscordMute(Action):
     def on_did_receive_global_settings(self, settings):
         self.rpc.update_credentials((settings or {}).get("discord") or {})
 
+    def on_application_did_launch(self, data: dict):
+        self.rpc.note_app_launched((data.get("payload") or {}).get("application"))
+
     def on_will_disappear(self):
         self.rpc.release(self._on_rpc_status)
         Logger.info(f"[DiscordMute] Will disappear for context {self.context}")
@@ -19,6 +19,11 @@ class DiscordVoice(Action):
     MAX_VOLUME = 200.0
     NORMAL_MAX = 100.0
     HOLD_S = 1.0  # pause at 100 when turning up before entering the boost range
+    # ticks still arrive coalesced, but unscaled: the detent at 100 relies on
+    # the step size (no DIAL_ACCELERATION, see dial_input.py)
+
+    # what the face and the PI show (input volume isn't one of them)
+    RPC_FIELDS = ("state", "detail", "user", "has_creds", "output_volume", "deaf", "mute")
 
     def __init__(self, action: str, context: str, settings: dict, plugin):
         super().__init__(action, context, settings, plugin)
@@ -26,7 +31,7 @@ class DiscordVoice(Action):
         self._last_face = None
         self._hold_until = 0.0
         self.rpc = get_discord_rpc(plugin)
-        self.rpc.acquire(self._on_rpc_status)
+        self.rpc.acquire(self._on_rpc_status, self.RPC_FIELDS)
         self._render(self.rpc.status())
         Logger.info(f"[DiscordVoice] Initialized with context {context}")
 
@@ -134,6 +139,9 @@ class DiscordVoice(Action):
     def on_did_receive_global_settings(self, settings):
         self.rpc.update_credentials((settings or {}).get("discord") or {})
 
+    def on_application_did_launch(self, data: dict):
+        self.rpc.note_app_launched((data.get("payload") or {}).get("application"))
+
     def on_will_disappear(self):
         self.rpc.release(self._on_rpc_status)
         Logger.info(f"[DiscordVoice] Will disappear for context {self.context}")
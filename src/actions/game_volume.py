@@ -8,199 +8,27 @@ session follows game volume like any other app (see VOICE_SPLIT_APPS in
 audio_sessions.py). If the process layout can't be identified, all Discord
 sessions stay excluded (voice-safe fallback).
 
-All Game Volume keys (knob, buttons) share ONE level via a module-level
-controller — otherwise multiple instances would each store and re-assert their
-own level every tick and fight each other. The controller owns a single
-enforcement loop; absolute mode means newly launched apps conform within a
-blink. Windows master volume is never touched. Level persists in the plugin's
-global settings so it survives restarts and is identical on every key.
+Every key renders and drives the one shared controller in
+core/game_volume.py (level, mute, exclude list, enforcement loop).
 """
 
 import base64
 import io
-import os
-import threading
 
 from PIL import Image, ImageDraw
-from comtypes import CoInitialize, CoUninitialize
 
 from src.core.action import Action
 from src.core.logger import Logger
-from src.core.audio_sessions import sessions_excluding, get_all_sessions, is_audio_service
-
-DEFAULT_EXCLUDE = ["Discord.exe"]
-
-
-class _GameVolumeController:
-    """Process-wide shared game-volume state + enforcement (singleton)."""
-
-    STEP = 5
-
-    def __init__(self):
-        self.level = 50
-        self.muted = False
-        self.exclude = list(DEFAULT_EXCLUDE)
-        self._listeners = []          # render callbacks: cb(level, muted)
-        self._lock = threading.RLock()
-        self._plugin = None
-        self._timer_on = False
-        self._loaded = False
-        self._dirty = False
-
-    # ------------------------------------------------------- lifecycle
-
-    def attach(self, action):
-        with self._lock:
-            self._plugin = action.plugin
-            if action.render not in self._listeners:
-                self._listeners.append(action.render)
-            first_load = not self._loaded
-            self._loaded = True
-            if not self._timer_on:
-                self._timer_on = True
-                action.plugin.timer.set_interval("game_volume_enforce", 200, self._tick)
-        if first_load:
-            try:
-                action.plugin.get_global_settings()  # load persisted level
-            except Exception as e:
-                Logger.error(f"[GameVolume] get_global_settings failed: {e}")
-
-    def detach(self, action):
-        with self._lock:
-            if action.render in self._listeners:
-                self._listeners.remove(action.render)
-            if not self._listeners and self._timer_on and self._plugin:
-                self._plugin.timer.clear_interval("game_volume_enforce")
-                self._timer_on = False
-
-    # ------------------------------------------------------------ input
-
-    def set_level_delta(self, ticks):
-        with self._lock:
-            self.level = max(0, min(100, self.level + ticks * self.STEP))
-            self._dirty = True
-        self.apply()
-        self._notify()
-
-    def toggle_mute(self):
-        with self._lock:
-            self.muted = not self.muted
-            self._dirty = True
-        self.apply()
-        self._notify()
-
-    def set_exclude(self, exclude):
-        with self._lock:
-            self.exclude = exclude or list(DEFAULT_EXCLUDE)
-            self._dirty = True
-        self.apply(force=True)
-        self._notify()
-
-    def load(self, settings):
-        gv = (settings or {}).get("game_volume") or {}
-        if not gv:
-            return
-        with self._lock:
-            new = (int(gv.get("level", self.level)),
-                   bool(gv.get("muted", self.muted)),
-                   gv.get("exclude") or self.exclude)
-            if new == (self.level, self.muted, self.exclude):
-                return  # our own persist echoing back — no-op
-            self.level, self.muted, self.exclude = new
-        self.apply(force=True)
-        self._notify()
-
-    def snapshot(self):
-        with self._lock:
-            return self.level, self.muted, list(self.exclude)
-
-    # ------------------------------------------------------- enforcement
-
-    def _tick(self):
-        self.apply()
-        self._notify()
-        if self._dirty:
-            self._persist()
-
-    def apply(self, force=False):
-        """Set every non-excluded session to the shared level/mute. Retries
-        once with fresh enumeration so a stale session doesn't drop a change."""
-        with self._lock:
-            level, muted, exclude = self.level, self.muted, list(self.exclude)
-        for attempt in range(2):
-            try:
-                sessions = sessions_excluding(exclude, force=force or attempt > 0)
-                if force:
-                    names = []
-                    for s in sessions:
-                        try:
-                            if s.Process:
-                                name = os.path.basename(s.Process.name())
-                                if is_audio_service(s):
-                                    name += "(media)"
-                                names.append(name)
-                            else:
-                                names.append("system")
-                        except Exception:
-                            names.append("?")
-                    Logger.info(f"[GameVolume] applying level={level} muted={muted} to {len(sessions)} sessions: {names}")
-                for s in sessions:
-                    try:
-                        vol = s.SimpleAudioVolume
-                        if abs(vol.GetMasterVolume() - level / 100.0) > 0.004:
-                            vol.SetMasterVolume(level / 100.0, None)
-                        if bool(vol.GetMute()) != muted:
-                            vol.SetMute(1 if muted else 0, None)
-                    except Exception:
-                        continue  # session vanished mid-iteration
-                return
-            except Exception as e:
-                if attempt == 0:
-                    Logger.warning(f"[GameVolume] apply retrying after: {e}")
-                else:
-                    Logger.error(f"[GameVolume] Exception in apply: {e}")
-
-    def _persist(self):
-        with self._lock:
-            gv = {"level": self.level, "muted": self.muted, "exclude": list(self.exclude)}
-            self._dirty = False
-            plugin = self._plugin
-        if not plugin:
-            return
-        try:
-            merged = dict(plugin.global_settings or {})
-            merged["game_volume"] = gv
-            plugin.set_global_settings(merged)  # merge — must not clobber discord key
-        except Exception as e:
-            Logger.error(f"[GameVolume] failed to persist: {e}")
-
-    def _notify(self):
-        with self._lock:
-            listeners = list(self._listeners)
-            level, muted = self.level, self.muted
-        for cb in listeners:
-            try:
-                cb(level, muted)
-            except Exception as e:
-                Logger.error(f"[GameVolume] listener error: {e}")
-
-
-_controller = None
-_controller_lock = threading.Lock()
-
-
-def get_controller():
-    global _controller
-    with _controller_lock:
-        if _controller is None:
-            _controller = _GameVolumeController()
-        return _controller
+from src.core.audio_sessions import DEFAULT_EXCLUDE
+from src.core.game_volume import get_controller
 
 
 class GameVolume(Action):
+    # dial ticks arrive coalesced; fast spins get bigger steps (dial_input.py)
+    DIAL_ACCELERATION = True
+
     def __init__(self, action: str, context: str, settings: dict, plugin):
         super().__init__(action, context, settings, plugin)
-        CoInitialize()
         self._last_state = None
         self.controller = get_controller()
         self.controller.attach(self)
@@ -208,12 +36,6 @@ class GameVolume(Action):
         self.render(level, muted)
         Logger.info(f"[GameVolume] Initialized with context {context}")
 
-    def __del__(self):
-        try:
-            CoUninitialize()
-        except Exception:
-            pass
-
     # ------------------------------------------------------------- display
 
     def generate_volume_image(self, volume_percent, is_muted=False):
@@ -266,16 +88,12 @@ class GameVolume(Action):
 
     def on_property_inspector_did_appear(self, data: dict):
         # seed the PI with running apps so the exclude list is pickable
-        apps, seen = [], set()
-        for s in get_all_sessions(force=True):
-            try:
-                if s.Process:
-                    name = os.path.basename(s.Process.name())
-                    if name.lower() not in seen:
-                        apps.append({"value": name, "label": name.replace(".exe", "")})
-                        seen.add(name.lower())
-            except Exception:
-                continue
+        try:
+            names = self.controller.running_apps()
+        except Exception as e:
+            Logger.warning(f"[GameVolume] app list unavailable: {e}")
+            names = []
+        apps = [{"value": n, "label": n.replace(".exe", "")} for n in names]
         level, muted, exclude = self.controller.snapshot()
         self.send_to_property_inspector({
             "event": "updateGameVolume",
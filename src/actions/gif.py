@@ -7,6 +7,8 @@ import sys
 from PIL import Image, ImageSequence
 from src.core.action import Action
 from src.core.logger import Logger
+from src.core.timer import ANIMATION
+from src.core.gif_thumbs import get_thumbnail_sheet
 
 class Gif(Action):
     def get_static_path(self, subdir=""):
@@ -46,6 +48,10 @@ class Gif(Action):
         self.frame_delay = 100  # ms per frame (default, will try to read from gif metadata)
         self.switch_interval = 30000  # ms before switching to a new gif
 
+        # warm the PI's thumbnail sheet in the background so the picker opens instantly
+        self.thumbs = get_thumbnail_sheet(self.gif_folder)
+        self.thumbs.request()
+
         if self.gif_mode == "static":
             if self.selected_gif:
                 self.load_static_gif(self.selected_gif)
@@ -61,14 +67,16 @@ class Gif(Action):
             self.plugin.timer.set_interval(
                 f'gif_frame_{context}',
                 self.frame_delay,
-                self.next_frame
+                self.next_frame,
+                kind=ANIMATION
             )
 
             # Timer to switch gifs
             self.plugin.timer.set_interval(
                 f'gif_switch_{context}',
                 self.switch_interval,
-                self.load_next_gif
+                self.load_next_gif,
+                kind=ANIMATION
             )
 
         Logger.info(f"[GifAction] Initialized with context {context}")
@@ -118,7 +126,8 @@ class Gif(Action):
             self.plugin.timer.set_interval(
                 f'gif_frame_{self.context}',
                 self.frame_delay,
-                self.next_frame
+                self.next_frame,
+                kind=ANIMATION
             )
 
         except Exception as e:
@@ -157,7 +166,8 @@ class Gif(Action):
             self.plugin.timer.set_interval(  
                 f'gif_frame_{self.context}',  
                 self.frame_delay,  
-                self.next_frame  
+                self.next_frame,  
+                kind=ANIMATION  
             )  
             
         except Exception as e:  
@@ -188,7 +198,8 @@ class Gif(Action):
         self.plugin.timer.set_interval(
             f'gif_switch_{self.context}',
             self.switch_interval,
-            self.load_next_gif
+            self.load_next_gif,
+            kind=ANIMATION
         )
     
     def on_did_receive_settings(self, payload: dict):
@@ -218,7 +229,8 @@ class Gif(Action):
                 self.plugin.timer.set_interval(
                     f'gif_switch_{self.context}',
                     self.switch_interval,
-                    self.load_next_gif
+                    self.load_next_gif,
+                    kind=ANIMATION
                 )
         except Exception as e:
             Logger.error(f"[GifAction] Exception in on_did_receive_settings: {e}")
@@ -229,15 +241,27 @@ class Gif(Action):
             files = [f for f in os.listdir(self.gif_folder) if f.lower().endswith(".gif")]  
             gif_options = [{"value": f, "label": os.path.splitext(f)[0]} for f in files]  
             
+            # one cached sprite sheet for every preview; if the library changed
+            # it's rebuilt incrementally and pushed as soon as it's ready
+            sheet = self.thumbs.current()
             self.send_to_property_inspector({
                 "event": "updateGifList",
                 "gif_files": gif_options,
                 "gif_mode": self.gif_mode,
-                "selected_gif": self.selected_gif
+                "selected_gif": self.selected_gif,
+                "thumbs": sheet
             })
+            if sheet is None:
+                self.thumbs.request(self.send_thumbnail_sheet)
         except Exception as e:  
             Logger.error(f"[GifAction] Failed to send GIF list: {e}")  
 
+    def send_thumbnail_sheet(self, sheet: dict):
+        self.send_to_property_inspector({
+            "event": "updateGifThumbs",
+            "thumbs": sheet
+        })
+
     def on_dial_down(self, payload: dict):
         Logger.info(f"[GifAction] Dial down event with payload: {payload}")
 
@@ -245,9 +269,10 @@ class Gif(Action):
         Logger.info(f"[GifAction] Dial rotate event with payload: {payload}")
 
     def on_will_disappear(self):
-        # Clear the timer when action disappears
-        self.plugin.timer.clear_interval(f'time_update_{self.context}')
-        Logger.info(f"[TimeAction] Will disappear for context {self.context}")
+        # Clear the timers when action disappears
+        self.plugin.timer.clear_interval(f'gif_frame_{self.context}')
+        self.plugin.timer.clear_interval(f'gif_switch_{self.context}')
+        Logger.info(f"[GifAction] Will disappear for context {self.context}")
 
     # Extra events to skip
     def on_did_receive_global_settings(self, settings: dict):
@@ -0,0 +1,92 @@
+"""Peak Meter: live output level as an animated VU bar on a key or knob screen.
+
+settings["source"] picks what is metered:
+    "master" — the default output device (everything Windows plays)
+    "game"   — the loudest session in the set Game Volume controls, i.e.
+               every app except the Game Volume exclude list
+
+Key press / dial press flips between the two. All keys share one MeterReader
+(audio_meters.py): one batched COM read per frame for every key, and bars
+come from a pre-rendered sprite table, so several keys at ~30 fps stay cheap.
+"""
+
+from src.core.action import Action
+from src.core.logger import Logger
+from src.core.audio_meters import MASTER, GAME, get_meter_reader, get_sprite_table
+from src.core.game_volume import get_controller
+
+TITLES = {MASTER: "Master", GAME: "Game"}
+
+
+class PeakMeter(Action):
+    def __init__(self, action: str, context: str, settings: dict, plugin):
+        super().__init__(action, context, settings, plugin)
+        self._last_frame = None
+        self.sprites = get_sprite_table()
+        self.source = self._source_from(settings)
+        self.reader = get_meter_reader()
+        self.reader.set_game_exclude(self.game_exclude)
+        self.controller = get_controller()
+        self.controller.bind(plugin)
+        if plugin.global_settings is None:
+            try:
+                plugin.get_global_settings()  # Game Volume's exclude list
+            except Exception as e:
+                Logger.error(f"[PeakMeter] get_global_settings failed: {e}")
+        self.set_title(TITLES[self.source])
+        self.reader.attach(self, self.source)
+        Logger.info(f"[PeakMeter] Initialized with context {context} on {self.source!r}")
+
+    @staticmethod
+    def _source_from(settings):
+        source = (settings or {}).get("source")
+        return source if source in TITLES else MASTER
+
+    def game_exclude(self):
+        """Game Volume's exclude list, as its controller holds it."""
+        return self.controller.snapshot()[2]
+
+    def set_source(self, source):
+        if source == self.source:
+            return
+        self.reader.detach(self)
+        self.source = source
+        self._last_frame = None
+        self.set_title(TITLES[source])
+        self.reader.attach(self, source)
+
+    def render(self, level, hold):
+        """Reader listener — lit segments and hold-marker segment."""
+        frame = (level, hold)
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
+        self.set_image(self.sprites.frame(level, hold))
+
+    def toggle_source(self):
+        source = GAME if self.source == MASTER else MASTER
+        self.set_settings(dict(self.settings or {}, source=source))
+        self.set_source(source)
+
+    # -------------------------------------------------------------- events
+
+    def on_key_down(self, payload: dict):
+        self.toggle_source()
+
+    def on_dial_down(self, payload: dict):
+        self.toggle_source()
+
+    def on_did_receive_settings(self, settings: dict):
+        self.settings = settings
+        self.set_source(self._source_from(settings))
+
+    def on_did_receive_global_settings(self, settings):
+        # loads the exclude list once when no Game Volume key is on screen
+        self.controller.bind(self.plugin)
+
+    def on_property_inspector_did_appear(self, data: dict):
+        self.send_to_property_inspector({"event": "updateSource", "source": self.source})
+
+    def on_will_disappear(self):
+        self.reader.detach(self)
+        Logger.info(f"[PeakMeter] Will disappear for context {self.context}")
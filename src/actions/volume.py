@@ -1,41 +1,40 @@
 import base64
 import io
-import time
 from PIL import Image, ImageDraw
 from src.core.action import Action
 from src.core.logger import Logger
-
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from comtypes import CoInitialize, CoUninitialize, CLSCTX_ALL
+from src.core.master_volume import get_master_volume
+from src.core.audio_devices import (
+    DEFAULT_OUTPUT, DEFAULT_INPUT, RENDER, CAPTURE, get_device_registry,
+)
 
 
 class Volume(Action):
-    # Re-activating the endpoint on every call is expensive and can fail
-    # transiently under fast dial rotation; cache it briefly instead.
-    INTERFACE_TTL = 1.0  # seconds before re-activating (tracks device switches)
+    # dial ticks arrive coalesced; fast spins get bigger steps (dial_input.py)
+    DIAL_ACCELERATION = True
 
     def __init__(self, action: str, context: str, settings: dict, plugin):
         super().__init__(action, context, settings, plugin)
 
-        # Initialize COM once for this instance
-        CoInitialize()
-        self.volume = None
-        self._iface_ts = 0.0
-        self.volume = self.get_volume_interface(force=True)
-
-        self.update_volume_display()  # Initial display update
-        self.plugin.timer.set_interval(
-            f'volume_update_{context}',
-            200,
-            self.update_volume_display
-        )
-        Logger.info(f"[VolumeAction] Initialized with context {context}")
-
-    def __del__(self):
-        try:
-            CoUninitialize()
-        except:
-            pass
+        # one shared monitor per device holds the endpoint, subscribes to its
+        # change notifications and pushes level/mute to every Volume key on
+        # it; settings["device"] picks the default output (default), the
+        # default microphone, or a specific device id
+        self._last_state = None
+        self.device = (settings or {}).get("device") or DEFAULT_OUTPUT
+        self.monitor = get_master_volume(self.device)
+        self.monitor.attach(self)  # renders the current state right away
+        Logger.info(f"[VolumeAction] Initialized with context {context} on {self.device!r}")
+
+    def set_device(self, device):
+        device = device or DEFAULT_OUTPUT
+        if device == self.device:
+            return
+        self.monitor.detach(self)
+        self.device = device
+        self._last_state = None
+        self.monitor = get_master_volume(device)
+        self.monitor.attach(self)
 
     def generate_volume_image(self, volume_percent, is_muted=False):
         """Generate a 72x72 image with a green bar that grows/shrinks, or red when muted."""
@@ -60,80 +59,34 @@ class Volume(Action):
         img_str = base64.b64encode(buffer.getvalue()).decode()
         return f"data:image/png;base64,{img_str}"
 
-    def get_volume_interface(self, force=False):
-        """Return the endpoint interface, re-activating if stale or forced."""
-        now = time.monotonic()
-        if force or self.volume is None or now - self._iface_ts > self.INTERFACE_TTL:
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            self.volume = interface.QueryInterface(IAudioEndpointVolume)
-            self._iface_ts = now
-        return self.volume
-
-    def update_volume_display(self):
-        try:
-            volume = self.get_volume_interface()  # refresh in case device changed
-            current_volume = int(round(volume.GetMasterVolumeLevelScalar() * 100))
-            is_muted = volume.GetMute()
-
-            # Text overlay
-            if is_muted:
-                display = "MUTE"
-            elif current_volume == 100:
-                display = "MAX"
-            elif current_volume < 10:
-                display = f"0{current_volume}"
-            else:
-                display = f"{current_volume}"
-
-            # Update only if changed
-            current_state = (current_volume, is_muted)
-            if current_state != getattr(self, "_last_state", None):
-                self._last_state = current_state
-                self.set_title(display)
-
-                # Generate and set background image
-                bg_image = self.generate_volume_image(current_volume, is_muted)
-                self.set_image(bg_image)
-
-        except Exception as e:
-            self._iface_ts = 0.0  # force re-activation on next call
-            Logger.error(f"[VolumeAction] Exception in update_volume_display: {e}")
+    def render(self, level, is_muted):
+        """Monitor listener — called with the shared master level/mute."""
+        # Text overlay
+        if is_muted:
+            display = "MUTE"
+        elif level == 100:
+            display = "MAX"
+        elif level < 10:
+            display = f"0{level}"
+        else:
+            display = f"{level}"
+
+        # Update only if changed
+        current_state = (level, is_muted)
+        if current_state != self._last_state:
+            self._last_state = current_state
+            self.set_title(display)
+
+            # Generate and set background image
+            bg_image = self.generate_volume_image(level, is_muted)
+            self.set_image(bg_image)
 
     def mute_toggle(self):
-        try:
-            volume = self.get_volume_interface()
-            current_mute = volume.GetMute()
-            volume.SetMute(0 if current_mute else 1, None)
-            self.update_volume_display()
-        except Exception as e:
-            self._iface_ts = 0.0
-            Logger.error(f"[VolumeAction] Exception in mute_toggle: {e}")
+        self.monitor.toggle_mute()
 
     def change_volume_percent(self, delta_percent: int):
-        """Change volume by delta_percent (integer percent).
-
-        Retries once with a fresh endpoint interface so a transient COM
-        failure doesn't swallow the dial tick.
-        """
-        for attempt in range(2):
-            try:
-                volume = self.get_volume_interface(force=attempt > 0)
-                # Read current percent (rounded)
-                current_p = int(round(volume.GetMasterVolumeLevelScalar() * 100))
-
-                # Compute new percent and clamp
-                new_p = max(0, min(100, current_p + delta_percent))
-
-                # Set exact scalar
-                volume.SetMasterVolumeLevelScalar(new_p / 100.0, None)
-                self.update_volume_display()
-                return
-            except Exception as e:
-                if attempt == 0:
-                    Logger.warning(f"[VolumeAction] change_volume_percent retrying after: {e}")
-                else:
-                    Logger.error(f"[VolumeAction] Exception in change_volume_percent: {e}")
+        """Change volume by delta_percent (integer percent)."""
+        self.monitor.change_level(delta_percent)
 
     # Events
     def on_key_down(self, payload: dict):
@@ -151,8 +104,8 @@ class Volume(Action):
             self.change_volume_percent(ticks * step_percent)
 
     def on_will_disappear(self):
-        # Clear the timer when action disappears
-        self.plugin.timer.clear_interval(f'volume_update_{self.context}')
+        # Stop receiving updates when action disappears
+        self.monitor.detach(self)
         Logger.info(f"[VolumeAction] Will disappear for context {self.context}")
 
     # Extra events to skip
@@ -181,9 +134,32 @@ class Volume(Action):
 
     def on_system_did_wake_up(self, data: dict):
         Logger.info(f"[VolumeAction] System woke up with data: {data}")
+        # the output device may have changed while asleep — re-activate and redraw
+        self._last_state = None
+        self.monitor.refresh()
+        level, muted = self.monitor.snapshot()
+        if level is not None:
+            self.render(level, muted)
+
+    def on_did_receive_settings(self, settings: dict):
+        Logger.info(f"[VolumeAction] Received settings: {settings}")
+        self.settings = settings
+        self.set_device((settings or {}).get("device"))
 
     def on_property_inspector_did_appear(self, data: dict):
         Logger.info(f"[VolumeAction] Property inspector appeared with data: {data}")
+        # seed the PI's device picker from the registry (no enumeration)
+        registry = get_device_registry()
+        devices = [{"value": DEFAULT_OUTPUT, "label": "Default output"},
+                   {"value": DEFAULT_INPUT, "label": "Default microphone"}]
+        for flow, kind in ((RENDER, "Output"), (CAPTURE, "Microphone")):
+            for d in sorted(registry.devices(flow), key=lambda d: d.name.lower()):
+                devices.append({"value": d.id, "label": f"{kind}: {d.name}"})
+        self.send_to_property_inspector({
+            "event": "updateDevices",
+            "devices": devices,
+            "device": self.device,
+        })
 
     def on_property_inspector_did_disappear(self, data: dict):
         Logger.info(f"[VolumeAction] Property inspector disappeared with data: {data}")
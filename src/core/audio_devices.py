@@ -0,0 +1,371 @@
+"""Audio endpoint devices (outputs and microphones), tracked by notification.
+
+Finding the default output used to mean calling GetSpeakers() + Activate()
+every second just in case the user switched devices. Instead a process-wide
+AudioDeviceRegistry enumerates the active render and capture endpoints ONCE
+and then follows IMMNotificationClient callbacks — default device changed,
+device added, device removed / unplugged — telling its listeners
+(master_volume.py's monitors) when the endpoint they control is gone or the
+default moved, so they re-activate exactly then and never on a timer.
+
+Keys address devices by target: DEFAULT_OUTPUT, DEFAULT_INPUT, or a device
+id from the registry (a specific headset / mic regardless of the default).
+
+The OS side sits behind DeviceBackend: PycawDeviceBackend on Windows,
+SimulatedDeviceBackend (audio_sim.py) for Linux checks and benchmarks. If a
+backend can't deliver device notifications, users of the registry call
+poll() on a timer instead (see MasterVolumeMonitor): the defaults are cheap
+to re-check, the full list is re-enumerated only every ENUMERATE_POLL_S.
+"""
+
+import threading
+import time
+
+from .audio_worker import get_audio_worker
+from .logger import Logger
+
+RENDER = "render"
+CAPTURE = "capture"
+
+DEFAULT_OUTPUT = "default"           # target: whatever the default output is
+DEFAULT_INPUT = "default_capture"    # target: whatever the default microphone is
+
+DEFAULTS_POLL_S = 1.0    # poll(): defaults re-check cadence, shared by all callers
+ENUMERATE_POLL_S = 10.0  # poll(): full re-enumeration cadence
+
+
+class DeviceInfo:
+    __slots__ = ("id", "name", "flow")
+
+    def __init__(self, device_id, name, flow):
+        self.id = device_id
+        self.name = name
+        self.flow = flow
+
+
+class DeviceBackend:
+    """Source of endpoint devices. Every method is called on the audio
+    worker thread; callbacks may arrive on any thread."""
+
+    def enumerate(self):
+        """DeviceInfo for every ACTIVE render and capture endpoint."""
+        raise NotImplementedError
+
+    def default_id(self, flow):
+        """Id of the default endpoint for `flow`, or None if there is none."""
+        raise NotImplementedError
+
+    def activate(self, device_id):
+        """IAudioEndpointVolume-like object for one device."""
+        raise NotImplementedError
+
+    def watch(self, on_default_changed, on_added, on_removed):
+        """Deliver on_default_changed(flow, device_id), on_added(device_id)
+        and on_removed(device_id). Return False if not supported."""
+        return False
+
+    def watch_volume(self, endpoint, on_changed):
+        """Deliver on_changed(level_scalar, muted) on every change of
+        `endpoint`. Return a token for unwatch_volume(), or None if
+        notifications aren't supported."""
+        return None
+
+    def unwatch_volume(self, endpoint, token):
+        pass
+
+
+class PycawDeviceBackend(DeviceBackend):
+    def __init__(self):
+        self._keepalive = None  # (enumerator, notification client)
+
+    @staticmethod
+    def _flows():
+        from pycaw.constants import EDataFlow
+        return {RENDER: EDataFlow.eRender.value, CAPTURE: EDataFlow.eCapture.value}
+
+    def enumerate(self):
+        from pycaw.pycaw import AudioUtilities
+        from pycaw.constants import DEVICE_STATE
+        enumerator = AudioUtilities.GetDeviceEnumerator()
+        devices = []
+        for flow, flow_id in self._flows().items():
+            collection = enumerator.EnumAudioEndpoints(flow_id, DEVICE_STATE.ACTIVE.value)
+            if collection is None:
+                continue
+            for i in range(collection.GetCount()):
+                try:
+                    device = AudioUtilities.CreateDevice(collection.Item(i))
+                    devices.append(DeviceInfo(device.id, device.FriendlyName or device.id, flow))
+                except Exception as e:
+                    Logger.warning(f"[AudioDevices] skipping endpoint {i}: {e}")
+        return devices
+
+    def default_id(self, flow):
+        from pycaw.pycaw import AudioUtilities
+        from pycaw.constants import ERole
+        try:
+            device = AudioUtilities.GetDeviceEnumerator().GetDefaultAudioEndpoint(
+                self._flows()[flow], ERole.eMultimedia.value)
+            return device.GetId()
+        except Exception:
+            return None  # no device for this flow (e.g. no microphone)
+
+    def activate(self, device_id):
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        device = AudioUtilities.GetDeviceEnumerator().GetDevice(device_id)
+        interface = device.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        return interface.QueryInterface(IAudioEndpointVolume)
+
+    def watch(self, on_default_changed, on_added, on_removed):
+        from pycaw.pycaw import AudioUtilities
+        from pycaw.callbacks import MMNotificationClient
+        from pycaw.constants import DEVICE_STATE, ERole
+        flows = {flow_id: flow for flow, flow_id in self._flows().items()}
+
+        class _Client(MMNotificationClient):
+            def on_default_device_changed(self, flow, flow_id, role, role_id, default_device_id):
+                if role_id == ERole.eMultimedia.value and flow_id in flows:
+                    on_default_changed(flows[flow_id], default_device_id)
+
+            def on_device_added(self, added_device_id):
+                on_added(added_device_id)
+
+            def on_device_removed(self, removed_device_id):
+                on_removed(removed_device_id)
+
+            def on_device_state_changed(self, device_id, new_state, new_state_id):
+                # unplugging a headset is a state change, not a removal
+                if new_state_id == DEVICE_STATE.ACTIVE.value:
+                    on_added(device_id)
+                else:
+                    on_removed(device_id)
+
+            def on_property_value_changed(self, device_id, property_struct, fmtid, pid):
+                pass
+
+        enumerator = AudioUtilities.GetDeviceEnumerator()
+        client = _Client()
+        enumerator.RegisterEndpointNotificationCallback(client)
+        self._keepalive = (enumerator, client)
+        return True
+
+    def watch_volume(self, endpoint, on_changed):
+        from pycaw.callbacks import AudioEndpointVolumeCallback
+
+        class _Callback(AudioEndpointVolumeCallback):
+            def on_notify(self, new_volume, new_mute, event_context, channels, channel_volumes):
+                on_changed(new_volume, bool(new_mute))
+
+        callback = _Callback()
+        endpoint.RegisterControlChangeNotify(callback)
+        return callback  # the token keeps the COM object alive
+
+    def unwatch_volume(self, endpoint, token):
+        endpoint.UnregisterControlChangeNotify(token)
+
+
+class AudioDeviceRegistry:
+    """Active endpoints + current defaults, enumerated once and kept current
+    by device notifications."""
+
+    def __init__(self, backend: DeviceBackend):
+        self.backend = backend
+        self._audio = get_audio_worker()
+        self._lock = threading.RLock()
+        self._devices = {}       # id -> DeviceInfo, active endpoints only
+        self._defaults = {}      # flow -> default device id (or None)
+        self._started = False
+        self._watching = False
+        self._listeners = []     # cb(event, *args)
+        self._enumerated = 0.0   # monotonic time of the last full enumeration
+        self._polled = 0.0       # ... and of the last defaults check
+        self.stats = {"enumerations": 0, "notifications": 0}
+
+    # ------------------------------------------------------------------ API
+
+    @property
+    def watching(self):
+        """True once device notifications are flowing."""
+        self._ensure()
+        return self._watching
+
+    def devices(self, flow=None):
+        self._ensure()
+        with self._lock:
+            return [d for d in self._devices.values() if flow is None or d.flow == flow]
+
+    def default(self, flow=RENDER):
+        self._ensure()
+        with self._lock:
+            return self._defaults.get(flow)
+
+    def resolve(self, target):
+        """Device id a target currently means, or None (no such device)."""
+        if target == DEFAULT_OUTPUT:
+            return self.default(RENDER)
+        if target == DEFAULT_INPUT:
+            return self.default(CAPTURE)
+        self._ensure()
+        with self._lock:
+            return target if target in self._devices else None
+
+    def flow_of(self, target):
+        if target == DEFAULT_OUTPUT:
+            return RENDER
+        if target == DEFAULT_INPUT:
+            return CAPTURE
+        with self._lock:
+            info = self._devices.get(target)
+            return info.flow if info else None
+
+    def refresh(self):
+        """Full re-enumeration (fallback when notifications are unavailable,
+        or after the system woke up); listeners get whatever changed."""
+        try:
+            self._audio.call(self._enumerate_now)
+        except Exception as e:
+            Logger.error(f"[AudioDevices] refresh failed: {e}")
+
+    def poll(self):
+        """Fallback for backends without device notifications: re-checks the
+        defaults every DEFAULTS_POLL_S (cheap) and the full device list (every
+        endpoint's property store) every ENUMERATE_POLL_S, however many
+        monitors call it."""
+        try:
+            self._audio.call(self._poll_now)
+        except Exception as e:
+            Logger.error(f"[AudioDevices] poll failed: {e}")
+
+    def _poll_now(self):
+        now = time.monotonic()
+        if now - self._polled < DEFAULTS_POLL_S:
+            return
+        self._polled = now
+        if now - self._enumerated >= ENUMERATE_POLL_S:
+            self._enumerate_now()
+            return
+        try:
+            defaults = {flow: self.backend.default_id(flow) for flow in (RENDER, CAPTURE)}
+        except Exception as e:
+            Logger.error(f"[AudioDevices] default lookup failed: {e}")
+            return
+        for flow, device_id in defaults.items():
+            self._on_default_changed(flow, device_id, notified=False)
+
+    def add_listener(self, cb):
+        """cb(event, *args): ("default_changed", flow, device_id),
+        ("added", device_id), ("removed", device_id). Called on the audio
+        worker or a COM notification thread."""
+        with self._lock:
+            if cb not in self._listeners:
+                self._listeners.append(cb)
+
+    def remove_listener(self, cb):
+        with self._lock:
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+    # ------------------------------------------------------------ internals
+
+    def _ensure(self):
+        if not self._started:
+            try:
+                self._audio.call(self._start_now)
+            except Exception as e:
+                Logger.error(f"[AudioDevices] start failed: {e}")
+
+    def _start_now(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._enumerate_now(emit=False)
+            try:
+                self._watching = bool(self.backend.watch(
+                    self._on_default_changed, self._on_added, self._on_removed))
+            except Exception as e:
+                Logger.error(f"[AudioDevices] device notifications unavailable: {e}")
+                self._watching = False
+            if not self._watching:
+                Logger.warning("[AudioDevices] No device notifications; devices are polled")
+
+    def _enumerate_now(self, emit=True):
+        """Audio worker thread. Diffs the fresh state against the known one."""
+        try:
+            fresh = {d.id: d for d in self.backend.enumerate()}
+            defaults = {flow: self.backend.default_id(flow) for flow in (RENDER, CAPTURE)}
+        except Exception as e:
+            Logger.error(f"[AudioDevices] enumeration failed: {e}")
+            return
+        with self._lock:
+            self.stats["enumerations"] += 1
+            self._enumerated = time.monotonic()
+            added = [i for i in fresh if i not in self._devices]
+            removed = [i for i in self._devices if i not in fresh]
+            moved = [(f, i) for f, i in defaults.items() if self._defaults.get(f) != i]
+            self._devices, self._defaults = fresh, defaults
+        if not emit:
+            return
+        for device_id in removed:
+            self._emit("removed", device_id)
+        for device_id in added:
+            self._emit("added", device_id)
+        for flow, device_id in moved:
+            self._emit("default_changed", flow, device_id)
+
+    def _on_default_changed(self, flow, device_id, notified=True):
+        with self._lock:
+            self.stats["notifications"] += notified
+            if self._defaults.get(flow) == device_id:
+                return
+            self._defaults[flow] = device_id
+        Logger.info(f"[AudioDevices] default {flow} device changed")
+        self._emit("default_changed", flow, device_id)
+
+    def _on_added(self, device_id):
+        with self._lock:
+            self.stats["notifications"] += 1
+            if device_id in self._devices:
+                return
+        # name and flow need COM; re-enumerate on the worker (rare event)
+        self._audio.submit(self._enumerate_now)
+
+    def _on_removed(self, device_id):
+        with self._lock:
+            self.stats["notifications"] += 1
+            if self._devices.pop(device_id, None) is None:
+                return
+            for flow, default in self._defaults.items():
+                if default == device_id:
+                    self._defaults[flow] = None  # until default_changed names the next one
+        self._emit("removed", device_id)
+
+    def _emit(self, event, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(event, *args)
+            except Exception as e:
+                Logger.error(f"[AudioDevices] listener error: {e}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_device_registry() -> AudioDeviceRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AudioDeviceRegistry(PycawDeviceBackend())
+        return _registry
+
+
+def set_device_backend(backend: DeviceBackend) -> AudioDeviceRegistry:
+    """Swap in a different backend (e.g. the simulated one) with a fresh registry."""
+    global _registry
+    with _registry_lock:
+        _registry = AudioDeviceRegistry(backend)
+        return _registry
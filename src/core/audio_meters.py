@@ -0,0 +1,366 @@
+"""Shared, batched peak-meter sampling and pre-rendered VU bars.
+
+A meter key animates at FRAME_MS, and every meter read is a COM call
+(IAudioMeterInformation.GetPeakValue). Read per key and per frame, that is a
+steady stream of cross-thread COM calls. The "game" source would also need a
+session lookup per key per frame. Instead ONE MeterReader serves every Peak
+Meter key:
+
+- One ANIMATION timer samples every source somebody is watching in ONE
+  audio-worker command per frame. ANIMATION timers pause when idle or
+  suspended (see power.py).
+- Meter interfaces are resolved once and cached on the worker. The master
+  meter is kept until the device registry reports that the default output
+  moved or went away. Session meters are kept per session key for as long as
+  the session stays in the set.
+- The "game" source is the loudest session in the set Game Volume controls:
+  infos_excluding() on the session registry, read from memory without an
+  enumeration.
+- Ballistics run once per source: instant attack, a RELEASE_DB_S fall and a
+  HOLD_S peak-hold marker. Keys are only told when the lit segment count or
+  the hold marker moves.
+
+Bars come from a SpriteTable. Every (level, hold) frame is drawn and
+PNG-encoded once, so a frame costs a dict lookup instead of a PIL draw plus a
+PNG encode per key.
+
+Meters sit behind a MeterBackend like the other audio backends:
+PycawMeterBackend on Windows, SimulatedMeterBackend (audio_sim.py) for Linux
+checks and benchmarks.
+"""
+
+import base64
+import io
+import math
+import threading
+import time
+
+from PIL import Image, ImageDraw
+
+from .audio_devices import DEFAULT_OUTPUT, get_device_registry
+from .audio_sessions import compile_excludes, get_registry
+from .audio_worker import get_audio_worker
+from .logger import Logger
+from .timer import ANIMATION
+
+MASTER = "master"
+GAME = "game"
+
+FRAME_MS = 33          # ~30 fps
+SEGMENTS = 18          # bar resolution: 3 dB per segment over FLOOR_DB..0
+FLOOR_DB = -54.0
+YELLOW_DB = -18.0      # segments above this are yellow...
+RED_DB = -6.0          # ...and above this red
+RELEASE_DB_S = 24.0    # how fast the bar and the hold marker fall
+HOLD_S = 1.0           # the hold marker stays put this long after a peak
+
+
+def peak_to_db(peak):
+    if peak <= 0.0:
+        return FLOOR_DB
+    return max(FLOOR_DB, 20.0 * math.log10(min(1.0, peak)))
+
+
+def db_to_segments(db):
+    """Lit segments (0..SEGMENTS) for a level in dBFS."""
+    lit = math.ceil((db - FLOOR_DB) / -FLOOR_DB * SEGMENTS - 1e-9)
+    return max(0, min(SEGMENTS, int(lit)))
+
+
+class MeterBackend:
+    """Source of peak meters: objects with GetPeakValue() -> 0.0..1.0."""
+
+    def endpoint_meter(self, device_id):
+        """Meter of one endpoint device (what the device plays)."""
+        raise NotImplementedError
+
+    def session_meter(self, session):
+        """Meter of one audio session (as handed out by the session registry)."""
+        raise NotImplementedError
+
+
+class PycawMeterBackend(MeterBackend):
+    """Windows backend. Audio worker thread only, like every COM object."""
+
+    def endpoint_meter(self, device_id):
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioMeterInformation
+        device = AudioUtilities.GetDeviceEnumerator().GetDevice(device_id)
+        interface = device.Activate(IAudioMeterInformation._iid_, CLSCTX_ALL, None)
+        return interface.QueryInterface(IAudioMeterInformation)
+
+    def session_meter(self, session):
+        from pycaw.pycaw import IAudioMeterInformation
+        return session._ctl.QueryInterface(IAudioMeterInformation)
+
+
+class _Ballistics:
+    """Per-source bar motion: jumps up at once, falls at RELEASE_DB_S; the
+    hold marker sits on the last peak for HOLD_S, then falls too."""
+
+    __slots__ = ("db", "hold_db", "hold_until", "t")
+
+    def __init__(self):
+        self.db = FLOOR_DB
+        self.hold_db = FLOOR_DB
+        self.hold_until = 0.0
+        self.t = None
+
+    def step(self, peak, now):
+        fall = 0.0 if self.t is None else RELEASE_DB_S * (now - self.t)
+        self.t = now
+        self.db = max(peak_to_db(peak), self.db - fall)
+        if self.db >= self.hold_db:
+            self.hold_db, self.hold_until = self.db, now + HOLD_S
+        elif now >= self.hold_until:
+            self.hold_db = max(self.db, self.hold_db - fall)
+        return db_to_segments(self.db), db_to_segments(self.hold_db)
+
+
+class MeterReader:
+    """Samples the watched sources for every attached key, once per frame."""
+
+    def __init__(self, backend, registry=None):
+        self.backend = backend
+        self.registry = registry or get_device_registry()
+        self._audio = get_audio_worker()
+        self._lock = threading.RLock()
+        self._listeners = {}          # source -> [render callbacks: cb(level, hold)]
+        self._state = {}              # source -> last published (level, hold)
+        self._ballistics = {}         # source -> _Ballistics
+        self._exclude = None          # callable -> Game Volume exclude list
+        self._plugin = None
+        self._timer_on = False
+        self._master_stale = False
+        # audio worker thread only
+        self._master = None
+        self._sessions = {}           # session key -> meter
+        self.stats = {"frames": 0, "reads": 0, "activations": 0, "published": 0}
+
+    # ------------------------------------------------------- lifecycle
+
+    def attach(self, action, source):
+        """Start feeding action.render(level, hold) with `source`."""
+        with self._lock:
+            self._plugin = action.plugin
+            listeners = self._listeners.setdefault(source, [])
+            if action.render not in listeners:
+                listeners.append(action.render)
+            self._ballistics.setdefault(source, _Ballistics())
+            state = self._state.get(source)
+            start = not self._timer_on
+            self._timer_on = True
+        if start:
+            self.registry.add_listener(self._on_device_event)
+            action.plugin.timer.set_interval("peak_meter_frame", FRAME_MS, self._tick, kind=ANIMATION)
+        action.render(*(state or (0, 0)))
+
+    def detach(self, action):
+        with self._lock:
+            for listeners in self._listeners.values():
+                if action.render in listeners:
+                    listeners.remove(action.render)
+            if any(self._listeners.values()) or not self._timer_on:
+                return
+            self._timer_on = False
+            plugin = self._plugin
+        if plugin:
+            plugin.timer.clear_interval("peak_meter_frame")
+        self.registry.remove_listener(self._on_device_event)
+        self._audio.submit(self._release)
+
+    def set_game_exclude(self, exclude):
+        """`exclude()` returns the exclude list the "game" source skips."""
+        with self._lock:
+            self._exclude = exclude
+
+    # ------------------------------------------------------------ frames
+
+    def _tick(self):
+        """Timer callback: one worker command for every watched source."""
+        with self._lock:
+            sources = [s for s, listeners in self._listeners.items() if listeners]
+            exclude_fn = self._exclude
+        if not sources:
+            return
+        exclude = compile_excludes(())
+        if GAME in sources and exclude_fn:
+            try:
+                exclude = compile_excludes(exclude_fn())
+            except Exception as e:
+                Logger.warning(f"[PeakMeter] exclude list unavailable: {e}")
+        try:
+            peaks = self._audio.call(self._sample, sources, exclude)
+        except Exception as e:
+            Logger.error(f"[PeakMeter] sampling failed: {e}")
+            return
+        now = time.monotonic()
+        for source, peak in peaks.items():
+            self._publish(source, self._ballistics[source].step(peak, now))
+
+    def _publish(self, source, state):
+        with self._lock:
+            if self._state.get(source) == state:
+                return
+            self._state[source] = state
+            listeners = list(self._listeners.get(source, ()))
+        self.stats["published"] += 1
+        for cb in listeners:
+            try:
+                cb(*state)
+            except Exception as e:
+                Logger.error(f"[PeakMeter] listener error: {e}")
+
+    def _on_device_event(self, event, *args):
+        """Device registry listener: the default output may have changed or
+        gone, so the next frame re-resolves the master meter."""
+        self._master_stale = True
+
+    # ------------------------------------------- audio worker thread only
+
+    def _sample(self, sources, exclude):
+        self.stats["frames"] += 1
+        peaks = {}
+        if MASTER in sources:
+            peaks[MASTER] = self._read_master()
+        if GAME in sources:
+            peaks[GAME] = self._read_game(exclude)
+        return peaks
+
+    def _read_master(self):
+        if not self.registry.watching:
+            self.registry.poll()  # throttled; its events mark the meter stale
+        if self._master_stale:
+            self._master_stale = False
+            self._master = None
+        for attempt in range(2):
+            try:
+                if self._master is None:
+                    device_id = self.registry.resolve(DEFAULT_OUTPUT)
+                    if device_id is None:
+                        return 0.0
+                    self._master = self.backend.endpoint_meter(device_id)
+                    self.stats["activations"] += 1
+                self.stats["reads"] += 1
+                return float(self._master.GetPeakValue())
+            except Exception as e:
+                self._master = None  # stale interface; re-activate once
+                if attempt:
+                    Logger.warning(f"[PeakMeter] master meter unavailable: {e}")
+        return 0.0
+
+    def _read_game(self, exclude):
+        meters, loudest = {}, 0.0
+        for info in get_registry().infos():
+            if info.excluded_by(exclude):
+                continue
+            meter = self._sessions.get(info.key)
+            try:
+                if meter is None:
+                    meter = self.backend.session_meter(info.session)
+                    self.stats["activations"] += 1
+                self.stats["reads"] += 1
+                loudest = max(loudest, float(meter.GetPeakValue()))
+            except Exception:
+                continue  # session on its way out; retried next frame if not
+            meters[info.key] = meter
+        self._sessions = meters  # sessions that left the set drop their meter
+        return loudest
+
+    def _release(self):
+        self._master = None
+        self._sessions = {}
+
+
+class SpriteTable:
+    """Every bar frame, drawn and PNG-encoded once: frame(level, hold) is a
+    dict lookup. Segments are bottom-up; unlit ones are drawn dimmed, and the
+    hold marker lights one segment above the bar."""
+
+    def __init__(self, segments=SEGMENTS, size=72):
+        self.segments = segments
+        lit, dim = self._strips(segments, size)
+        pitch = size / segments
+        self._frames = {}
+        for level in range(segments + 1):
+            base = dim.copy()
+            if level:
+                top = size - int(round(level * pitch))
+                base.paste(lit.crop((0, top, size, size)), (0, top))
+            for hold in range(level, segments + 1):
+                img = base
+                if hold > level:
+                    img = base.copy()
+                    top = size - int(round(hold * pitch))
+                    bottom = size - int(round((hold - 1) * pitch))
+                    img.paste(lit.crop((0, top, size, bottom)), (0, top))
+                self._frames[(level, hold)] = self._encode(img)
+
+    def frame(self, level, hold=0):
+        level = max(0, min(self.segments, level))
+        return self._frames[(level, max(level, min(self.segments, hold)))]
+
+    def __len__(self):
+        return len(self._frames)
+
+    @staticmethod
+    def _strips(segments, size):
+        """The full bar, lit and dimmed."""
+        lit = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        dim = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        lit_draw, dim_draw = ImageDraw.Draw(lit), ImageDraw.Draw(dim)
+        pitch = size / segments
+        margin = size // 8
+        for i in range(segments):
+            top_db = FLOOR_DB + (i + 1) * -FLOOR_DB / segments
+            if top_db > RED_DB:
+                color = (255, 40, 40)
+            elif top_db > YELLOW_DB:
+                color = (255, 210, 0)
+            else:
+                color = (0, 230, 0)
+            top = size - int(round((i + 1) * pitch))
+            bottom = size - int(round(i * pitch)) - 2  # 1px gap between segments
+            box = [margin, top, size - margin - 1, bottom]
+            lit_draw.rectangle(box, fill=color + (255,))
+            dim_draw.rectangle(box, fill=tuple(c // 5 for c in color) + (255,))
+        return lit, dim
+
+    @staticmethod
+    def _encode(img):
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+_reader = None
+_sprites = None
+_meters_lock = threading.Lock()
+
+
+def get_meter_reader() -> MeterReader:
+    """The shared reader (per device registry)."""
+    global _reader
+    registry = get_device_registry()
+    with _meters_lock:
+        if _reader is None or _reader.registry is not registry:
+            backend = _reader.backend if _reader is not None else PycawMeterBackend()
+            _reader = MeterReader(backend, registry)
+        return _reader
+
+
+def set_meter_backend(backend: MeterBackend) -> MeterReader:
+    """Swap in a different backend (e.g. the simulated one) with a fresh reader."""
+    global _reader
+    with _meters_lock:
+        _reader = MeterReader(backend)
+        return _reader
+
+
+def get_sprite_table() -> SpriteTable:
+    """The shared bar frames, built on first use."""
+    global _sprites
+    with _meters_lock:
+        if _sprites is None:
+            _sprites = SpriteTable()
+        return _sprites
@@ -0,0 +1,222 @@
+"""Audio scenes: a saved mix applied as one transaction.
+
+A scene (an Audio Scene key's settings["scene"]) looks like this, and every
+part of it is optional:
+
+    {"apps": {"spotify.exe": {"level": 30, "muted": false}, ...},
+     "game_volume": {"level": 60, "muted": false},
+     "discord": {"output_volume": 80, "deaf": false, "mute": false}}
+
+Recreating that by hand means a press per key: an enumeration and a worker
+round trip each, plus a separate Discord write for every field.
+apply_scene() does it in one go:
+
+- ONE audio-worker command enumerates the sessions once, writes every
+  per-app level/mute, and runs the Game Volume enforcement pass for the
+  scene's game level, reusing that enumeration;
+- ONE coalesced SET_VOICE_SETTINGS patch goes through
+  DiscordRPC.queue_voice_patch, with output volume, deafen and mute together.
+  The Discord keys show it at once, optimistically.
+
+Apps in the Game Volume set follow the game level: while Game Volume is
+enforcing, or when the scene sets game_volume, a per-app rule for such an
+app would be undone on the next enforcement tick, so it is skipped and
+reported. Per-app rules are meant for excluded apps and for setups without
+Game Volume.
+
+The returned SceneReport says what was done and how long it took.
+"""
+
+import time
+
+from .audio_sessions import compile_excludes, get_registry
+from .audio_worker import get_audio_worker
+from .game_volume import get_controller
+
+MAX_DISCORD_VOLUME = 200.0
+
+
+class SceneReport:
+    """What apply_scene() did, and how long it took."""
+
+    __slots__ = ("total_ms", "audio_ms", "sessions", "written", "skipped", "failed",
+                 "game", "discord")
+
+    def __init__(self):
+        self.total_ms = 0.0
+        self.audio_ms = 0.0
+        self.sessions = 0        # sessions seen by the one enumeration
+        self.written = 0         # per-app rules applied (sessions written)
+        self.skipped = []        # apps left to Game Volume
+        self.failed = 0
+        self.game = None         # sessions the game pass changed (None = not in scene)
+        self.discord = None      # "sent" / "queued" (not connected yet) / None
+
+    def summary(self):
+        parts = [f"{self.total_ms:.1f} ms"]
+        if self.audio_ms:
+            parts.append(f"audio pass {self.audio_ms:.1f} ms over {self.sessions} sessions")
+            parts.append(f"{self.written} app sessions set")
+        if self.skipped:
+            parts.append(f"left to Game Volume: {', '.join(sorted(set(self.skipped)))}")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        if self.game is not None:
+            parts.append(f"game volume: {self.game} sessions changed")
+        if self.discord:
+            parts.append(f"discord patch {self.discord}")
+        return ", ".join(parts)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _clamp(value, high):
+    return max(0.0, min(high, float(value)))
+
+
+def normalize(scene):
+    """Validated copy of a scene: lower-case app names, clamped levels,
+    unknown keys dropped. Raises ValueError/TypeError on malformed input."""
+    scene = scene or {}
+    out = {}
+    apps = {}
+    for name, rule in (scene.get("apps") or {}).items():
+        clean = {}
+        if "level" in rule:
+            clean["level"] = int(round(_clamp(rule["level"], 100)))
+        if "muted" in rule:
+            clean["muted"] = bool(rule["muted"])
+        if clean:
+            apps[str(name).lower()] = clean
+    if apps:
+        out["apps"] = apps
+    gv = scene.get("game_volume")
+    if gv:
+        clean = {}
+        if "level" in gv:
+            clean["level"] = int(round(_clamp(gv["level"], 100)))
+        if "muted" in gv:
+            clean["muted"] = bool(gv["muted"])
+        if clean:
+            out["game_volume"] = clean
+    discord = scene.get("discord")
+    if discord:
+        clean = {}
+        if "output_volume" in discord:
+            clean["output_volume"] = _clamp(discord["output_volume"], MAX_DISCORD_VOLUME)
+        for field in ("deaf", "mute"):
+            if field in discord:
+                clean[field] = bool(discord[field])
+        if clean:
+            out["discord"] = clean
+    return out
+
+
+def apply_scene(scene, plugin, rpc=None) -> SceneReport:
+    """Apply a normalized scene. `rpc` defaults to the plugin's DiscordRPC
+    and is only touched if the scene has a discord part."""
+    start = time.perf_counter()
+    report = SceneReport()
+    controller = get_controller()
+    controller.bind(plugin)
+    game = scene.get("game_volume")
+    if game:
+        controller.set_target(game.get("level"), game.get("muted"))
+    if scene.get("apps") or game:
+        audio_start = time.perf_counter()
+        get_audio_worker().call(_apply_audio, scene.get("apps") or {}, controller, bool(game), report)
+        report.audio_ms = (time.perf_counter() - audio_start) * 1000.0
+    if game:
+        controller.commit()
+    if scene.get("discord"):
+        if rpc is None:
+            from .discord_rpc import get_discord_rpc
+            rpc = get_discord_rpc(plugin)
+        report.discord = _apply_discord(rpc, scene["discord"])
+    report.total_ms = (time.perf_counter() - start) * 1000.0
+    return report
+
+
+def _apply_audio(apps, controller, game, report):
+    """The batched COM pass. Audio worker thread only."""
+    infos = get_registry().infos(force=True)  # the one enumeration
+    report.sessions = len(infos)
+    governed = game or controller.enforcing
+    excluded = compile_excludes(controller.snapshot()[2])
+    for info in infos:
+        rule = apps.get(info.basename)
+        if rule is None:
+            continue
+        if governed and not info.excluded_by(excluded):
+            report.skipped.append(info.basename)
+            continue
+        try:
+            vol = info.session.SimpleAudioVolume
+            if "level" in rule:
+                vol.SetMasterVolume(rule["level"] / 100.0, None)
+            if "muted" in rule:
+                vol.SetMute(1 if rule["muted"] else 0, None)
+            report.written += 1
+        except Exception:
+            report.failed += 1  # session went away mid-pass
+    if game:
+        # reuses the enumeration above: the registry isn't due again
+        report.game = controller.apply()
+
+
+def _apply_discord(rpc, discord):
+    """One optimistic local update + one coalesced patch."""
+    fields, patch = {}, {}
+    if "output_volume" in discord:
+        fields["output_volume"] = discord["output_volume"]
+        patch["output"] = {"volume": discord["output_volume"]}
+    for field in ("deaf", "mute"):
+        if field in discord:
+            fields[field] = patch[field] = discord[field]
+    rpc.set_local_voice(fields)
+    rpc.queue_voice_patch(patch)
+    return "sent" if rpc.ready else "queued"
+
+
+def capture(plugin, include=("apps", "game_volume", "discord"), rpc=None):
+    """A scene from the current mix. Apps are the ones a scene could set:
+    with Game Volume enforcing, only its excluded apps."""
+    scene = {}
+    controller = get_controller()
+    controller.bind(plugin)
+    level, muted, exclude = controller.snapshot()
+    if "apps" in include:
+        governed = controller.enforcing
+        excluded = compile_excludes(exclude)
+        apps = get_audio_worker().call(_read_apps, governed, excluded)
+        if apps:
+            scene["apps"] = apps
+    if "game_volume" in include:
+        scene["game_volume"] = {"level": level, "muted": muted}
+    if "discord" in include:
+        if rpc is None:
+            from .discord_rpc import get_discord_rpc
+            rpc = get_discord_rpc(plugin)
+        if rpc.ready:
+            voice = rpc.voice_snapshot()
+            scene["discord"] = {"output_volume": voice["output_volume"],
+                                "deaf": voice["deaf"], "mute": voice["mute"]}
+    return normalize(scene)
+
+
+def _read_apps(governed, excluded):
+    """Audio worker thread only."""
+    apps = {}
+    for info in get_registry().infos(force=True):
+        if info.basename is None or info.basename in apps:
+            continue
+        if governed and not info.excluded_by(excluded):
+            continue
+        try:
+            vol = info.session.SimpleAudioVolume
+            apps[info.basename] = {"level": int(round(vol.GetMasterVolume() * 100)),
+                                   "muted": bool(vol.GetMute())}
+        except Exception:
+            continue
+    return apps
@@ -1,20 +1,34 @@
-"""Shared TTL-cached access to Windows audio sessions.
+"""Shared, notification-driven access to Windows audio sessions.
 
 AudioUtilities.GetAllSessions() is an expensive COM enumeration; calling it
-per dial tick (or per 300ms timer tick) causes lag and transient COM failures
-under load. Same idea as the endpoint-interface cache in volume.py, applied
-to session enumeration.
+per dial tick (or per 200ms timer tick) causes lag and transient COM failures
+under load. So a process-wide AudioSessionRegistry enumerates ONCE and is then
+kept current by session-created / session-expired notifications — the 200ms
+game-volume tick reads an in-memory list instead of re-enumerating.
+
+The OS side sits behind a small backend interface (SessionBackend):
+PycawSessionBackend on Windows, SimulatedSessionBackend (audio_sim.py) for
+Linux tests and benchmarks. If a backend can't deliver notifications the
+registry falls back to the old TTL re-enumeration; either way a slow full
+resync (RESYNC_S) runs as a safety net, and force=True still re-enumerates
+on demand (PI open, retry after a COM error).
+
+Enumeration and notification registration run on the audio worker thread
+(audio_worker.py), which owns the COM apartment; readers on other threads
+only hand off when a refresh is actually due.
 """
 
+import fnmatch
 import os
+import re
 import threading
 import time
 
-from pycaw.pycaw import AudioUtilities
-
+from .audio_worker import get_audio_worker
 from .logger import Logger
 
-SESSIONS_TTL = 1.0  # seconds
+SESSIONS_TTL = 1.0  # seconds; re-enumeration cadence when notifications are unavailable
+RESYNC_S = 30.0     # safety-net full re-enumeration even when notifications work
 
 # Excluded apps whose Chromium audio-service session carries only NON-voice
 # audio (chat videos, pings, UI beeps) and should therefore still be volume-
@@ -25,83 +39,508 @@ SESSIONS_TTL = 1.0  # seconds
 # would un-exclude the app entirely.
 VOICE_SPLIT_APPS = {"discord.exe"}
 
+# Apps Game Volume (and the "game" peak meter) leave alone unless the user
+# picks a different exclude list.
+DEFAULT_EXCLUDE = ["Discord.exe"]
+
+TREE_PREFIX = "tree:"   # exclude rule: the process and everything it started
+MAX_TREE_DEPTH = 32     # ancestors looked at per process (guards odd ppid loops)
+
 _AUDIO_SERVICE_ARG = "--utility-sub-type=audio.mojom.AudioService"
 
-_lock = threading.Lock()
-_sessions = []
-_ts = 0.0
 
-_audio_service_cache = {}  # pid -> (create_time, bool)
+class SessionInfo:
+    """Metadata for one session, computed ONCE when the session is first
+    seen, so the 200ms tick filters on plain fields instead of calling
+    Process.name()/cmdline() (per-process syscalls) for every session."""
+
+    __slots__ = ("session", "key", "pid", "create_time", "basename", "name", "audio_service",
+                 "_exclude_key", "_excluded")
+
+    def __init__(self, session, pid=0, create_time=None, name=None, audio_service=False):
+        self.session = session
+        self.key = None                     # registry key, set when indexed
+        self.pid = pid
+        self.create_time = create_time
+        self.name = name                    # exe name as the process reports it (display)
+        self.basename = name.lower() if name else None  # matching; None = system sounds
+        self.audio_service = audio_service  # Chromium audio-service utility process
+        self._exclude_key = None
+        self._excluded = False
+
+    def excluded_by(self, matcher: "ExcludeMatcher") -> bool:
+        """Exclude decision under a compiled matcher, cached until a
+        different matcher is asked about."""
+        if self._exclude_key is not matcher:
+            self._exclude_key = matcher
+            self._excluded = matcher.excludes(self)
+        return self._excluded
+
+
+# (pid, create_time) -> (psutil.Process, exe name, audio_service). Shared by
+# every session of a process (a browser can own many); an entry is dropped
+# only once its process has exited, never wholesale.
+_process_index = {}
+_process_lock = threading.Lock()
+
+
+def _describe(session) -> SessionInfo:
+    """Build a session's SessionInfo. Raises if the process can't be queried
+    (caller skips the session, as before); a failing cmdline() only clears the
+    audio-service flag — the session stays excluded, the voice-safe fallback."""
+    proc = session.Process
+    if not proc:
+        return SessionInfo(session)
+    pid, created = proc.pid, proc.create_time()
+    with _process_lock:
+        entry = _process_index.get((pid, created))
+    if entry is None:
+        name = os.path.basename(proc.name())
+        try:
+            audio_service = any(_AUDIO_SERVICE_ARG in arg for arg in proc.cmdline())
+        except Exception:
+            audio_service = False
+        entry = (proc, name, audio_service)
+        with _process_lock:
+            _process_index[(pid, created)] = entry
+    return SessionInfo(session, pid, created, entry[1], entry[2])
+
+
+# (pid, create_time) -> lower-case basenames of the process's ancestors,
+# parent first; walked once per process, only when a tree: rule needs it.
+_ancestry_index = {}
+
+
+def _ancestry(info):
+    key = (info.pid, info.create_time)
+    with _process_lock:
+        names = _ancestry_index.get(key)
+        entry = _process_index.get(key)
+    if names is not None:
+        return names
+    found = []
+    proc = entry[0] if entry else None
+    for _ in range(MAX_TREE_DEPTH):
+        try:
+            proc = proc.parent() if proc is not None else None
+            if proc is None:
+                break
+            found.append(os.path.basename(proc.name()).lower())
+        except Exception:
+            break  # parent gone or not ours to query: the chain ends here
+    names = tuple(found)
+    with _process_lock:
+        _ancestry_index[key] = names
+    return names
+
+
+def _evict_dead_processes():
+    """Drop index entries whose process has exited (or whose pid was reused)."""
+    with _process_lock:
+        items = list(_process_index.items())
+    dead = []
+    for key, (proc, _, _) in items:
+        try:
+            if not proc.is_running():
+                dead.append(key)
+        except Exception:
+            dead.append(key)
+    if dead:
+        with _process_lock:
+            for key in dead:
+                _process_index.pop(key, None)
+                _ancestry_index.pop(key, None)
+            matchers = list(_matchers.values())
+        for matcher in matchers:
+            matcher.forget(dead)
+
+
+def _compile_globs(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+class ExcludeMatcher:
+    """An exclude list compiled once. Rules are case-insensitive:
+
+        "Discord.exe"       that exe
+        "*launcher*.exe"    any exe the glob matches
+        "tree:Steam.exe"    that exe and every process it started, at any
+                            depth (globs work here too)
+
+    Name and glob rules keep the VOICE_SPLIT_APPS carve-out: the app's
+    audio-service session is not excluded. A tree: rule excludes the whole
+    tree, carve-out included. Decisions are cached per (pid, create_time), so
+    on the 200ms path every known process costs one dict lookup however
+    complex the rules are."""
+
+    def __init__(self, rules):
+        names, globs, tree_names, tree_globs = set(), [], set(), []
+        for rule in rules:
+            rule = str(rule).strip().lower()
+            tree = rule.startswith(TREE_PREFIX)
+            if tree:
+                rule = rule[len(TREE_PREFIX):].strip()
+            if not rule:
+                continue
+            if any(c in rule for c in "*?["):
+                (tree_globs if tree else globs).append(rule)
+            else:
+                (tree_names if tree else names).add(rule)
+        self._names = frozenset(names)
+        self._glob = _compile_globs(globs)
+        self._tree_names = frozenset(tree_names)
+        self._tree_glob = _compile_globs(tree_globs)
+        self._decisions = {}  # (pid, create_time) -> bool
+
+    def excludes(self, info) -> bool:
+        if info.basename is None:
+            return False  # system sounds
+        key = (info.pid, info.create_time)
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = self._decisions[key] = self._decide(info)
+        return decision
+
+    def forget(self, keys):
+        for key in keys:
+            self._decisions.pop(key, None)
+
+    def _in_tree(self, name):
+        return name in self._tree_names or bool(self._tree_glob and self._tree_glob.match(name))
+
+    def _decide(self, info):
+        name = info.basename
+        if self._tree_names or self._tree_glob:
+            if self._in_tree(name) or any(self._in_tree(a) for a in _ancestry(info)):
+                return True
+        if name in self._names or (self._glob and self._glob.match(name)):
+            return not (name in VOICE_SPLIT_APPS and info.audio_service)
+        return False
+
+
+# rules -> ExcludeMatcher, so callers passing the same list every tick share
+# one matcher (and its decision cache); a few recent lists are kept
+_matchers = {}
+_MATCHERS_KEPT = 8
+
+
+def compile_excludes(rules) -> ExcludeMatcher:
+    key = tuple(str(r).strip().lower() for r in rules)
+    with _process_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            if len(_matchers) >= _MATCHERS_KEPT:
+                _matchers.pop(next(iter(_matchers)))
+            matcher = _matchers[key] = ExcludeMatcher(key)
+        return matcher
 
 
 def is_audio_service(session):
     """True iff the session's process is a Chromium audio-service utility
-    process. cmdline() is a per-process syscall and this runs on the 200ms
-    enforcement tick, so results are cached per (pid, create_time). Any
-    failure (process gone, AccessDenied) returns False — the session stays
+    process. Read from the process index, so cmdline() runs once per process.
+    Any failure (process gone, AccessDenied) returns False — the session stays
     excluded, which is the voice-safe fallback."""
     try:
-        proc = session.Process
-        pid = proc.pid
-        created = proc.create_time()
-        cached = _audio_service_cache.get(pid)
-        if cached and cached[0] == created:
-            return cached[1]
-        result = any(_AUDIO_SERVICE_ARG in arg for arg in proc.cmdline())
-        if len(_audio_service_cache) > 64:  # bound growth from dead PIDs
-            _audio_service_cache.clear()
-        _audio_service_cache[pid] = (created, result)
-        return result
+        return _describe(session).audio_service
     except Exception:
         return False
 
 
-def get_all_sessions(force=False):
-    """Return cached audio sessions, re-enumerating if stale or forced."""
-    global _sessions, _ts
-    now = time.monotonic()
-    with _lock:
-        if force or now - _ts > SESSIONS_TTL:
+class SessionBackend:
+    """Source of audio sessions. Sessions are opaque to the registry; they
+    only need `.Process` and `.SimpleAudioVolume` like pycaw's AudioSession."""
+
+    def enumerate(self):
+        """Full (expensive) enumeration of the current sessions."""
+        raise NotImplementedError
+
+    def key(self, session):
+        """Stable identity of a session instance (dedupes notifications)."""
+        raise NotImplementedError
+
+    def watch(self, on_created, on_expired, on_changed):
+        """Start delivering on_created(session), on_expired(key) and
+        on_changed(key, level, muted) (session volume/mute changed, by anyone)
+        from any thread. Return False if notifications aren't supported."""
+        return False
+
+
+class PycawSessionBackend(SessionBackend):
+    """Windows backend. Session notifications are only delivered to an MTA
+    that has called GetSessionEnumerator, so registration runs on the audio
+    worker (an MTA thread that lives as long as the plugin) and the callback
+    objects are kept alive here."""
+
+    def __init__(self):
+        self._callbacks = {}  # key -> AudioSessionEvents kept alive for its session
+
+    def enumerate(self):
+        from pycaw.pycaw import AudioUtilities
+        return AudioUtilities.GetAllSessions()
+
+    def key(self, session):
+        return session.InstanceIdentifier
+
+    def watch(self, on_created, on_expired, on_changed):
+        try:
+            return get_audio_worker().call(self._register, on_created, on_expired, on_changed)
+        except Exception as e:
+            Logger.error(f"[AudioSessions] session notifications unavailable: {e}")
+            return False
+
+    def _register(self, on_created, on_expired, on_changed):
+        from pycaw.pycaw import AudioUtilities
+        from pycaw.callbacks import AudioSessionEvents, AudioSessionNotification
+
+        backend = self
+
+        class _Events(AudioSessionEvents):
+            def __init__(self, key):
+                super().__init__()
+                self.key = key
+
+            def on_state_changed(self, new_state, new_state_id):
+                if new_state == "Expired":
+                    backend._callbacks.pop(self.key, None)
+                    on_expired(self.key)
+
+            def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+                backend._callbacks.pop(self.key, None)
+                on_expired(self.key)
+
+            def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+                on_changed(self.key, new_volume, bool(new_mute))
+
+        def track(session):
+            key = self.key(session)
+            if key not in self._callbacks:
+                events = _Events(key)
+                session.register_notification(events)
+                self._callbacks[key] = events
+            on_created(session)
+
+        def track_new(session):
             try:
-                _sessions = AudioUtilities.GetAllSessions()
-                _ts = now
+                track(session)
             except Exception as e:
-                Logger.error(f"[AudioSessions] GetAllSessions failed: {e}")
-                _sessions = []
-                _ts = 0.0
-        return list(_sessions)
+                Logger.warning(f"[AudioSessions] new session not tracked: {e}")
+
+        class _Created(AudioSessionNotification):
+            def on_session_created(self, new_session):
+                # arrives on a COM notification thread; registering events is
+                # a COM call, so hand it to the worker (same MTA, no marshalling)
+                get_audio_worker().submit(track_new, new_session)
+
+        mgr = AudioUtilities.GetAudioSessionManager()
+        created = _Created()
+        mgr.RegisterSessionNotification(created)
+        # notifications only start once the enumerator has been requested;
+        # also registers expiry events for everything already playing
+        enumerator = mgr.GetSessionEnumerator()
+        for s in AudioUtilities.GetAllSessions():
+            try:
+                track(s)
+            except Exception:
+                continue
+        self._keepalive = (mgr, created, enumerator)
+        return True
+
+
+class AudioSessionRegistry:
+    """Current audio sessions, enumerated once and kept up to date by the
+    backend's created/expired notifications."""
+
+    def __init__(self, backend: SessionBackend):
+        self._backend = backend
+        self._lock = threading.RLock()
+        self._sessions = {}      # key -> session, in discovery order
+        self._info = {}          # key -> SessionInfo (filled lazily, once per session)
+        self._started = False
+        self._watching = False
+        self._ts = 0.0           # last full enumeration
+        self.stats = {"enumerations": 0, "created": 0, "expired": 0}
+        self._listeners = []     # cb(event, key, *args): "created" / "expired" / "changed"
+
+    def sessions(self, force=False):
+        """Snapshot of the known sessions; re-enumerates only when forced,
+        when the safety-net resync is due, or (without notifications) when
+        the TTL lapsed."""
+        self._refresh(force)
+        with self._lock:
+            return list(self._sessions.values())
+
+    def infos(self, force=False):
+        """SessionInfo for every known session; metadata is computed only for
+        sessions not described yet. Sessions whose process can't be queried
+        are left out (and retried next call)."""
+        self._refresh(force)
+        with self._lock:
+            pairs = list(self._sessions.items())
+            known = dict(self._info)
+        result = []
+        for key, s in pairs:
+            info = known.get(key)
+            if info is None:
+                try:
+                    info = _describe(s)
+                except Exception:
+                    continue
+                info.key = key
+                with self._lock:
+                    if key in self._sessions:
+                        self._info[key] = info
+            result.append(info)
+        return result
+
+    def _refresh(self, force):
+        """Re-enumerate if due. Enumeration is a COM call, so it runs on the
+        audio worker; callers never wait for it while holding the registry
+        lock (the worker may be inside infos() itself, waiting for it)."""
+        if not self._due(force):
+            return
+        try:
+            get_audio_worker().call(self._refresh_now, force)
+        except Exception as e:
+            Logger.error(f"[AudioSessions] refresh failed: {e}")
+
+    def _due(self, force):
+        age = time.monotonic() - self._ts
+        return (force or not self._started or age > RESYNC_S
+                or (not self._watching and age > SESSIONS_TTL))
+
+    def _refresh_now(self, force):
+        with self._lock:
+            if not self._due(force):
+                return  # a call queued just ahead of this one already did it
+            if not self._started:
+                self._start()
+            else:
+                self._resync()
+
+    def _start(self):
+        self._started = True
+        self._resync()
+        try:
+            self._watching = bool(self._backend.watch(
+                self._on_created, self._on_expired, self._on_changed))
+        except Exception as e:
+            Logger.error(f"[AudioSessions] watch failed: {e}")
+            self._watching = False
+        if not self._watching:
+            Logger.warning(f"[AudioSessions] No session notifications; polling every {SESSIONS_TTL}s")
+
+    def _resync(self):
+        try:
+            fresh = self._backend.enumerate()
+        except Exception as e:
+            Logger.error(f"[AudioSessions] GetAllSessions failed: {e}")
+            self._sessions = {}
+            self._ts = 0.0
+            return
+        self.stats["enumerations"] += 1
+        sessions = {}
+        for s in fresh:
+            try:
+                key = self._backend.key(s)
+            except Exception:
+                continue
+            # keep the object we already hold so its cached interfaces survive
+            sessions[key] = self._sessions.get(key, s)
+        self._sessions = sessions
+        self._info = {k: v for k, v in self._info.items() if k in sessions}
+        self._ts = time.monotonic()
+        _evict_dead_processes()
+
+    def add_listener(self, cb):
+        """cb(event, key, *args) on session changes: ("created", key),
+        ("expired", key), ("changed", key, level, muted). Called on the
+        notification thread — keep it cheap."""
+        with self._lock:
+            if cb not in self._listeners:
+                self._listeners.append(cb)
+
+    def remove_listener(self, cb):
+        with self._lock:
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+    def _emit(self, event, key, *args):
+        with self._lock:
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(event, key, *args)
+            except Exception as e:
+                Logger.error(f"[AudioSessions] listener error: {e}")
+
+    def _on_created(self, session):
+        try:
+            key = self._backend.key(session)
+        except Exception:
+            return
+        with self._lock:
+            if key in self._sessions:
+                return
+            self._sessions[key] = session
+            self.stats["created"] += 1
+        self._emit("created", key)
+
+    def _on_expired(self, key):
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self.stats["expired"] += 1
+            self._info.pop(key, None)
+        _evict_dead_processes()
+        self._emit("expired", key)
+
+    def _on_changed(self, key, level, muted):
+        self._emit("changed", key, level, muted)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> AudioSessionRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AudioSessionRegistry(PycawSessionBackend())
+        return _registry
+
+
+def set_backend(backend: SessionBackend) -> AudioSessionRegistry:
+    """Swap in a different backend (e.g. the simulated one) with a fresh registry."""
+    global _registry
+    with _registry_lock:
+        _registry = AudioSessionRegistry(backend)
+        return _registry
+
+
+def get_all_sessions(force=False):
+    """Return the registry's current sessions, re-enumerating only if forced."""
+    return get_registry().sessions(force)
 
 
 def sessions_for_process(names, force=False):
     """Sessions whose process basename is in `names` (case-insensitive set)."""
     wanted = {n.lower() for n in names}
-    matched = []
-    for s in get_all_sessions(force):
-        try:
-            if s.Process and os.path.basename(s.Process.name()).lower() in wanted:
-                matched.append(s)
-        except Exception:
-            continue
-    return matched
+    return [i.session for i in get_registry().infos(force) if i.basename in wanted]
+
+
+def infos_excluding(rules, force=False):
+    """SessionInfo for every session sessions_excluding() would return."""
+    matcher = compile_excludes(rules)
+    return [i for i in get_registry().infos(force) if not i.excluded_by(matcher)]
 
 
-def sessions_excluding(names, force=False):
-    """Sessions whose process basename is NOT in `names` (case-insensitive).
-    Sessions without a process (system sounds) are included.
+def sessions_excluding(rules, force=False):
+    """Sessions not matched by the exclude `rules` (exe names, globs and
+    tree: rules, see ExcludeMatcher). Sessions without a process (system
+    sounds) are included.
 
     Carve-out: for VOICE_SPLIT_APPS, only the voice session is excluded — the
     app's audio-service session (videos, pings, UI sounds) is still returned."""
-    excluded = {n.lower() for n in names}
-    matched = []
-    for s in get_all_sessions(force):
-        try:
-            if s.Process:
-                basename = os.path.basename(s.Process.name()).lower()
-                if basename in excluded and not (
-                    basename in VOICE_SPLIT_APPS and is_audio_service(s)
-                ):
-                    continue
-            matched.append(s)
-        except Exception:
-            continue
-    return matched
+    return [i.session for i in infos_excluding(rules, force)]
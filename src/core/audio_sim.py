@@ -0,0 +1,348 @@
+"""In-memory stand-ins for the Windows audio backends.
+
+Lets the audio registries and controllers run, be checked and be benchmarked
+on Linux: sessions are plain objects shaped like pycaw's AudioSession (a
+psutil-like `.Process` and an ISimpleAudioVolume-like `.SimpleAudioVolume`),
+endpoints are IAudioEndpointVolume look-alikes, peak meters read a scripted
+`.peak` off either, and every simulated COM call or process query is counted
+in `backend.calls` so optimisations can be measured as "calls saved".
+"""
+
+import collections
+import itertools
+import threading
+import time
+
+from .audio_sessions import SessionBackend, _AUDIO_SERVICE_ARG
+from .audio_devices import DeviceBackend, DeviceInfo, RENDER, CAPTURE
+from .audio_meters import MeterBackend
+
+_pids = itertools.count(1000)
+
+
+def _spin(seconds):
+    """Busy-wait: sleep() is far too coarse for microsecond call costs."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class SimProcess:
+    """psutil.Process look-alike."""
+
+    def __init__(self, name, pid=None, cmdline=None, parent=None, calls=None):
+        self._calls = calls if calls is not None else collections.Counter()
+        self._name = name
+        self.pid = pid if pid is not None else next(_pids)
+        self._created = time.time()
+        self._cmdline = cmdline or [name]
+        self._parent = parent
+        self.alive = True
+
+    def name(self):
+        self._calls["Process.name"] += 1
+        return self._name
+
+    def create_time(self):
+        return self._created
+
+    def cmdline(self):
+        self._calls["Process.cmdline"] += 1
+        return list(self._cmdline)
+
+    def ppid(self):
+        return self._parent.pid if self._parent else 0
+
+    def parent(self):
+        self._calls["Process.parent"] += 1
+        return self._parent
+
+    def is_running(self):
+        return self.alive
+
+
+class SimVolume:
+    """ISimpleAudioVolume look-alike; counts every call on the backend."""
+
+    def __init__(self, backend, key, level=1.0, muted=False):
+        self._backend = backend
+        self._key = key
+        self.level = level
+        self.muted = muted
+
+    def GetMasterVolume(self):
+        self._backend._call("GetMasterVolume")
+        return self.level
+
+    def SetMasterVolume(self, level, context):
+        self._backend._call("SetMasterVolume")
+        self.level = float(level)
+        self._backend._changed(self._key, self.level, self.muted)
+
+    def GetMute(self):
+        self._backend._call("GetMute")
+        return 1 if self.muted else 0
+
+    def SetMute(self, muted, context):
+        self._backend._call("SetMute")
+        self.muted = bool(muted)
+        self._backend._changed(self._key, self.level, self.muted)
+
+
+class SimSession:
+    """pycaw AudioSession look-alike."""
+
+    def __init__(self, backend, process=None, level=1.0, muted=False):
+        self.key = f"sim-{next(_pids)}"
+        self.Process = process
+        self.ProcessId = process.pid if process else 0
+        self.SimpleAudioVolume = SimVolume(backend, self.key, level, muted)
+        self.peak = 0.0  # what its meter reads (SimulatedMeterBackend)
+
+
+class SimulatedSessionBackend(SessionBackend):
+    """Scriptable session source. `enumerate_cost_s` / `call_cost_s` make
+    enumeration and per-session volume calls as slow as the real COM calls
+    for timing comparisons."""
+
+    def __init__(self, enumerate_cost_s=0.0, notifications=True, call_cost_s=0.0):
+        self.enumerate_cost_s = enumerate_cost_s
+        self.call_cost_s = call_cost_s
+        self.notifications = notifications
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._on_created = None
+        self._on_expired = None
+        self._on_changed = None
+
+    @property
+    def enumerations(self):
+        return self.calls["enumerate"]
+
+    # ------------------------------------------------------------ scripting
+
+    def add(self, name=None, audio_service=False, level=1.0, muted=False, parent=None):
+        """Start a session for a new process `name` (None = system sounds)."""
+        process = None
+        if name is not None:
+            cmdline = [name] + ([_AUDIO_SERVICE_ARG] if audio_service else [])
+            process = SimProcess(name, cmdline=cmdline, parent=parent, calls=self.calls)
+        session = SimSession(self, process, level, muted)
+        with self._lock:
+            self._sessions[session.key] = session
+            callback = self._on_created
+        if callback:
+            callback(session)
+        return session
+
+    def remove(self, session):
+        """Expire a session (and mark its process dead)."""
+        with self._lock:
+            self._sessions.pop(session.key, None)
+            callback = self._on_expired
+        if session.Process:
+            session.Process.alive = False
+        if callback:
+            callback(session.key)
+
+    def external_set(self, session, level=None, muted=None):
+        """Another app (or the Windows mixer) changes a session — not counted
+        as one of our calls, but notified like any change."""
+        vol = session.SimpleAudioVolume
+        if level is not None:
+            vol.level = float(level)
+        if muted is not None:
+            vol.muted = bool(muted)
+        self._changed(session.key, vol.level, vol.muted)
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.call_cost_s:
+            _spin(self.call_cost_s)
+
+    def _changed(self, key, level, muted):
+        callback = self._on_changed
+        if callback:
+            callback(key, level, muted)
+
+    # -------------------------------------------------------------- backend
+
+    def enumerate(self):
+        self.calls["enumerate"] += 1
+        if self.enumerate_cost_s:
+            _spin(self.enumerate_cost_s)
+        with self._lock:
+            return list(self._sessions.values())
+
+    def key(self, session):
+        return session.key
+
+    def watch(self, on_created, on_expired, on_changed):
+        if not self.notifications:
+            return False
+        with self._lock:
+            self._on_created, self._on_expired = on_created, on_expired
+            self._on_changed = on_changed
+        return True
+
+
+class SimEndpointVolume:
+    """IAudioEndpointVolume look-alike; every change notifies its watchers
+    (synchronously — on Windows they arrive on a COM thread)."""
+
+    def __init__(self, backend, level=0.5, muted=False):
+        self._backend = backend
+        self.level = level
+        self.muted = muted
+        self.watchers = []
+        self.peak = 0.0  # what its meter reads (SimulatedMeterBackend)
+
+    def GetMasterVolumeLevelScalar(self):
+        self._backend._call("GetMasterVolumeLevelScalar")
+        return self.level
+
+    def SetMasterVolumeLevelScalar(self, level, context):
+        self._backend._call("SetMasterVolumeLevelScalar")
+        self.level = float(level)
+        self._notify()
+
+    def GetMute(self):
+        self._backend._call("GetMute")
+        return 1 if self.muted else 0
+
+    def SetMute(self, muted, context):
+        self._backend._call("SetMute")
+        self.muted = bool(muted)
+        self._notify()
+
+    def _notify(self):
+        for cb in list(self.watchers):
+            cb(self.level, self.muted)
+
+
+class SimulatedDeviceBackend(DeviceBackend):
+    """Scriptable endpoints: starts with a default output "speakers" and a
+    default microphone "mic". Device and volume notifications can be turned
+    off separately to exercise the polling fallbacks."""
+
+    def __init__(self, notifications=True, volume_notifications=True, call_cost_s=0.0):
+        self.notifications = notifications
+        self.volume_notifications = volume_notifications
+        self.call_cost_s = call_cost_s
+        self.calls = collections.Counter()
+        self.endpoints = {}      # id -> SimEndpointVolume
+        self.infos = {}          # id -> DeviceInfo
+        self.defaults = {RENDER: None, CAPTURE: None}
+        self._callbacks = None   # (on_default_changed, on_added, on_removed)
+        self.add_device("speakers", RENDER, "Speakers")
+        self.add_device("mic", CAPTURE, "Microphone", level=0.8)
+
+    # ------------------------------------------------------------ scripting
+
+    def add_device(self, device_id, flow=RENDER, name=None, level=0.5, muted=False):
+        """Plug in a device; it becomes the default if its flow has none."""
+        self.endpoints[device_id] = SimEndpointVolume(self, level, muted)
+        self.infos[device_id] = DeviceInfo(device_id, name or device_id, flow)
+        if self._callbacks:
+            self._callbacks[1](device_id)
+        if self.defaults[flow] is None:
+            self.set_default(device_id)
+        return self.endpoints[device_id]
+
+    def remove_device(self, device_id):
+        """Unplug a device; the default falls back to another of its flow."""
+        info = self.infos.pop(device_id)
+        self.endpoints.pop(device_id)
+        if self._callbacks:
+            self._callbacks[2](device_id)
+        if self.defaults[info.flow] == device_id:
+            others = [i for i, d in self.infos.items() if d.flow == info.flow]
+            self.set_default(others[0] if others else None, info.flow)
+
+    def set_default(self, device_id, flow=None):
+        flow = flow or self.infos[device_id].flow
+        self.defaults[flow] = device_id
+        if self._callbacks:
+            self._callbacks[0](flow, device_id)
+
+    def external_set(self, level=None, muted=None, device_id=None):
+        """The mixer / media keys change a device — not one of our calls."""
+        endpoint = self.endpoints[device_id or self.defaults[RENDER]]
+        if level is not None:
+            endpoint.level = float(level)
+        if muted is not None:
+            endpoint.muted = bool(muted)
+        endpoint._notify()
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.call_cost_s:
+            _spin(self.call_cost_s)
+
+    # -------------------------------------------------------------- backend
+
+    def enumerate(self):
+        self._call("EnumAudioEndpoints")
+        for _ in self.infos:
+            self._call("CreateDevice")
+        return list(self.infos.values())
+
+    def default_id(self, flow):
+        self._call("GetDefaultAudioEndpoint")
+        return self.defaults[flow]
+
+    def activate(self, device_id):
+        self._call("Activate")
+        return self.endpoints[device_id]
+
+    def watch(self, on_default_changed, on_added, on_removed):
+        if not self.notifications:
+            return False
+        self._callbacks = (on_default_changed, on_added, on_removed)
+        return True
+
+    def watch_volume(self, endpoint, on_changed):
+        if not self.volume_notifications:
+            return None
+        endpoint.watchers.append(on_changed)
+        return on_changed
+
+    def unwatch_volume(self, endpoint, token):
+        if token in endpoint.watchers:
+            endpoint.watchers.remove(token)
+
+
+class SimMeter:
+    """IAudioMeterInformation look-alike reading a `.peak` attribute."""
+
+    def __init__(self, backend, source):
+        self._backend = backend
+        self._source = source
+
+    def GetPeakValue(self):
+        self._backend._call("GetPeakValue")
+        return self._source.peak
+
+
+class SimulatedMeterBackend(MeterBackend):
+    """Meters over a SimulatedDeviceBackend's endpoints and simulated
+    sessions: script levels by setting `.peak` on an endpoint or session."""
+
+    def __init__(self, devices, call_cost_s=0.0):
+        self.devices = devices
+        self.call_cost_s = call_cost_s
+        self.calls = collections.Counter()
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.call_cost_s:
+            _spin(self.call_cost_s)
+
+    def endpoint_meter(self, device_id):
+        self._call("Activate(IAudioMeterInformation)")
+        return SimMeter(self, self.devices.endpoints[device_id])
+
+    def session_meter(self, session):
+        self._call("QueryInterface(IAudioMeterInformation)")
+        return SimMeter(self, session)
@@ -0,0 +1,132 @@
+"""The audio service thread: the only thread that touches COM.
+
+COM used to be initialized wherever an action happened to be constructed
+(Volume/GameVolume __init__ on the websocket thread) and again on the timer
+thread, and pycaw objects created on one thread were then called from the
+other. Every such call is marshalled across apartments — slow, and a source
+of the transient RPC failures the retry loops were papering over.
+
+Now one daemon thread ("audio-com") joins the multithreaded apartment once
+and owns every pycaw object. Other threads hand it commands through a queue
+and get a concurrent.futures.Future back:
+
+    worker = get_audio_worker()
+    future = worker.submit(vol.GetMasterVolume)        # async
+    level = worker.call(vol.GetMasterVolume)           # submit + wait
+    worker.submit(write, level, key="dial")            # coalesced: a newer
+                                                       # "dial" replaces a
+                                                       # still-queued one
+    worker.batch([(vol.GetMasterVolume,), (vol.GetMute,)])  # one command
+
+The worker drains everything queued per wake-up and runs it back to back, so
+a burst of commands costs one hand-off. call() made from the worker itself
+runs inline, so code that already runs there (an enforcement pass calling
+into the session registry) can use the same API without deadlocking.
+
+The MTA is also where session / endpoint notifications are registered (see
+audio_sessions.py): notification threads live in the same apartment, so the
+objects they hand over are used without marshalling.
+"""
+
+import collections
+import threading
+from concurrent.futures import Future
+
+CALL_TIMEOUT_S = 5.0  # call() gives up (TimeoutError) if the worker is wedged
+
+
+class AudioWorker:
+    def __init__(self, name="audio-com"):
+        self._name = name
+        self._cond = threading.Condition()
+        self._queue = collections.deque()   # [key, fn, args, future]
+        self._keyed = {}                    # key -> queued entry, for coalescing
+        self._thread = None
+        self.stats = {"commands": 0, "batches": 0, "coalesced": 0}
+
+    # ------------------------------------------------------------------ API
+
+    def in_worker(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, key=None) -> Future:
+        """Queue fn(*args) for the worker. With `key`, a command still queued
+        under the same key is replaced (its future resolves with the newer
+        command's result) instead of running twice."""
+        with self._cond:
+            self._ensure_started()
+            if key is not None and key in self._keyed:
+                entry = self._keyed[key]
+                entry[1], entry[2] = fn, args
+                self.stats["coalesced"] += 1
+                return entry[3]
+            entry = [key, fn, args, Future()]
+            self._queue.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            self._cond.notify()
+            return entry[3]
+
+    def call(self, fn, *args, timeout=CALL_TIMEOUT_S):
+        """Run fn(*args) on the worker and return (or raise) its result."""
+        if self.in_worker():
+            return fn(*args)
+        return self.submit(fn, *args).result(timeout)
+
+    def batch(self, calls, key=None) -> Future:
+        """Run [(fn, *args), ...] back to back as ONE command. The future
+        resolves to a list with each call's result, or the exception it
+        raised — one failing session doesn't sink the rest."""
+        calls = [tuple(c) for c in calls]
+
+        def run():
+            results = []
+            for fn, *args in calls:
+                try:
+                    results.append(fn(*args))
+                except Exception as e:
+                    results.append(e)
+            return results
+        return self.submit(run, key=key)
+
+    # ------------------------------------------------------------ internals
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            import comtypes
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        except Exception:
+            pass
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                entries = list(self._queue)
+                self._queue.clear()
+                self._keyed.clear()
+            self.stats["batches"] += 1
+            for _, fn, args, future in entries:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self.stats["commands"] += 1
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:  # keep the thread alive whatever happens
+                    future.set_exception(e)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_audio_worker() -> AudioWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = AudioWorker()
+        return _worker
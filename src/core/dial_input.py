@@ -0,0 +1,158 @@
+"""Plugin-wide dial input coalescing with velocity-aware stepping.
+
+A fast spin sends dozens of dialRotate messages a second, and every one used
+to reach the action's on_dial_rotate separately — one volume read-modify-
+write (or Discord RPC write) per tick. DialInput sits between the websocket
+and the actions:
+
+- The first tick of a burst is delivered at once, on the websocket thread,
+  so a single click feels instant.
+- Ticks arriving while the burst's window (window_ms) is open are summed per
+  context and delivered as ONE dialRotate with the total, at the end of the
+  window, from the "dial-input" thread. Windows keep rolling while the knob
+  keeps turning; the burst ends after a window with no ticks.
+- Actions that opt in (DIAL_ACCELERATION = True on the class) get their
+  delivered ticks scaled by rotation speed: 1x up to ACCEL_FROM ticks/s,
+  ramping to MAX_ACCEL at ACCEL_FULL ticks/s, so a fast spin reaches the
+  target sooner while slow turns keep single-step precision.
+
+The delivered payload is the last one received with "ticks" replaced by the
+(scaled) total; "raw_ticks" carries the unscaled sum.
+
+Configurable via global settings:
+    {"dial": {"window_ms": 30, "acceleration": true}}
+"""
+
+import collections
+import threading
+import time
+
+from .logger import Logger
+
+WINDOW_MS = 30
+VELOCITY_S = 0.25      # rotation speed is measured over this trailing span
+ACCEL_FROM = 8.0       # ticks/s — slower turns are never scaled
+ACCEL_FULL = 40.0      # ticks/s — MAX_ACCEL from here on
+MAX_ACCEL = 4.0
+
+
+class _Burst:
+    __slots__ = ("ticks", "payload", "deadline", "accelerate", "history")
+
+    def __init__(self, accelerate):
+        self.ticks = 0
+        self.payload = None
+        self.deadline = 0.0
+        self.accelerate = accelerate
+        self.history = collections.deque()  # (monotonic, |ticks|)
+
+
+def acceleration(ticks_per_s):
+    """Step multiplier for a rotation speed."""
+    if ticks_per_s <= ACCEL_FROM:
+        return 1.0
+    ramp = min(1.0, (ticks_per_s - ACCEL_FROM) / (ACCEL_FULL - ACCEL_FROM))
+    return 1.0 + ramp * (MAX_ACCEL - 1.0)
+
+
+class DialInput:
+    def __init__(self, deliver):
+        self._deliver = deliver          # deliver(context, payload)
+        self.window_s = WINDOW_MS / 1000.0
+        self.accelerate = True
+        self._cond = threading.Condition()
+        self._bursts = {}                # context -> _Burst (window open)
+        self._thread = None
+        self.stats = {"events": 0, "deliveries": 0}
+
+    def load(self, settings):
+        dial = (settings or {}).get("dial") or {}
+        try:
+            if "window_ms" in dial:
+                self.window_s = max(0.0, float(dial["window_ms"])) / 1000.0
+            if "acceleration" in dial:
+                self.accelerate = bool(dial["acceleration"])
+        except (TypeError, ValueError):
+            Logger.warning(f"[DialInput] Bad dial settings: {dial!r}")
+
+    def push(self, context, payload, accelerate=False):
+        """One dialRotate message for `context`."""
+        ticks = payload.get("ticks", 0)
+        if not ticks:
+            return
+        now = time.monotonic()
+        with self._cond:
+            self.stats["events"] += 1
+            burst = self._bursts.get(context)
+            if burst is None or not self.window_s:
+                # leading edge: deliver now, open a window for what follows
+                burst = _Burst(accelerate and self.accelerate)
+                self._note(burst, now, ticks)
+                out = self._scaled(burst, payload, ticks, now)
+                if self.window_s:
+                    burst.deadline = now + self.window_s
+                    self._bursts[context] = burst
+                    self._ensure_started()
+                    self._cond.notify()
+                self.stats["deliveries"] += 1
+            else:
+                self._note(burst, now, ticks)
+                burst.ticks += ticks
+                burst.payload = payload
+                return
+        self._call(context, out)
+
+    # ------------------------------------------------------------ internals
+
+    @staticmethod
+    def _note(burst, now, ticks):
+        burst.history.append((now, abs(ticks)))
+        while burst.history and now - burst.history[0][0] > VELOCITY_S:
+            burst.history.popleft()
+
+    @staticmethod
+    def _scaled(burst, payload, ticks, now):
+        out = dict(payload)
+        out["raw_ticks"] = ticks
+        if burst.accelerate:
+            speed = sum(n for _, n in burst.history) / VELOCITY_S
+            factor = acceleration(speed)
+            if factor > 1.0:
+                scaled = int(round(ticks * factor))
+                out["ticks"] = scaled if scaled else ticks
+        return out
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="dial-input")
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._bursts:
+                    self._cond.wait()
+                now = time.monotonic()
+                soonest = min(b.deadline for b in self._bursts.values())
+                if soonest > now:
+                    self._cond.wait(soonest - now)
+                    continue
+                deliveries = []
+                for context, burst in list(self._bursts.items()):
+                    if burst.deadline > now:
+                        continue
+                    if burst.ticks:
+                        deliveries.append((context, self._scaled(burst, burst.payload, burst.ticks, now)))
+                        burst.ticks = 0
+                        burst.deadline = now + self.window_s
+                    else:
+                        del self._bursts[context]  # a quiet window ends the burst
+                self.stats["deliveries"] += len(deliveries)
+            for context, payload in deliveries:
+                self._call(context, payload)
+
+    def _call(self, context, payload):
+        try:
+            self._deliver(context, payload)
+        except Exception as e:
+            Logger.error(f"[DialInput] dialRotate handler failed for {context}: {e}")
@@ -0,0 +1,368 @@
+r"""Byte transports for the Discord local RPC (see discord_rpc.py).
+
+Discord listens on `discord-ipc-0` … `discord-ipc-9`:
+    Windows         named pipes \\.\pipe\discord-ipc-N
+    Linux / macOS   Unix sockets in $XDG_RUNTIME_DIR, $TMPDIR, $TMP, $TEMP or
+                    /tmp (also the Flatpak / Snap subdirectories there)
+
+A transport only moves bytes. Framing (pack_frame / FrameReader) is here
+too; the request layer and the connection state machine stay in DiscordRPC
+and are identical on every platform.
+Interface (all calls from the io thread, except wake() and close()):
+
+    connect()              -> transport, or None if no Discord is listening
+    write(data)            send all of `data`
+    read_available()       the bytes readable right now (b"" if none); never
+                           blocks; raises ConnectionError once the peer closed
+    wait(timeout)          block until bytes may be readable, wake() is
+                           called, or `timeout` (None = no timeout) passes
+    wake()                 end a wait() now, or the next one if none is
+                           running; from any thread
+    close()                drop the connection; idempotent, from any thread;
+                           wakes the io thread
+    release()              io thread, after its last wait(): free the wait
+                           handles
+
+Both transports block on readiness (an overlapped read's event on Windows, a
+selector on sockets) next to a wakeup handle, so an idle connection costs
+no CPU and a queued frame goes out at once.
+
+Both connect()s try the endpoint that answered last time first: Discord
+keeps its slot while it runs, so a reconnect usually opens on the first try.
+
+Errors surface as ConnectionError / OSError so callers need no pywin32 types.
+set_transport_factory() swaps in another transport (e.g. a socket to a local
+stand-in server) for tools.
+"""
+
+import json
+import os
+import selectors
+import socket
+import struct
+import sys
+
+IPC_NAME = "discord-ipc-{}"
+PIPE_PATH = r"\\.\pipe\discord-ipc-{}"
+IPC_SLOTS = 10
+READ_CHUNK = 65536
+# Flatpak / Snap Discord put their socket one level down
+_UNIX_SUBDIRS = ("", "app/com.discordapp.Discord", "snap.discord", "snap.discord-canary")
+
+HEADER = struct.Struct("<II")   # opcode, body length
+MAX_FRAME = 16 * 1024 * 1024    # a longer "length" means the stream is garbage
+
+
+def pack_frame(op, payload):
+    data = json.dumps(payload).encode("utf-8")
+    return HEADER.pack(op, len(data)) + data
+
+
+class FrameReader:
+    """Incremental frame parser over one reusable buffer.
+
+    feed() appends; frames() decodes complete frames at a read cursor,
+    straight from memoryview slices (no per-frame bytes copy, no shifting the
+    buffer after every frame). Consumed bytes are dropped only once the
+    cursor passes COMPACT_AT or the buffer is drained, so a burst costs
+    O(bytes) however many frames it holds.
+
+    A malformed stream (bad length, UTF-8 or JSON) raises ConnectionError:
+    framing can't resync, the connection has to go."""
+
+    COMPACT_AT = READ_CHUNK
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0   # read cursor
+
+    def __len__(self):
+        return len(self._buf) - self._pos
+
+    def feed(self, data):
+        if not data:
+            return
+        if self._pos >= self.COMPACT_AT or self._pos == len(self._buf):
+            del self._buf[:self._pos]
+            self._pos = 0
+        self._buf += data
+
+    def frames(self):
+        """Yield (op, message) for every complete frame buffered."""
+        buf = self._buf
+        while len(buf) - self._pos >= HEADER.size:
+            op, length = HEADER.unpack_from(buf, self._pos)
+            if length > MAX_FRAME:
+                raise ConnectionError(f"bad frame length {length}")
+            body = self._pos + HEADER.size
+            stop = body + length
+            if stop > len(buf):
+                break
+            try:
+                # the view is a temporary: gone before feed() resizes buf
+                msg = json.loads(str(memoryview(buf)[body:stop], "utf-8"))
+            except ValueError as e:
+                raise ConnectionError(f"malformed frame: {e}")
+            self._pos = stop
+            yield op, msg
+
+
+class PipeTransport:
+    """Windows named pipe opened for overlapped I/O. One read is always
+    outstanding: its event is the readiness wait() blocks on, next to an
+    auto-reset wakeup event. Writes are overlapped too and never wait behind
+    the read (a synchronous handle would serialize them)."""
+
+    last_slot = None  # slot of the last successful connect; probed first
+
+    def __init__(self, handle):
+        import pywintypes
+        import win32event
+        import win32file
+        self._handle = handle
+        self._wake_event = win32event.CreateEvent(None, False, False, None)
+        self._read_ov = pywintypes.OVERLAPPED()
+        self._read_ov.hEvent = win32event.CreateEvent(None, True, False, None)
+        self._write_ov = pywintypes.OVERLAPPED()
+        self._write_ov.hEvent = win32event.CreateEvent(None, True, False, None)
+        self._buffer = win32file.AllocateReadBuffer(READ_CHUNK)
+        self._reading = False
+
+    @classmethod
+    def connect(cls):
+        import pywintypes
+        import win32file
+        for i in _preferred_first(range(IPC_SLOTS), cls.last_slot):
+            try:
+                handle = win32file.CreateFile(
+                    PIPE_PATH.format(i),
+                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+                    0, None, win32file.OPEN_EXISTING, win32file.FILE_FLAG_OVERLAPPED, None)
+            except pywintypes.error:
+                continue
+            cls.last_slot = i
+            return cls(handle)
+        return None
+
+    def _checked(self):
+        handle = self._handle
+        if handle is None:
+            raise ConnectionError("pipe closed")
+        return handle
+
+    def write(self, data):
+        import pywintypes
+        import win32file
+        handle = self._checked()
+        try:
+            win32file.WriteFile(handle, data, self._write_ov)
+            win32file.GetOverlappedResult(handle, self._write_ov, True)
+        except pywintypes.error as e:
+            raise ConnectionError(f"pipe write failed: {e}")
+
+    def _start_read(self, handle):
+        import win32file
+        # completes now or later; the event says which
+        win32file.ReadFile(handle, self._buffer, self._read_ov)
+        self._reading = True
+
+    def read_available(self):
+        import pywintypes
+        import win32event
+        import win32file
+        handle = self._checked()
+        chunks = []
+        try:
+            while True:
+                if not self._reading:
+                    self._start_read(handle)
+                if win32event.WaitForSingleObject(self._read_ov.hEvent, 0) != win32event.WAIT_OBJECT_0:
+                    break
+                n = win32file.GetOverlappedResult(handle, self._read_ov, False)
+                self._reading = False
+                chunks.append(bytes(self._buffer[:n]))
+        except pywintypes.error as e:
+            raise ConnectionError(f"pipe read failed: {e}")
+        return b"".join(chunks)
+
+    def wait(self, timeout):
+        import pywintypes
+        import win32event
+        try:
+            if not self._reading:
+                self._start_read(self._checked())
+            win32event.WaitForMultipleObjects(
+                [self._read_ov.hEvent, self._wake_event], False,
+                win32event.INFINITE if timeout is None else max(0, int(timeout * 1000)))
+        except (pywintypes.error, ConnectionError):
+            pass  # closed under us; the next read reports it
+
+    def wake(self):
+        try:
+            import win32event
+            win32event.SetEvent(self._wake_event)
+        except Exception:
+            pass  # released: nobody left to wake
+
+    def close(self):
+        handle, self._handle = self._handle, None
+        if handle:
+            try:
+                import win32file
+                win32file.CloseHandle(handle)  # cancels the outstanding read
+            except Exception:
+                pass
+            self.wake()
+
+    def release(self):
+        for event in (self._wake_event, self._read_ov.hEvent, self._write_ov.hEvent):
+            try:
+                event.Close()
+            except Exception:
+                pass
+
+
+class UnixSocketTransport:
+    """Unix domain socket in non-blocking mode. wait() selects on it and on
+    one end of a socketpair that wake() writes to."""
+
+    last_path = None  # path of the last successful connect; probed first
+
+    def __init__(self, sock):
+        sock.setblocking(False)
+        self._sock = sock
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(sock, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    @staticmethod
+    def candidates():
+        """Socket paths to try, in order."""
+        roots = []
+        for var in ("XDG_RUNTIME_DIR", "TMPDIR", "TMP", "TEMP"):
+            root = os.environ.get(var)
+            if root and root not in roots:
+                roots.append(root)
+        if "/tmp" not in roots:
+            roots.append("/tmp")
+        return [os.path.join(root, sub, IPC_NAME.format(i))
+                for root in roots for sub in _UNIX_SUBDIRS for i in range(IPC_SLOTS)]
+
+    @classmethod
+    def connect(cls, paths=None):
+        for path in _preferred_first(paths or cls.candidates(), cls.last_path):
+            if not os.path.exists(path):
+                continue
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+            except OSError:
+                sock.close()  # stale socket file from a Discord that exited
+                continue
+            cls.last_path = path
+            return cls(sock)
+        return None
+
+    def _socket(self):
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("socket closed")
+        return sock
+
+    def write(self, data):
+        sock = self._socket()
+        view = memoryview(data)
+        while view:
+            try:
+                sent = sock.send(view)
+            except BlockingIOError:
+                # peer's buffer is full: wait for room, not a busy spin
+                with selectors.DefaultSelector() as sel:
+                    sel.register(sock, selectors.EVENT_WRITE)
+                    sel.select(1.0)
+                continue
+            view = view[sent:]
+
+    def read_available(self):
+        sock = self._socket()
+        chunks = []
+        while True:
+            try:
+                chunk = sock.recv(READ_CHUNK)
+            except BlockingIOError:
+                break
+            if not chunk:
+                if chunks:
+                    break  # hand over what arrived; the close shows next read
+                raise ConnectionError("Discord closed the socket")
+            chunks.append(chunk)
+            if len(chunk) < READ_CHUNK:
+                break
+        return b"".join(chunks)
+
+    def wait(self, timeout):
+        try:
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wake_r:
+                    self._drain_wakeups()
+        except (OSError, ValueError):
+            pass  # closed under us; the next read reports it
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # pipe full (a wakeup is pending anyway) or closed
+
+    def close(self):
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            sock.close()
+        except Exception:
+            pass
+        self.wake()  # the io thread may be in select(); release() frees the rest
+
+    def release(self):
+        for closeable in (self._selector, self._wake_r, self._wake_w):
+            try:
+                closeable.close()
+            except Exception:
+                pass
+
+
+def _preferred_first(endpoints, preferred):
+    endpoints = list(endpoints)
+    if preferred in endpoints:
+        endpoints.remove(preferred)
+        endpoints.insert(0, preferred)
+    return endpoints
+
+
+def default_transport():
+    return PipeTransport if sys.platform == "win32" else UnixSocketTransport
+
+
+_factory = None
+
+
+def open_transport():
+    """Connect to the first Discord IPC endpoint that answers (None = none)."""
+    return (_factory or default_transport().connect)()
+
+
+def set_transport_factory(factory):
+    """Use `factory()` instead of the platform transport (None restores it)."""
+    global _factory
+    _factory = factory
@@ -1,59 +1,84 @@
-r"""Discord local RPC client (named pipe IPC).
+"""Discord local RPC client (IPC over a named pipe / Unix socket).
 
-Talks to the running Discord desktop client over \\.\pipe\discord-ipc-N to
-read/write voice settings (output volume, deafen, mute) regardless of whether
-Discord currently has an audio session in the Windows mixer.
+Talks to the running Discord desktop client over discord-ipc-N (a named pipe
+on Windows, a Unix socket elsewhere; see discord_ipc.py) to read/write voice
+settings (output volume, deafen, mute) regardless of whether Discord
+currently has an audio session in the Windows mixer.
 
 Design notes:
 - One process-wide singleton shared by all Discord action instances
   (get_discord_rpc). Actions acquire()/release() with a listener callback.
-- Windows named pipes opened for synchronous I/O serialize on the handle: a
-  blocking ReadFile stalls every WriteFile on the same handle. So ALL pipe I/O
-  happens on ONE io thread that polls with PeekNamedPipe (never blocks on an
-  empty read) and drains an outgoing queue — writes always get through.
+- ALL IPC I/O happens on ONE io thread, which blocks on the transport's
+  readiness wait (see discord_ipc.py): it wakes when Discord sends something
+  or when another thread queues a frame or voice patch (_wake_io), and sleeps
+  otherwise — no polling, so an idle connection costs no CPU and a dial tick
+  leaves at once.
     io thread:      writes queued frames, flushes coalesced voice patches,
-                    polls+dispatches incoming frames, answers PINGs
+                    reads+dispatches incoming frames, answers PINGs
     manager thread: connection state machine + reconnect loop; drives the
-                    handshake/auth/subscribe sequence via request() (which
-                    enqueues a frame and blocks on a reply the io thread
-                    resolves — safe because manager != io thread)
-- Dial ticks update the local snapshot optimistically and redraw instantly;
-  Discord echoing our own SET back is suppressed for a short window so the
-  display doesn't stutter backwards. After the window, server state wins
-  (changes made in the Discord UI flow through).
+                    handshake/auth/subscribe sequence via request_async()
+                    (enqueues a frame, returns a Future the io thread
+                    resolves) — independent commands are pipelined, and
+                    blocking on a Future is safe because manager != io thread
+- Voice patches (dial ticks) go out as SET_VOICE_SETTINGS with at most ONE
+  in flight: everything queued while it is unanswered merges into the next
+  send. A rate-limit error re-queues the patch under any newer fields and
+  holds sends for the retry_after Discord gave (or an exponential backoff).
+- Dial ticks update the local snapshot optimistically and redraw instantly.
+  Every queued patch takes a sequence number for the fields it writes; until
+  Discord answers the SET carrying a field's newest write, server values for
+  that field predate it and are ignored, so our own echoes never pull the
+  display backwards however slow the round trip. Once answered, server
+  state wins at once (changes made in the Discord UI flow through).
+- OAuth tokens are refreshed a day before they expire on their own thread
+  (discord_tokens.TokenManager); a connect only reads the stored token.
+- Listeners never run on the thread that changed the status. _notify()
+  leaves the latest status in a per-listener mailbox (a newer one replaces
+  an undelivered one) and the "discord-notify" thread delivers it. Key
+  renders (PIL + PNG) stay off the io thread, and a burst of server updates
+  costs a render or two instead of one per update. Every change names the
+  STATUS_FIELDS it touched; a listener acquired with `fields` only hears
+  about changes to those.
+- Finding Discord: a failed attempt retries after a jittered, doubling delay
+  (RETRY_S), reset once a connection reaches READY. An applicationDidLaunch
+  for Discord (note_app_launched) retries at once and keeps retrying at the
+  shortest step for LAUNCH_WINDOW_S, while Discord starts its IPC server.
 - Discord only allows ONE connected app to write voice settings, and reverts
   them when that app disconnects — we re-seed from GET_VOICE_SETTINGS on
   every (re)connect.
 """
 
 import collections
-import json
-import struct
+import concurrent.futures
+import random
 import threading
 import time
 import uuid
 
 import requests
-import win32file
-import win32pipe
-import pywintypes
 
+from .discord_ipc import FrameReader, open_transport, pack_frame
+from .discord_tokens import TokenManager, valid_token
 from .logger import Logger
+from .power import ACTIVE
 
-TOKEN_URL = "https://discord.com/api/oauth2/token"
-REDIRECT_URI = "http://localhost"
 SCOPES = ["rpc", "rpc.voice.read", "rpc.voice.write"]
 
 # Connection states
 NO_CREDS = "no_creds"            # no client_id configured
 NEEDS_CONNECT = "needs_connect"  # creds present, user must click Connect (authorize)
-NO_DISCORD = "no_discord"        # Discord not running / pipe not found
+NO_DISCORD = "no_discord"        # Discord not running / IPC endpoint not found
 CONNECTING = "connecting"
 AWAITING_APPROVAL = "awaiting_approval"
 AUTHENTICATING = "authenticating"
 READY = "ready"
 AUTH_FAILED = "auth_failed"
 
+# What a listener can subscribe to: status() keys, with the voice snapshot's
+# keys standing for themselves ("state" is the connection state)
+STATUS_FIELDS = ("state", "detail", "user", "has_creds",
+                 "output_volume", "input_volume", "deaf", "mute")
+
 # IPC opcodes
 OP_HANDSHAKE = 0
 OP_FRAME = 1
@@ -61,10 +86,13 @@ OP_CLOSE = 2
 OP_PING = 3
 OP_PONG = 4
 
-ECHO_SUPPRESS_S = 0.3   # ignore server echo of our own writes for this long
 SEND_SPACING_S = 0.05   # min spacing between coalesced SET_VOICE_SETTINGS
+PATCH_TIMEOUT_S = 2.0   # an unanswered SET stops blocking the next after this
+BACKOFF_S = (0.25, 5.0) # rate-limit backoff without retry_after: first, max
 IDLE_GRACE_S = 3.0      # keep connection through brief profile switches
-POLL_S = 0.02           # io thread poll cadence
+RETRY_S = (0.25, 5.0)   # reconnect delay (before jitter): first, max
+LAUNCH_WINDOW_S = 30.0  # after Discord launches, retry at the first step this long
+DISCORD_APPS = ("discord.exe", "discordptb.exe", "discordcanary.exe")
 
 
 class DiscordRPCError(Exception):
@@ -78,23 +106,38 @@ class DiscordRPC:
     def __init__(self, plugin):
         self.plugin = plugin
         self._lock = threading.RLock()
+        self.tokens = TokenManager(self._creds_copy, self._store_token_response)
 
         self._creds = {}          # client_id/client_secret/access_token/refresh_token/expires_at/user
         self._state = NO_CREDS
         self._detail = ""
         self._voice = {"output_volume": 100.0, "input_volume": 100.0, "deaf": False, "mute": False}
-        self._local_ts = {}       # field -> monotonic ts of our last optimistic write
+        self._write_seq = 0       # numbers every queued voice patch
+        self._written = {}        # field -> seq of our newest write
+        self._answered = {}       # field -> newest seq Discord answered for
 
-        self._handle = None
-        self._recv_buf = bytearray()
+        self._transport = None
         self._outgoing = collections.deque()   # (op, payload) frames to write
-        self._pending = {}        # nonce -> {'event': Event, 'msg': dict|None, 'sync': bool}
+        self._pending = {}        # nonce -> Future (request_async) or None (send_async)
         self._pending_patch = {}
+        self._pending_seqs = {}   # field -> seq, for the fields in _pending_patch
+        self._inflight = None     # (nonce, patch, sent_ts, seqs) of the unanswered SET
+        self._hold_until = 0.0    # rate-limit backoff: no SET before this
+        self._backoff_s = 0.0
         self._last_send_ts = 0.0
+        self._patch_stats = collections.Counter()
+        self._power_mode = ACTIVE
         self._listeners = []
+        self._fields = {}         # listener -> frozenset of STATUS_FIELDS it hears
+        self._mail = {}           # listener -> latest undelivered status
+        self._mail_cond = threading.Condition()
+        self._notifier = None
+        self._notify_stats = collections.Counter()
         self._refcount = 0
         self._idle_timer = None
         self._suspended = True    # no actions on screen -> stay disconnected
+        self._retry_s = 0.0       # current reconnect step (0 = start over)
+        self._launch_until = 0.0  # monotonic end of the post-launch fast retries
 
         self._wake = threading.Event()
         self._conn_dead = threading.Event()
@@ -103,13 +146,17 @@ class DiscordRPC:
         self._authorize_requested = False
         self._started = False
         self._stop = False
+        self.last_connect = {}    # ms per phase of the last connect that reached READY
 
     # ------------------------------------------------------------------ API
 
-    def acquire(self, listener):
+    def acquire(self, listener, fields=None):
+        """Hold the connection open; `listener(status)` is called (on the
+        notify thread) when one of `fields` changes. None = every field."""
         with self._lock:
             if listener not in self._listeners:
                 self._listeners.append(listener)
+            self._fields[listener] = frozenset(STATUS_FIELDS if fields is None else fields)
             self._refcount += 1
             if self._idle_timer:
                 self._idle_timer.cancel()
@@ -118,6 +165,10 @@ class DiscordRPC:
             if not self._started:
                 self._started = True
                 threading.Thread(target=self._manager_loop, daemon=True, name="discord-manager").start()
+                self.tokens.start()
+                power = getattr(self.plugin, "power", None)
+                if power:
+                    power.add_listener(self._on_power_mode)
                 # plugin never fetches global settings on its own; trigger it so
                 # stored credentials arrive via didReceiveGlobalSettings
                 try:
@@ -130,6 +181,7 @@ class DiscordRPC:
         with self._lock:
             if listener in self._listeners:
                 self._listeners.remove(listener)
+                self._fields.pop(listener, None)
             self._refcount = max(0, self._refcount - 1)
             if self._refcount == 0 and not self._idle_timer:
                 self._idle_timer = threading.Timer(IDLE_GRACE_S, self._idle_shutdown)
@@ -143,9 +195,33 @@ class DiscordRPC:
                 return
             self._suspended = True
         Logger.info("[DiscordRPC] No Discord actions on screen; disconnecting")
-        self._kill_pipe()
+        self._kill_connection()
         self._wake.set()
 
+    def _on_power_mode(self, mode):
+        """On resume from idle/suspended, re-sync voice state and retry a
+        pending connect now. (The io thread sleeps on readiness, so there is
+        nothing to slow down while nobody is looking at the deck.)"""
+        previous, self._power_mode = self._power_mode, mode
+        if mode == ACTIVE and previous != ACTIVE:
+            if self._state == READY:
+                self.send_async("GET_VOICE_SETTINGS", {})
+            else:
+                self._wake.set()
+
+    def note_app_launched(self, application):
+        """applicationDidLaunch: if Discord just started, look for it now
+        instead of at the end of the current backoff."""
+        name = str(application or "").replace("\\", "/").rsplit("/", 1)[-1].lower()
+        if name not in DISCORD_APPS:
+            return
+        with self._lock:
+            self._launch_until = time.monotonic() + LAUNCH_WINDOW_S
+            self._retry_s = 0.0
+        Logger.info(f"[DiscordRPC] {application} launched; retrying now")
+        if self._state != READY:
+            self._wake.set()
+
     def update_credentials(self, creds: dict):
         """Called with the `discord` key of global settings whenever they arrive."""
         creds = creds or {}
@@ -156,7 +232,8 @@ class DiscordRPC:
             self._creds = dict(creds)
         if creds.get("client_id") and not had_id:
             Logger.info("[DiscordRPC] Credentials received")
-        self._kill_pipe()  # reconnect with the received credentials/tokens
+        self.tokens.kick()
+        self._kill_connection()  # reconnect with the received credentials/tokens
         self._wake.set()
 
     def save_credentials(self, client_id: str, client_secret: str):
@@ -167,13 +244,13 @@ class DiscordRPC:
             self._creds["client_id"] = client_id.strip()
             self._creds["client_secret"] = client_secret.strip()
         self._persist_creds()
-        self._kill_pipe()  # reconnect under the new client_id
+        self._kill_connection()  # reconnect under the new client_id
         self._wake.set()
 
     def begin_authorize(self):
         with self._lock:
             self._authorize_requested = True
-        self._kill_pipe()  # restart the connect sequence with authorize enabled
+        self._kill_connection()  # restart the connect sequence with authorize enabled
         self._wake.set()
 
     def forget(self):
@@ -181,7 +258,7 @@ class DiscordRPC:
             for k in ("access_token", "refresh_token", "expires_at", "user"):
                 self._creds.pop(k, None)
         self._persist_creds()
-        self._kill_pipe()
+        self._kill_connection()
         self._wake.set()
 
     def voice_snapshot(self):
@@ -192,6 +269,10 @@ class DiscordRPC:
     def state(self):
         return self._state
 
+    @property
+    def ready(self):
+        return self._state == READY
+
     def status(self):
         with self._lock:
             return {
@@ -203,140 +284,224 @@ class DiscordRPC:
             }
 
     def set_local_voice(self, fields: dict):
-        """Optimistic local update (display responds instantly)."""
-        now = time.monotonic()
+        """Optimistic local update (display responds instantly). Goes with a
+        queue_voice_patch() of the same fields, which makes it stick."""
         with self._lock:
-            for k, v in fields.items():
-                self._voice[k] = v
-                self._local_ts[k] = now
-        self._notify()
+            changed = {k for k, v in fields.items() if self._voice.get(k) != v}
+            self._voice.update(fields)
+        self._notify(changed)
 
     def queue_voice_patch(self, patch: dict):
         """Merge a partial SET_VOICE_SETTINGS payload; the io thread coalesces
         bursts and always delivers the final value."""
         with self._lock:
-            for k, v in patch.items():
-                if isinstance(v, dict):
-                    self._pending_patch.setdefault(k, {}).update(v)
-                else:
-                    self._pending_patch[k] = v
-
-    # ------------------------------------------------------------ pipe I/O
-    # (all of these run on the io thread, except _enqueue and _kill_pipe)
+            self._patch_stats["requested"] += 1
+            if self._pending_patch:
+                self._patch_stats["merged"] += 1
+            _merge_patch(self._pending_patch, patch)
+            self._write_seq += 1
+            for field in _patch_fields(patch):
+                self._written[field] = self._pending_seqs[field] = self._write_seq
+        self._wake_io()
+
+    def patch_stats(self):
+        """Voice patches requested / merged into a pending one / sent as a
+        SET, plus SETs rate_limited, rejected and timed_out, and server values
+        suppressed as older than our newest write."""
+        with self._lock:
+            return dict(self._patch_stats)
 
-    def _open_pipe(self):
-        for i in range(10):
-            try:
-                return win32file.CreateFile(
-                    rf"\\.\pipe\discord-ipc-{i}",
-                    win32file.GENERIC_READ | win32file.GENERIC_WRITE,
-                    0, None, win32file.OPEN_EXISTING, 0, None)
-            except pywintypes.error:
-                continue
-        return None
+    # ------------------------------------------------------------- IPC I/O
+    # (all of these run on the io thread, except _enqueue and _kill_connection)
 
     def _enqueue(self, op: int, payload: dict):
         self._outgoing.append((op, payload))
+        self._wake_io()
+
+    def _wake_io(self):
+        transport = self._transport
+        if transport is not None:
+            transport.wake()
 
-    def _drain_outgoing(self):
+    def _drain_outgoing(self, transport):
         while self._outgoing:
             op, payload = self._outgoing.popleft()
-            data = json.dumps(payload).encode("utf-8")
-            win32file.WriteFile(self._handle, struct.pack("<II", op, len(data)) + data)
+            transport.write(pack_frame(op, payload))
 
-    def _poll_incoming(self):
+    def _poll_incoming(self, transport, reader):
         """Read whatever bytes are available (non-blocking) and dispatch any
         complete frames."""
-        try:
-            _, avail, _ = win32pipe.PeekNamedPipe(self._handle, 0)
-        except pywintypes.error as e:
-            raise ConnectionError(f"peek failed: {e}")
-        if avail:
-            _, chunk = win32file.ReadFile(self._handle, avail)
-            self._recv_buf += chunk
-        while len(self._recv_buf) >= 8:
-            op, length = struct.unpack("<II", self._recv_buf[:8])
-            if len(self._recv_buf) < 8 + length:
-                break
-            body = bytes(self._recv_buf[8:8 + length])
-            del self._recv_buf[:8 + length]
-            self._dispatch(op, json.loads(body.decode("utf-8")))
-
-    def _kill_pipe(self):
+        reader.feed(transport.read_available())
+        for op, msg in reader.frames():
+            self._dispatch(op, msg)
+
+    def _kill_connection(self):
+        """Close the current connection, if any. Marks it dead only if this
+        call detached it: a connection that already ended may have been
+        replaced by the time we get here, and the new one is not ours."""
         with self._lock:
-            handle, self._handle = self._handle, None
-        if handle:
-            try:
-                win32file.CloseHandle(handle)
-            except Exception:
-                pass
+            transport, self._transport = self._transport, None
+            if transport:
+                self._mark_dead()
+        if transport:
+            transport.close()
+
+    def _mark_dead(self):
+        """Under self._lock. Also releases a handshake still waiting for READY."""
         self._conn_dead.set()
+        self._ready_evt.set()
 
     # ------------------------------------------------------- request layer
 
-    def request(self, cmd: str, args: dict = None, evt: str = None, timeout: float = 5.0) -> dict:
-        """Enqueue a command and block for its reply (call from manager thread
-        only — never the io thread)."""
+    def request_async(self, cmd: str, args: dict = None, evt: str = None) -> concurrent.futures.Future:
+        """Enqueue a command; the Future resolves to the reply's data, or
+        fails with DiscordRPCError / ConnectionError. Commands go out in
+        order, so independent ones can be issued back to back and waited on
+        together."""
         nonce = str(uuid.uuid4())
-        waiter = {"event": threading.Event(), "msg": None, "sync": True}
+        future = concurrent.futures.Future()
+        future.cmd = cmd
         with self._lock:
-            self._pending[nonce] = waiter
+            self._pending[nonce] = future
         payload = {"cmd": cmd, "args": args or {}, "nonce": nonce}
         if evt:
             payload["evt"] = evt
         self._enqueue(OP_FRAME, payload)
+        future.add_done_callback(lambda _: self._forget(nonce))
+        return future
+
+    def request(self, cmd: str, args: dict = None, evt: str = None, timeout: float = 5.0) -> dict:
+        """Enqueue a command and block for its reply (call from manager thread
+        only — never the io thread)."""
+        return self._result(self.request_async(cmd, args, evt), timeout)
+
+    def _result(self, future, timeout):
         try:
-            if not waiter["event"].wait(timeout):
-                raise TimeoutError(f"Discord RPC timeout for {cmd}")
-        finally:
-            with self._lock:
-                self._pending.pop(nonce, None)
-        msg = waiter["msg"]
-        if msg is None:
-            raise ConnectionError(f"connection lost during {cmd}")
-        if msg.get("evt") == "ERROR":
-            raise DiscordRPCError(msg.get("data"))
-        return msg.get("data") or {}
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Discord RPC timeout for {future.cmd}")
+
+    def _forget(self, nonce):
+        with self._lock:
+            self._pending.pop(nonce, None)
 
     def send_async(self, cmd: str, args: dict):
         """Fire-and-forget; errors are logged when replies arrive."""
         nonce = str(uuid.uuid4())
         with self._lock:
-            self._pending[nonce] = {"event": None, "msg": None, "sync": False}
+            self._pending[nonce] = None
         self._enqueue(OP_FRAME, {"cmd": cmd, "args": args or {}, "nonce": nonce})
 
     # ------------------------------------------------------------- threads
 
     def _io_loop(self):
-        """Owns the pipe handle for its lifetime; the only thread that touches
-        it. Exits (and sets _conn_dead) on any pipe error."""
+        """Owns the transport for its lifetime; the only thread that reads or
+        writes it. Exits (and sets _conn_dead) on any IPC error."""
+        transport = self._transport
+        reader = FrameReader()
         try:
-            while not self._conn_dead.is_set() and self._handle is not None:
-                self._drain_outgoing()
-                self._flush_voice_patch()
-                self._poll_incoming()
-                time.sleep(POLL_S)
-        except (pywintypes.error, ConnectionError, OSError) as e:
-            if self._handle is not None:  # unexpected (not our own shutdown)
+            while not self._conn_dead.is_set() and self._transport is transport:
+                self._poll_incoming(transport, reader)  # acks first: they free the window
+                held_s = self._flush_voice_patch()
+                self._drain_outgoing(transport)
+                self._io_wait(transport, held_s)
+        except (ConnectionError, OSError) as e:
+            if self._transport is not None:  # unexpected (not our own shutdown)
                 Logger.info(f"[DiscordRPC] Connection lost: {e}")
         finally:
+            pending = {}
             with self._lock:
-                pending, self._pending = self._pending, {}
-            for waiter in pending.values():
-                if waiter["sync"] and waiter["event"]:
-                    waiter["event"].set()
-            self._conn_dead.set()
+                # a reconnect may already be under way; its requests and
+                # liveness are not ours to touch
+                if self._transport in (transport, None):
+                    pending, self._pending = self._pending, {}
+                    self._requeue_inflight()  # resent after the reconnect
+                    self._mark_dead()
+            for future in pending.values():
+                if future is not None and future.set_running_or_notify_cancel():
+                    future.set_exception(ConnectionError(f"connection lost during {future.cmd}"))
+            transport.release()
+
+    def _io_wait(self, transport, timeout):
+        """Sleep until Discord sends something, a frame/patch is queued, or
+        `timeout` (a patch held back by spacing, backoff or an unanswered
+        SET) runs out."""
+        transport.wait(timeout)
 
     def _flush_voice_patch(self):
+        """Send the coalesced patch if the window, spacing and backoff allow.
+        Returns how long a held-back patch must still wait (None = nothing
+        held, or held until an ack / READY wakes the io thread)."""
         now = time.monotonic()
         with self._lock:
-            if not self._pending_patch or now - self._last_send_ts < SEND_SPACING_S:
-                return
-            if self._state != READY:
-                return
+            if self._inflight is not None:
+                waited = now - self._inflight[2]
+                if waited < PATCH_TIMEOUT_S:
+                    return PATCH_TIMEOUT_S - waited
+                self._patch_stats["timed_out"] += 1
+                self._requeue_inflight()
+            if not self._pending_patch or self._state != READY:
+                return None  # READY wakes the io thread (_set_state)
+            wait_s = max(SEND_SPACING_S - (now - self._last_send_ts), self._hold_until - now)
+            if wait_s > 0:
+                return wait_s
             patch, self._pending_patch = self._pending_patch, {}
+            seqs, self._pending_seqs = self._pending_seqs, {}
+            nonce = str(uuid.uuid4())
+            self._inflight = (nonce, patch, now, seqs)
+            self._pending[nonce] = None
             self._last_send_ts = now
-        self.send_async("SET_VOICE_SETTINGS", patch)
+            self._patch_stats["sent"] += 1
+        self._enqueue(OP_FRAME, {"cmd": "SET_VOICE_SETTINGS", "args": patch, "nonce": nonce})
+        return PATCH_TIMEOUT_S
+
+    def _requeue_inflight(self):
+        """Put the unanswered patch back under anything queued since (newer
+        fields win). Caller holds _lock."""
+        if self._inflight is not None:
+            _, patch, _, seqs = self._inflight
+            self._inflight = None
+            _merge_patch(patch, self._pending_patch)
+            seqs.update(self._pending_seqs)
+            self._pending_patch, self._pending_seqs = patch, seqs
+
+    def _settle(self, seqs):
+        """Discord answered the writes numbered `seqs`: its values for those
+        fields are current again, unless a newer write is still out. Caller
+        holds _lock."""
+        for field, seq in seqs.items():
+            if seq > self._answered.get(field, 0):
+                self._answered[field] = seq
+
+    def _patch_answered(self, nonce, msg):
+        """Reply to the in-flight SET (io thread). Returns False if `nonce`
+        isn't it."""
+        with self._lock:
+            if self._inflight is None or self._inflight[0] != nonce:
+                return False
+            data = msg.get("data") or {}
+            if msg.get("evt") != "ERROR":
+                self._settle(self._inflight[3])
+                self._inflight = None
+                self._backoff_s = 0.0
+                return True
+            if _is_rate_limit(data):
+                self._patch_stats["rate_limited"] += 1
+                retry = data.get("retry_after")
+                if retry is None:
+                    self._backoff_s = min(BACKOFF_S[1], max(BACKOFF_S[0], self._backoff_s * 2))
+                    retry = self._backoff_s
+                self._hold_until = time.monotonic() + float(retry)
+                self._requeue_inflight()
+                return True
+            self._patch_stats["rejected"] += 1
+            if data.get("code") == 4006:
+                self._requeue_inflight()  # resent once re-authenticated
+            else:
+                self._settle(self._inflight[3])
+                self._inflight = None  # dropped: server state wins (below)
+            return False  # the usual error handling applies
 
     def _dispatch(self, op: int, msg: dict):
         if op == OP_PING:
@@ -360,12 +525,18 @@ class DiscordRPC:
 
         if nonce:
             with self._lock:
-                waiter = self._pending.pop(nonce, None)
-            if waiter is None:
-                return
-            if waiter["sync"]:
-                waiter["msg"] = msg
-                waiter["event"].set()
+                if nonce not in self._pending:
+                    return
+                future = self._pending.pop(nonce)
+            if future is not None:
+                if future.set_running_or_notify_cancel():  # False: timed out meanwhile
+                    if evt == "ERROR":
+                        future.set_exception(DiscordRPCError(msg.get("data")))
+                    else:
+                        future.set_result(msg.get("data") or {})
+            elif self._patch_answered(nonce, msg) and evt == "ERROR":
+                # rate limited: the patch is re-queued behind a backoff
+                Logger.info("[DiscordRPC] Rate limited; voice patch held back")
             elif evt == "ERROR":
                 data = msg.get("data") or {}
                 Logger.warning(f"[DiscordRPC] {cmd} rejected: {data}")
@@ -374,8 +545,7 @@ class DiscordRPC:
                     self._conn_dead.set()  # trigger reconnect+reauth
                 else:
                     self._set_detail("Another app may be controlling Discord voice settings")
-                    self._enqueue(OP_FRAME, {"cmd": "GET_VOICE_SETTINGS", "args": {},
-                                             "nonce": str(uuid.uuid4())})
+                    self.send_async("GET_VOICE_SETTINGS", {})  # server state wins again
             elif cmd in ("SET_VOICE_SETTINGS", "GET_VOICE_SETTINGS"):
                 # success replies carry the full settings; treat like an update
                 self._apply_server_voice(msg.get("data") or {})
@@ -403,17 +573,19 @@ class DiscordRPC:
     def _run_connection(self, creds, authorize):
         """One full connect attempt. Returns how long to wait before retrying
         (None = wait for an explicit wake)."""
-        handle = self._open_pipe()
-        if handle is None:
+        started = time.monotonic()
+        transport = open_transport()
+        if transport is None:
             self._set_state(NO_DISCORD)
-            return 5.0
+            return self._retry_delay()
+        timing = {}
 
-        self._conn_dead.clear()
-        self._ready_evt.clear()
-        self._needs_auth = False
-        self._recv_buf = bytearray()
-        self._outgoing.clear()
-        self._handle = handle
+        with self._lock:
+            self._conn_dead.clear()
+            self._ready_evt.clear()
+            self._needs_auth = False
+            self._outgoing.clear()
+            self._transport = transport
         threading.Thread(target=self._io_loop, daemon=True, name="discord-io").start()
 
         try:
@@ -421,6 +593,9 @@ class DiscordRPC:
             self._enqueue(OP_HANDSHAKE, {"v": 1, "client_id": str(creds["client_id"])})
             if not self._ready_evt.wait(10.0):
                 raise TimeoutError("no READY after handshake")
+            if self._conn_dead.is_set():
+                raise ConnectionError("connection closed during handshake")
+            timing["handshake_ms"] = (time.monotonic() - started) * 1000.0
 
             self._set_state(AUTHENTICATING)
             token = self._ensure_token(creds)
@@ -434,36 +609,47 @@ class DiscordRPC:
                     {"client_id": str(creds["client_id"]), "scopes": SCOPES},
                     timeout=120.0,
                 )
-                token = self._exchange_code(creds, data["code"])
+                token = self.tokens.exchange_code(creds, data["code"])
                 self._set_state(AUTHENTICATING)
 
+            auth_started = time.monotonic()
             try:
                 auth = self.request("AUTHENTICATE", {"access_token": token})
             except DiscordRPCError:
                 # stored token stale? try one refresh, then fall back to Connect
-                token = self._refresh_token(creds)
+                token = self.tokens.refresh_now(stale=token)
                 if not token:
                     self._clear_tokens()
                     self._set_state(NEEDS_CONNECT, "Session expired — click Connect")
                     return None
                 auth = self.request("AUTHENTICATE", {"access_token": token})
 
+            timing["auth_ms"] = (time.monotonic() - auth_started) * 1000.0
             user = (auth.get("user") or {})
+
+            sync_started = time.monotonic()
+            self._apply_server_voice(self._sync_after_auth())
+            timing["sync_ms"] = (time.monotonic() - sync_started) * 1000.0
+            timing["total_ms"] = (time.monotonic() - started) * 1000.0
+            self.last_connect = timing
+            with self._lock:
+                self._retry_s = 0.0
+            self._set_state(READY)
+            Logger.info(f"[DiscordRPC] Ready (user: {user.get('username')}) in {timing['total_ms']:.0f} ms")
+
+            # persisted after READY: nothing on the way to READY waits for it
             with self._lock:
-                self._creds["user"] = {"id": user.get("id"), "username": user.get("username")}
+                known = self._creds.get("user")
+                self._creds["user"] = current = {"id": user.get("id"), "username": user.get("username")}
                 self._authorize_requested = False
             self._persist_creds()
-
-            # subscriptions do not survive reconnects — always re-subscribe
-            self.request("SUBSCRIBE", {}, evt="VOICE_SETTINGS_UPDATE")
-            self._apply_server_voice(self.request("GET_VOICE_SETTINGS"), force=True)
-            self._set_state(READY)
-            Logger.info(f"[DiscordRPC] Ready (user: {user.get('username')})")
+            if current != known:
+                self._notify({"user"})
 
             self._conn_dead.wait()  # hold until the connection dies
             if self._needs_auth:
                 return 0.5  # immediate reconnect + reauth
-            return 3.0
+            return self._retry_delay()
         except DiscordRPCError as e:
             Logger.error(f"[DiscordRPC] auth error: {e}")
             self._set_state(AUTH_FAILED, str(e.data.get("message") or e))
@@ -472,53 +658,52 @@ class DiscordRPC:
             Logger.error(f"[DiscordRPC] token exchange failed: {e}")
             self._set_state(AUTH_FAILED, "Token exchange failed (network or bad client secret)")
             return None
-        except (TimeoutError, ConnectionError, OSError, pywintypes.error) as e:
+        except (TimeoutError, ConnectionError, OSError) as e:
             Logger.info(f"[DiscordRPC] connection attempt failed: {e}")
             self._set_state(NO_DISCORD)
-            return 5.0
+            return self._retry_delay()
         finally:
-            self._kill_pipe()
+            self._kill_connection()
+
+    def _retry_delay(self):
+        """Next reconnect wait: the step doubles up to RETRY_S[1] (held at the
+        first step just after a Discord launch), jittered to half..full."""
+        first, most = RETRY_S
+        with self._lock:
+            if self._retry_s and time.monotonic() >= self._launch_until:
+                self._retry_s = min(most, self._retry_s * 2)
+            else:
+                self._retry_s = first
+            step = self._retry_s
+        return random.uniform(step / 2, step)
+
+    def _sync_after_auth(self):
+        """Subscribe and fetch the voice settings, pipelined: both go out
+        back to back and cost one round trip. Returns the settings."""
+        # subscriptions do not survive reconnects — always re-subscribe
+        subscribed = self.request_async("SUBSCRIBE", {}, evt="VOICE_SETTINGS_UPDATE")
+        voice = self.request_async("GET_VOICE_SETTINGS")
+        self._result(subscribed, 5.0)
+        return self._result(voice, 5.0)
 
     # ---------------------------------------------------------------- auth
 
     def _ensure_token(self, creds):
-        token = creds.get("access_token")
-        expires_at = creds.get("expires_at") or 0
-        if token and time.time() < expires_at - 3600:
+        """The token to AUTHENTICATE with. Normally the background refresh
+        has kept a valid one around; only a token that expired while the
+        plugin was off is refreshed here."""
+        token = valid_token(creds)
+        if token:
             return token
         if creds.get("refresh_token"):
-            refreshed = self._refresh_token(creds)
+            refreshed = self.tokens.refresh_now()
             if refreshed:
                 return refreshed
-        return token or None
-
-    def _refresh_token(self, creds):
-        refresh = creds.get("refresh_token")
-        if not refresh:
-            return None
-        try:
-            resp = requests.post(TOKEN_URL, data={
-                "grant_type": "refresh_token",
-                "refresh_token": refresh,
-                "client_id": str(creds["client_id"]),
-                "client_secret": creds["client_secret"],
-            }, timeout=10)
-            resp.raise_for_status()
-            return self._store_token_response(resp.json())
-        except requests.RequestException as e:
-            Logger.warning(f"[DiscordRPC] token refresh failed: {e}")
-            return None
+        return creds.get("access_token") or None
 
-    def _exchange_code(self, creds, code):
-        resp = requests.post(TOKEN_URL, data={
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": REDIRECT_URI,
-            "client_id": str(creds["client_id"]),
-            "client_secret": creds["client_secret"],
-        }, timeout=10)
-        resp.raise_for_status()
-        return self._store_token_response(resp.json())
+    def _creds_copy(self):
+        with self._lock:
+            return dict(self._creds)
 
     def _store_token_response(self, data):
         with self._lock:
@@ -526,6 +711,7 @@ class DiscordRPC:
             self._creds["refresh_token"] = data.get("refresh_token", self._creds.get("refresh_token"))
             self._creds["expires_at"] = time.time() + data.get("expires_in", 604800)
         self._persist_creds()
+        self.tokens.kick()
         return data["access_token"]
 
     def _clear_tokens(self):
@@ -547,46 +733,121 @@ class DiscordRPC:
 
     # ------------------------------------------------------------- display
 
-    def _apply_server_voice(self, data, force=False):
-        now = time.monotonic()
+    def _apply_server_voice(self, data):
+        """Take Discord's values, except for fields with a write of ours
+        Discord hasn't answered yet: those values predate it."""
+        out = data.get("output") or {}
+        inp = data.get("input") or {}
+        server = {}
+        if "volume" in out:
+            server["output_volume"] = float(out["volume"])
+        if "volume" in inp:
+            server["input_volume"] = float(inp["volume"])
+        for field in ("deaf", "mute"):
+            if field in data:
+                server[field] = bool(data[field])
+        changed = set()
         with self._lock:
-            def stale(field):
-                return force or now - self._local_ts.get(field, 0) > ECHO_SUPPRESS_S
-            out = data.get("output") or {}
-            inp = data.get("input") or {}
-            if "volume" in out and stale("output_volume"):
-                self._voice["output_volume"] = float(out["volume"])
-            if "volume" in inp and stale("input_volume"):
-                self._voice["input_volume"] = float(inp["volume"])
-            if "deaf" in data and stale("deaf"):
-                self._voice["deaf"] = bool(data["deaf"])
-            if "mute" in data and stale("mute"):
-                self._voice["mute"] = bool(data["mute"])
-        self._notify()
+            for field, value in server.items():
+                if self._voice[field] == value:
+                    continue
+                if self._written.get(field, 0) > self._answered.get(field, 0):
+                    self._patch_stats["suppressed"] += 1
+                    continue
+                self._voice[field] = value
+                changed.add(field)
+        self._notify(changed)
 
     def _set_state(self, state, detail=""):
         with self._lock:
             if self._state == state and self._detail == detail:
                 return
+            changed = {"state"} if self._state != state else set()
+            if self._detail != detail:
+                changed.add("detail")
             self._state = state
             self._detail = detail
+        if state == READY:
+            self._wake_io()  # flush patches queued while connecting
         Logger.info(f"[DiscordRPC] state -> {state}{f' ({detail})' if detail else ''}")
-        self._notify()
+        self._notify(changed)
 
     def _set_detail(self, detail):
         with self._lock:
+            if self._detail == detail:
+                return
             self._detail = detail
-        self._notify()
+        self._notify({"detail"})
 
-    def _notify(self):
+    def _notify(self, changed):
+        """Post the current status to the mailbox of every listener that
+        subscribed to a field in `changed`. Never calls a listener: the
+        notify thread does (_deliver_loop)."""
+        if not changed:
+            return
         with self._lock:
-            listeners = list(self._listeners)
+            listeners = [cb for cb in self._listeners if not self._fields[cb].isdisjoint(changed)]
+            filtered = len(self._listeners) - len(listeners)
+        with self._mail_cond:
+            self._notify_stats["filtered"] += filtered
+        if not listeners:
+            return
         status = self.status()
-        for cb in listeners:
-            try:
-                cb(status)
-            except Exception as e:
-                Logger.error(f"[DiscordRPC] listener error: {e}")
+        with self._mail_cond:
+            for cb in listeners:
+                if cb in self._mail:
+                    self._notify_stats["coalesced"] += 1
+                self._mail[cb] = status
+            self._notify_stats["published"] += 1
+            if self._notifier is None:
+                self._notifier = threading.Thread(target=self._deliver_loop, daemon=True,
+                                                  name="discord-notify")
+                self._notifier.start()
+            self._mail_cond.notify()
+
+    def _deliver_loop(self):
+        while True:
+            with self._mail_cond:
+                while not self._mail:
+                    self._mail_cond.wait()
+                mail, self._mail = self._mail, {}
+            for cb, status in mail.items():
+                with self._lock:
+                    if cb not in self._listeners:
+                        continue  # released while the status waited
+                try:
+                    cb(status)
+                except Exception as e:
+                    Logger.error(f"[DiscordRPC] listener error: {e}")
+                self._notify_stats["delivered"] += 1
+
+    def notify_stats(self):
+        """published (status changes posted), delivered (listener calls),
+        coalesced (statuses replaced before delivery) and filtered (listeners
+        skipped: the change touched none of their fields)."""
+        with self._mail_cond:
+            return dict(self._notify_stats)
+
+
+def _merge_patch(dst, patch):
+    """Merge a partial SET_VOICE_SETTINGS payload into `dst` (one level of
+    nesting: {"output": {"volume": ...}})."""
+    for k, v in patch.items():
+        if isinstance(v, dict):
+            dst.setdefault(k, {}).update(v)
+        else:
+            dst[k] = v
+
+
+def _patch_fields(patch):
+    """The voice snapshot fields a SET_VOICE_SETTINGS payload writes."""
+    fields = [f"{name}_volume" for name in ("output", "input") if "volume" in (patch.get(name) or {})]
+    fields.extend(field for field in ("deaf", "mute") if field in patch)
+    return fields
+
+
+def _is_rate_limit(data):
+    return "retry_after" in data or "rate limit" in str(data.get("message", "")).lower()
 
 
 _instance = None
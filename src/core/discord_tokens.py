@@ -0,0 +1,147 @@
+"""OAuth2 tokens for the Discord RPC app, refreshed in the background.
+
+Discord access tokens last about a week. AUTHENTICATE needs one with some
+life left (MIN_VALID_S), and getting a new one is an HTTPS round trip to
+discord.com. TokenManager does that on its own thread, REFRESH_AHEAD_S
+before expiry, so a (re)connect only reads a token that is already valid.
+The connect path refreshes itself only when there is no such token: the
+plugin was off while it expired, or Discord rejected it.
+
+All token requests share one pooled requests.Session: a refresh reuses the
+kept-alive connection instead of a new TCP + TLS handshake each time.
+
+The credentials themselves stay in DiscordRPC (they live in the plugin's
+global settings): the manager reads them through `load()` and hands token
+responses to `store()`.
+"""
+
+import collections
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logger import Logger
+
+TOKEN_URL = "https://discord.com/api/oauth2/token"
+REDIRECT_URI = "http://localhost"
+
+MIN_VALID_S = 3600.0          # a token with less life left isn't used to connect
+REFRESH_AHEAD_S = 24 * 3600.0 # background refresh this long before expiry
+RETRY_S = (60.0, 3600.0)      # failed background refresh: first retry, max
+HTTP_TIMEOUT_S = 10.0
+
+
+def valid_token(creds, margin=MIN_VALID_S):
+    """The stored access token if it has more than `margin` seconds left."""
+    token = creds.get("access_token")
+    if token and time.time() < (creds.get("expires_at") or 0) - margin:
+        return token
+    return None
+
+
+class TokenManager:
+    """Refreshes the access token ahead of expiry on its own thread.
+
+    load()      -> a copy of the current credentials
+    store(data) -> persists a token response, returns the access token
+    """
+
+    def __init__(self, load, store):
+        self.token_url = TOKEN_URL  # tools point this at a local stub
+        self.stats = collections.Counter()
+        self._load = load
+        self._store = store
+        self._session = None
+        self._lock = threading.Lock()  # one token request at a time
+        self._kick = threading.Event()
+        self._started = False
+        self._retry_s = 0.0
+        self._retry_at = 0.0           # wall clock; no background refresh before
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            threading.Thread(target=self._loop, daemon=True, name="discord-tokens").start()
+
+    def kick(self):
+        """Credentials changed: re-plan the next refresh."""
+        self._kick.set()
+
+    def refresh_now(self, stale=None):
+        """Refresh on the caller's thread; returns the new token or None.
+        `stale` is a token Discord rejected: refresh even if it looks valid.
+        A caller that waited on a refresh already under way gets its token."""
+        with self._lock:
+            creds = self._load()
+            token = valid_token(creds, REFRESH_AHEAD_S)
+            if token and token != stale:
+                return token
+            refresh = creds.get("refresh_token")
+            if not (refresh and creds.get("client_id") and creds.get("client_secret")):
+                return None
+            try:
+                data = self._post({
+                    "grant_type": "refresh_token",
+                    "refresh_token": refresh,
+                    "client_id": str(creds["client_id"]),
+                    "client_secret": creds["client_secret"],
+                })
+            except requests.RequestException as e:
+                Logger.warning(f"[DiscordTokens] token refresh failed: {e}")
+                self.stats["failed"] += 1
+                first, most = RETRY_S
+                self._retry_s = min(most, self._retry_s * 2) if self._retry_s else first
+                self._retry_at = time.time() + self._retry_s
+                return None
+            self._retry_s = 0.0
+            # even a short-lived token isn't refreshed again sooner than this
+            self._retry_at = time.time() + RETRY_S[0]
+            self.stats["refreshed"] += 1
+            return self._store(data)
+
+    def exchange_code(self, creds, code):
+        """AUTHORIZE code -> access token. Raises requests.RequestException."""
+        with self._lock:
+            data = self._post({
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": REDIRECT_URI,
+                "client_id": str(creds["client_id"]),
+                "client_secret": creds["client_secret"],
+            })
+            self.stats["exchanged"] += 1
+            return self._store(data)
+
+    def _post(self, form):
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        resp = self._session.post(self.token_url, data=form, timeout=HTTP_TIMEOUT_S)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _due_in(self):
+        """Seconds until the next background refresh (None = nothing to refresh)."""
+        creds = self._load()
+        if not (creds.get("refresh_token") and creds.get("client_id") and creds.get("client_secret")):
+            return None
+        due = (creds.get("expires_at") or 0) - REFRESH_AHEAD_S
+        return max(0.0, due - time.time(), self._retry_at - time.time())
+
+    def _loop(self):
+        while True:
+            try:
+                wait_s = self._due_in()
+                if wait_s == 0.0:
+                    self.refresh_now()
+                    continue
+            except Exception as e:
+                Logger.error(f"[DiscordTokens] refresh loop error: {e}")
+                wait_s = RETRY_S[0]
+            self._kick.wait(wait_s)
+            self._kick.clear()
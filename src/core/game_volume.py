@@ -0,0 +1,400 @@
+"""Shared Game Volume state and enforcement (one controller per process).
+
+All Game Volume keys (knob, buttons) share ONE level via this controller —
+otherwise multiple instances would each store and re-assert their own level
+every tick and fight each other. Other features that need the game level or
+exclude list (audio scenes) use the same controller. It owns a single
+enforcement loop; absolute mode means newly launched apps conform within a
+blink. The loop's cadence adapts: 50ms for a few seconds after dial input or
+a new session (OnSessionCreated), then backing off geometrically to 2s while
+the session set and levels stay put.
+
+Dial/mute input never enumerates: it writes straight to the volume handles
+resolved by the last enforcement pass and leaves reconciliation (new
+sessions, stragglers, failures) to the enforcer, which it switches to the
+fast cadence. Dial-to-volume latency is logged at the end of each burst.
+
+Every COM call (enforcement passes, input writes) runs on the audio worker
+thread; the timer and websocket threads only queue commands. Queued input
+writes coalesce, so a fast spin costs one write per worker pass.
+
+Windows master volume is never touched. Level persists in the plugin's
+global settings so it survives restarts and is identical on every key.
+"""
+
+import collections
+import threading
+import time
+
+from .audio_sessions import DEFAULT_EXCLUDE, infos_excluding, get_registry
+from .audio_worker import get_audio_worker
+from .logger import Logger
+
+
+class _GameVolumeController:
+    """Process-wide shared game-volume state + enforcement (singleton)."""
+
+    STEP = 5
+    VERIFY_S = 10.0  # full read-back sweep — safety net for missed notifications
+    # adaptive enforcement cadence (ms)
+    FAST_MS = 50     # right after input / a new session...
+    BURST_S = 3.0    # ...for this long
+    BASE_MS = 200    # after a tick that had to change something
+    MAX_MS = 2000    # ceiling of the geometric back-off while stable
+
+    def __init__(self):
+        self.level = 50
+        self.muted = False
+        self.exclude = list(DEFAULT_EXCLUDE)
+        self._listeners = []          # render callbacks: cb(level, muted)
+        self._lock = threading.RLock()
+        self._plugin = None
+        self._timer_on = False
+        self._loaded = False
+        self._dirty = False
+        # diff-based enforcement: what each session was last set/confirmed to,
+        # and sessions whose volume-changed notification says they drifted
+        self._applied = {}            # session key -> (level, muted)
+        self._drifted = set()
+        self._last_verify = 0.0
+        self._watching_sessions = False
+        self._interval_ms = self.BASE_MS
+        self._fast_until = 0.0
+        self._handles = []            # (key, SimpleAudioVolume) from the last apply
+        self._input_t = None          # perf_counter of the oldest unwritten input
+        self._latency_ms = collections.deque(maxlen=256)  # input -> volume written
+        self._audio = get_audio_worker()
+
+    # ------------------------------------------------------- lifecycle
+
+    def attach(self, action):
+        with self._lock:
+            self._plugin = action.plugin
+            if action.render not in self._listeners:
+                self._listeners.append(action.render)
+            first_load = not self._loaded
+            self._loaded = True
+            if not self._timer_on:
+                self._timer_on = True
+                # untagged: enforcement controls audio, so power modes must
+                # not stretch or stop it the way they do display polls
+                action.plugin.timer.set_interval("game_volume_enforce", self._interval_ms, self._tick)
+            if not self._watching_sessions:
+                self._watching_sessions = True
+                get_registry().add_listener(self._on_session_event)
+        if first_load:
+            try:
+                action.plugin.get_global_settings()  # load persisted level
+            except Exception as e:
+                Logger.error(f"[GameVolume] get_global_settings failed: {e}")
+
+    def detach(self, action):
+        with self._lock:
+            if action.render in self._listeners:
+                self._listeners.remove(action.render)
+            if not self._listeners and self._timer_on and self._plugin:
+                self._plugin.timer.clear_interval("game_volume_enforce")
+                self._timer_on = False
+                self._interval_ms = self.BASE_MS
+
+    def boost(self):
+        """Enforce at FAST_MS for the next BURST_S (something just changed)."""
+        with self._lock:
+            self._fast_until = time.monotonic() + self.BURST_S
+        self._set_cadence(self.FAST_MS)
+
+    def _set_cadence(self, ms):
+        with self._lock:
+            if ms == self._interval_ms or not self._timer_on or not self._plugin:
+                return
+            self._interval_ms = ms
+            plugin = self._plugin
+        plugin.timer.set_interval("game_volume_enforce", ms, self._tick)
+
+    # ------------------------------------------------------------ input
+
+    def set_level_delta(self, ticks):
+        with self._lock:
+            self.level = max(0, min(100, self.level + ticks * self.STEP))
+            self._dirty = True
+        self._queue_write()
+        self.boost()
+        self._notify()
+
+    def toggle_mute(self):
+        with self._lock:
+            self.muted = not self.muted
+            self._dirty = True
+        self._queue_write()
+        self.boost()
+        self._notify()
+
+    def _queue_write(self):
+        with self._lock:
+            if self._input_t is None:
+                self._input_t = time.perf_counter()
+        # coalesced: inputs arriving while a write is queued ride along with it
+        self._audio.submit(self._write_cached, key="game_volume_input")
+
+    def _write_cached(self):
+        """Low-latency input path: push the new target to the already-resolved
+        handles — no enumeration, no read-back, no retry. Anything that fails
+        here (or isn't resolved yet) is fixed by the next enforcement tick.
+        Audio worker thread only."""
+        with self._lock:
+            start, self._input_t = self._input_t, None
+            level, muted = self.level, self.muted
+            handles = list(self._handles)
+            previous = dict(self._applied)
+        written = {}
+        for key, vol in handles:
+            prev = previous.get(key)
+            try:
+                if prev is None or prev[0] != level:
+                    vol.SetMasterVolume(level / 100.0, None)
+                if prev is None or prev[1] != muted:
+                    vol.SetMute(1 if muted else 0, None)
+                written[key] = (level, muted)
+            except Exception:
+                continue
+        with self._lock:
+            if (self.level, self.muted) == (level, muted):
+                self._applied.update(written)
+        if start is not None:
+            self._latency_ms.append((time.perf_counter() - start) * 1000.0)
+
+    def latency_report(self):
+        """(count, p50 ms, p95 ms, max ms) of recent input-to-volume latencies."""
+        samples = sorted(self._latency_ms)
+        if not samples:
+            return 0, 0.0, 0.0, 0.0
+        n = len(samples)
+        return n, samples[n // 2], samples[min(n - 1, int(n * 0.95))], samples[-1]
+
+    def set_exclude(self, exclude):
+        with self._lock:
+            self.exclude = exclude or list(DEFAULT_EXCLUDE)
+            self._dirty = True
+        self._audio.submit(self.apply, True, key="game_volume_apply")
+        self._notify()
+
+    def load(self, settings, apply=True):
+        gv = (settings or {}).get("game_volume") or {}
+        if not gv:
+            return
+        with self._lock:
+            new = (int(gv.get("level", self.level)),
+                   bool(gv.get("muted", self.muted)),
+                   gv.get("exclude") or self.exclude)
+            if new == (self.level, self.muted, self.exclude):
+                return  # our own persist echoing back — no-op
+            self.level, self.muted, self.exclude = new
+        if apply:
+            self._audio.submit(self.apply, True, key="game_volume_apply")
+        self._notify()
+
+    def snapshot(self):
+        with self._lock:
+            return self.level, self.muted, list(self.exclude)
+
+    def running_apps(self):
+        """Exe names with an audio session, in discovery order and cased as
+        the process reports them, for the exclude picker (which matches
+        case-insensitively). Runs on the audio worker: describing a session
+        not seen yet is a COM call."""
+        def names():
+            apps = {}
+            for info in get_registry().infos():
+                if info.basename:
+                    apps.setdefault(info.basename, info.name)
+            return list(apps.values())
+        return self._audio.call(names)
+
+    @property
+    def enforcing(self):
+        """True while Game Volume keys are on screen (the loop is running)."""
+        return self._timer_on
+
+    def bind(self, plugin):
+        """For users other than Game Volume keys (audio scenes): remember the
+        plugin for persisting and pick up the persisted level/exclude once,
+        without an enforcement pass."""
+        with self._lock:
+            if self._plugin is None:
+                self._plugin = plugin
+            if self._loaded or plugin.global_settings is None:
+                return
+            self._loaded = True
+        self.load(plugin.global_settings, apply=False)
+
+    def set_target(self, level=None, muted=None):
+        """Change level/mute without writing anything: the caller runs
+        apply() on the audio worker within its own pass, then commit()."""
+        with self._lock:
+            if level is not None:
+                self.level = max(0, min(100, int(level)))
+            if muted is not None:
+                self.muted = bool(muted)
+            self._dirty = True
+
+    def commit(self):
+        """Render + persist a set_target() and keep enforcing fast for a
+        moment so stragglers conform."""
+        self._notify()
+        if self._dirty:
+            self._persist()
+        self.boost()
+
+    # ------------------------------------------------------- enforcement
+
+    def _tick(self):
+        try:
+            changed = self._audio.call(self.apply)
+        except Exception as e:
+            Logger.error(f"[GameVolume] enforcement pass failed: {e}")
+            changed = None
+        self._notify()
+        if self._dirty:
+            self._persist()
+        if time.monotonic() < self._fast_until:
+            self._set_cadence(self.FAST_MS)
+            return
+        if self._interval_ms == self.FAST_MS and self._latency_ms:
+            n, p50, p95, worst = self.latency_report()
+            Logger.info(f"[GameVolume] dial->volume latency over {n} inputs: "
+                        f"p50={p50:.2f}ms p95={p95:.2f}ms max={worst:.2f}ms")
+            self._latency_ms.clear()
+        if changed:
+            self._set_cadence(self.BASE_MS)
+        else:
+            self._set_cadence(min(self.MAX_MS, self._interval_ms * 2))
+
+    def apply(self, force=False):
+        """Set every non-excluded session to the shared level/mute.
+
+        Diff-based: a session already holding the target (per _applied) is
+        not touched at all on steady-state ticks; new sessions and sessions
+        whose volume-changed notification fired are read back and fixed;
+        when only the target moved (dial/mute), sessions are written without
+        reading first. Every VERIFY_S (or when forced) every session is read
+        back anyway. Retries once with fresh enumeration so a stale session
+        doesn't drop a change. Audio worker thread only.
+
+        Returns how many sessions were new or had to be written (0 = stable),
+        or None if the apply failed."""
+        with self._lock:
+            level, muted, exclude = self.level, self.muted, list(self.exclude)
+            drifted, self._drifted = self._drifted, set()
+            previous = dict(self._applied)
+        target = (level, muted)
+        now = time.monotonic()
+        verify = force or now - self._last_verify >= self.VERIFY_S
+        if verify:
+            self._last_verify = now
+        for attempt in range(2):
+            try:
+                infos = infos_excluding(exclude, force=force or attempt > 0)
+                if force:
+                    names = []
+                    for i in infos:
+                        if i.basename is None:
+                            names.append("system")
+                        else:
+                            names.append(i.basename + ("(media)" if i.audio_service else ""))
+                    Logger.info(f"[GameVolume] applying level={level} muted={muted} to {len(infos)} sessions: {names}")
+                applied = {}
+                changed = 0
+                for i in infos:
+                    prev = previous.get(i.key)
+                    if prev == target and not verify and i.key not in drifted:
+                        applied[i.key] = target
+                        continue
+                    try:
+                        vol = i.session.SimpleAudioVolume
+                        wrote = prev is None
+                        if prev is None or verify or i.key in drifted:
+                            # actual state unknown: read back, write what differs
+                            if abs(vol.GetMasterVolume() - level / 100.0) > 0.004:
+                                vol.SetMasterVolume(level / 100.0, None)
+                                wrote = True
+                            if bool(vol.GetMute()) != muted:
+                                vol.SetMute(1 if muted else 0, None)
+                                wrote = True
+                        else:
+                            # only our target moved; the session still holds prev
+                            if prev[0] != level:
+                                vol.SetMasterVolume(level / 100.0, None)
+                            if prev[1] != muted:
+                                vol.SetMute(1 if muted else 0, None)
+                            wrote = True
+                        applied[i.key] = target
+                        changed += wrote
+                    except Exception:
+                        continue  # session vanished mid-iteration; retried next tick
+                with self._lock:
+                    self._applied = applied
+                    self._handles = [(i.key, i.session.SimpleAudioVolume)
+                                     for i in infos if i.key in applied]
+                return changed
+            except Exception as e:
+                if attempt == 0:
+                    Logger.warning(f"[GameVolume] apply retrying after: {e}")
+                else:
+                    Logger.error(f"[GameVolume] Exception in apply: {e}")
+        with self._lock:
+            self._drifted |= drifted  # nothing was applied; don't lose them
+        return None
+
+    def _on_session_event(self, event, key, *args):
+        """Registry notification (any thread). Our own writes echo back as
+        "changed" too — those already match the target and are ignored.
+        A new or drifted session gets the fast cadence so it conforms at once."""
+        urgent = False
+        with self._lock:
+            if event == "expired":
+                self._applied.pop(key, None)
+            elif event == "created":
+                urgent = True
+            elif event == "changed":
+                level, muted = args
+                if abs(level - self.level / 100.0) > 0.004 or bool(muted) != self.muted:
+                    self._drifted.add(key)
+                    urgent = True
+        if urgent:
+            self.boost()
+
+    def _persist(self):
+        with self._lock:
+            gv = {"level": self.level, "muted": self.muted, "exclude": list(self.exclude)}
+            self._dirty = False
+            plugin = self._plugin
+        if not plugin:
+            return
+        try:
+            merged = dict(plugin.global_settings or {})
+            merged["game_volume"] = gv
+            plugin.set_global_settings(merged)  # merge — must not clobber discord key
+        except Exception as e:
+            Logger.error(f"[GameVolume] failed to persist: {e}")
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+            level, muted = self.level, self.muted
+        for cb in listeners:
+            try:
+                cb(level, muted)
+            except Exception as e:
+                Logger.error(f"[GameVolume] listener error: {e}")
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = _GameVolumeController()
+        return _controller
@@ -0,0 +1,163 @@
+"""First-frame thumbnail sprite sheet for the Gif property inspector.
+
+The PI's picker used to get file names only. Decoding + PNG-encoding one
+preview per GIF every time the PI opens is slow with a big library (200 GIFs
+= 200 decodes and 200 data URLs), so instead ONE low-res sheet of every
+GIF's first frame is built in the background and cached, and the PI gets a
+single image plus an offsets map ({file: [x, y]}) it slices with CSS
+background-position.
+
+The library index is the folder listing keyed by (name, mtime, size). When it
+changes, only new/modified files are decoded — thumbnails of unchanged files
+are reused from the cache — and the sheet is re-composited and re-encoded
+once. Module-level singleton per folder (get_thumbnail_sheet), no Action
+subclass, so ActionFactory's scan finds nothing here.
+"""
+
+import base64
+import io
+import os
+import threading
+
+from PIL import Image
+
+from .logger import Logger
+
+THUMB = 36      # px per tile (square; aspect-fit, centered)
+COLUMNS = 16    # tiles per sheet row
+
+
+def scan_library(folder):
+    """Library index: {file: (mtime, size)} for every .gif in `folder`."""
+    index = {}
+    try:
+        for entry in os.scandir(folder):
+            if entry.is_file() and entry.name.lower().endswith(".gif"):
+                st = entry.stat()
+                index[entry.name] = (st.st_mtime, st.st_size)
+    except OSError as e:
+        Logger.error(f"[GifThumbs] Failed to scan {folder}: {e}")
+    return index
+
+
+def _first_frame_thumb(path):
+    with Image.open(path) as im:
+        im.seek(0)
+        frame = im.convert("RGBA")
+    frame.thumbnail((THUMB, THUMB), Image.Resampling.LANCZOS)
+    tile = Image.new("RGBA", (THUMB, THUMB), (0, 0, 0, 0))
+    tile.paste(frame, ((THUMB - frame.width) // 2, (THUMB - frame.height) // 2))
+    return tile
+
+
+class GifThumbnailSheet:
+    """Cached sprite sheet of one GIF folder, rebuilt incrementally."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._thumbs = {}       # file -> ((mtime, size), tile Image)
+        self._index = None      # library index the current sheet was built from
+        self._sheet = None      # {"image", "offsets", "tile", "columns"}
+        self._building = False
+        self._waiters = []      # callbacks waiting for the in-flight build
+
+    def current(self):
+        """Sheet payload if it matches the folder as it is now, else None."""
+        index = scan_library(self.folder)
+        with self._lock:
+            if self._sheet is not None and index == self._index:
+                return self._sheet
+        return None
+
+    def request(self, callback=None):
+        """Ensure a fresh sheet; `callback(sheet)` fires once it is ready —
+        immediately (on the caller's thread) when the cache is current,
+        otherwise from the background build thread."""
+        index = scan_library(self.folder)
+        with self._lock:
+            if self._sheet is not None and index == self._index:
+                sheet = self._sheet
+            else:
+                sheet = None
+                if callback:
+                    self._waiters.append(callback)
+                if not self._building:
+                    self._building = True
+                    threading.Thread(target=self._build, daemon=True,
+                                     name="gif-thumbs").start()
+        if sheet is not None and callback:
+            callback(sheet)
+        return sheet
+
+    def _build(self):
+        while True:
+            index = scan_library(self.folder)
+            try:
+                sheet = self._render(index)
+            except Exception as e:
+                Logger.error(f"[GifThumbs] Sheet build failed: {e}")
+                sheet = None
+            with self._lock:
+                if sheet is not None:
+                    self._sheet, self._index = sheet, index
+                if sheet is not None and scan_library(self.folder) != index:
+                    continue  # library changed mid-build; go again
+                self._building = False
+                waiters, self._waiters = self._waiters, []
+            break
+        if sheet is None:
+            return
+        for cb in waiters:
+            try:
+                cb(sheet)
+            except Exception as e:
+                Logger.error(f"[GifThumbs] listener error: {e}")
+
+    def _render(self, index):
+        names = sorted(index, key=str.lower)
+        decoded = 0
+        for name in names:
+            cached = self._thumbs.get(name)
+            if cached and cached[0] == index[name]:
+                continue
+            try:
+                tile = _first_frame_thumb(os.path.join(self.folder, name))
+            except Exception as e:
+                Logger.warning(f"[GifThumbs] Skipping {name}: {e}")
+                tile = None
+            self._thumbs[name] = (index[name], tile)
+            decoded += 1
+        for gone in set(self._thumbs) - set(index):
+            del self._thumbs[gone]
+
+        tiles = [(n, self._thumbs[n][1]) for n in names if self._thumbs[n][1] is not None]
+        rows = max(1, -(-len(tiles) // COLUMNS))
+        sheet = Image.new("RGBA", (THUMB * min(COLUMNS, max(1, len(tiles))), THUMB * rows),
+                          (0, 0, 0, 0))
+        offsets = {}
+        for i, (name, tile) in enumerate(tiles):
+            x, y = (i % COLUMNS) * THUMB, (i // COLUMNS) * THUMB
+            sheet.paste(tile, (x, y))
+            offsets[name] = [x, y]
+
+        buffer = io.BytesIO()
+        sheet.save(buffer, format="PNG", optimize=True)
+        Logger.info(f"[GifThumbs] Sheet built: {len(tiles)} GIFs ({decoded} decoded)")
+        return {
+            "image": "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode(),
+            "offsets": offsets,
+            "tile": THUMB,
+            "columns": COLUMNS,
+        }
+
+
+_sheets = {}
+_sheets_lock = threading.Lock()
+
+
+def get_thumbnail_sheet(folder) -> GifThumbnailSheet:
+    with _sheets_lock:
+        if folder not in _sheets:
+            _sheets[folder] = GifThumbnailSheet(folder)
+        return _sheets[folder]
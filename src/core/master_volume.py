@@ -0,0 +1,280 @@
+"""Shared endpoint volume monitors: one per target device, for every Volume key.
+
+Each Volume key used to poll on its own: a 200ms timer per key reading level
+and mute through its own IAudioEndpointVolume, re-activated every second to
+notice device switches — four keys, four times the COM traffic for the same
+two numbers. Now one monitor per target (DEFAULT_OUTPUT, DEFAULT_INPUT or a
+specific device id, see audio_devices.py) holds ONE endpoint reference on the
+audio worker and subscribes to its volume-change callback
+(IAudioEndpointVolumeCallback), which fires for every change — ours, the
+Windows mixer's, media keys' — and fans the new state out to every key
+attached to that target.
+
+The endpoint is re-activated only when the device registry reports that the
+target's device went away or the default moved. Polling survives only as a
+fallback: without volume notifications the monitor reads level/mute every
+POLL_MS (once for all keys), and without device notifications it re-checks
+the devices every DEVICE_POLL_MS.
+"""
+
+import threading
+
+from .audio_devices import DEFAULT_OUTPUT, DEFAULT_INPUT, get_device_registry
+from .audio_worker import get_audio_worker
+from .logger import Logger
+from .timer import POLL
+
+POLL_MS = 200           # fallback: no endpoint volume notifications
+DEVICE_POLL_MS = 1000   # fallback: no device notifications / no device yet
+
+
+class MasterVolumeMonitor:
+    """Shared level/mute of one target + the one endpoint it is read from."""
+
+    def __init__(self, registry, target=DEFAULT_OUTPUT):
+        self.registry = registry
+        self.target = target
+        self._audio = get_audio_worker()
+        self._lock = threading.RLock()
+        self._listeners = []          # render callbacks: cb(level, muted)
+        self._plugin = None
+        self._timer_on = False
+        self._interval_ms = None
+        self._timer_id = f"master_volume_check_{target}"
+        self.level = None             # percent; None until first read
+        self.muted = False
+        # audio worker thread only
+        self._endpoint = None
+        self._token = None
+        self._device_id = None
+        self._watching = False
+        self.stats = {"activations": 0, "notifications": 0, "polls": 0}
+
+    # ------------------------------------------------------- lifecycle
+
+    def attach(self, action):
+        with self._lock:
+            self._plugin = action.plugin
+            if action.render not in self._listeners:
+                self._listeners.append(action.render)
+            start = not self._timer_on
+            self._timer_on = True
+        if start:
+            self.registry.add_listener(self._on_device_event)
+            self._check()  # activate + subscribe; starts a timer only if needed
+        level, muted = self.snapshot()
+        if level is not None:
+            action.render(level, muted)
+
+    def detach(self, action):
+        with self._lock:
+            if action.render in self._listeners:
+                self._listeners.remove(action.render)
+            if self._listeners or not self._timer_on:
+                return
+            self._timer_on = False
+            plugin = self._plugin
+        self.registry.remove_listener(self._on_device_event)
+        if plugin and self._interval_ms:
+            plugin.timer.clear_interval(self._timer_id)
+        self._interval_ms = None
+        try:
+            self._audio.call(self._release)
+        except Exception as e:
+            Logger.error(f"[MasterVolume] release failed: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            return self.level, self.muted
+
+    def refresh(self):
+        """Re-enumerate devices, re-activate and re-read now (e.g. after the
+        system woke up)."""
+        self.registry.refresh()
+        try:
+            self._publish(self._audio.call(self._activate))
+        except Exception as e:
+            Logger.error(f"[MasterVolume] refresh failed: {e}")
+
+    # ------------------------------------------------------------ input
+
+    def change_level(self, delta_percent):
+        try:
+            self._publish(self._audio.call(self._change_level, delta_percent))
+        except Exception as e:
+            Logger.error(f"[MasterVolume] Exception in change_level: {e}")
+
+    def toggle_mute(self):
+        try:
+            self._publish(self._audio.call(self._toggle_mute))
+        except Exception as e:
+            Logger.error(f"[MasterVolume] Exception in toggle_mute: {e}")
+
+    # ------------------------------------------- audio worker thread only
+
+    def _release(self):
+        if self._endpoint is not None and self._token is not None:
+            try:
+                self.registry.backend.unwatch_volume(self._endpoint, self._token)
+            except Exception:
+                pass
+        self._endpoint, self._token, self._device_id = None, None, None
+
+    def _activate(self):
+        """(Re-)resolve the target and subscribe to its endpoint. Returns the
+        state to publish, or None if the target has no device right now."""
+        self._release()
+        device_id = self.registry.resolve(self.target)
+        if device_id is None:
+            Logger.warning(f"[MasterVolume] no device for target {self.target!r}")
+            return None
+        backend = self.registry.backend
+        self._endpoint = backend.activate(device_id)
+        self._device_id = device_id
+        self.stats["activations"] += 1
+        try:
+            self._token = backend.watch_volume(self._endpoint, self._on_notify)
+        except Exception as e:
+            Logger.warning(f"[MasterVolume] endpoint notifications unavailable: {e}")
+        if self._watching != (self._token is not None):
+            self._watching = self._token is not None
+            if not self._watching:
+                Logger.warning(f"[MasterVolume] No endpoint notifications; polling every {POLL_MS}ms")
+        return self._read()
+
+    def _reactivate(self):
+        """A device event re-targeted us."""
+        try:
+            self._publish(self._activate())
+        except Exception as e:
+            Logger.error(f"[MasterVolume] re-activation failed: {e}")
+        self._update_cadence()
+
+    def _read(self):
+        endpoint = self._endpoint
+        return endpoint.GetMasterVolumeLevelScalar(), bool(endpoint.GetMute())
+
+    def _check_now(self):
+        """Timer pass (fallback modes only). Returns a state to publish or None."""
+        try:
+            if not self.registry.watching:
+                self.registry.poll()  # its events re-target us if needed
+            if self._endpoint is None:
+                return self._activate()
+            if not self._watching:
+                self.stats["polls"] += 1
+                return self._read()
+            return None
+        except Exception:
+            self._release()  # unsubscribe; re-activate on the next check
+            raise
+
+    def _change_level(self, delta_percent):
+        """Read-modify-write as ONE worker command; retries once with a fresh
+        endpoint so a transient COM failure doesn't swallow the dial tick."""
+        for attempt in range(2):
+            try:
+                if attempt or self._endpoint is None:
+                    self._activate()
+                endpoint = self._endpoint
+                if endpoint is None:
+                    return None  # no device for this target
+                current_p = int(round(endpoint.GetMasterVolumeLevelScalar() * 100))
+                new_p = max(0, min(100, current_p + delta_percent))
+                endpoint.SetMasterVolumeLevelScalar(new_p / 100.0, None)
+                return new_p / 100.0, bool(endpoint.GetMute())
+            except Exception as e:
+                if attempt:
+                    raise
+                Logger.warning(f"[MasterVolume] change_level retrying after: {e}")
+
+    def _toggle_mute(self):
+        if self._endpoint is None:
+            self._activate()
+        endpoint = self._endpoint
+        if endpoint is None:
+            return None
+        muted = not endpoint.GetMute()
+        endpoint.SetMute(1 if muted else 0, None)
+        return endpoint.GetMasterVolumeLevelScalar(), muted
+
+    # -------------------------------------------------------- internals
+
+    def _check(self):
+        """Timer callback (and first attach)."""
+        try:
+            self._publish(self._audio.call(self._check_now))
+        except Exception as e:
+            Logger.error(f"[MasterVolume] check failed: {e}")
+        self._update_cadence()
+
+    def _update_cadence(self):
+        """Poll only what notifications don't cover; no timer at all when
+        both volume and device notifications work."""
+        if self._endpoint is not None and not self._watching:
+            ms = POLL_MS
+        elif self._endpoint is None or not self.registry.watching:
+            ms = DEVICE_POLL_MS
+        else:
+            ms = None
+        with self._lock:
+            if ms == self._interval_ms or not self._timer_on or not self._plugin:
+                return
+            self._interval_ms = ms
+            plugin = self._plugin
+        if ms is None:
+            plugin.timer.clear_interval(self._timer_id)
+        else:
+            plugin.timer.set_interval(self._timer_id, ms, self._check, kind=POLL)
+
+    def _on_device_event(self, event, *args):
+        """Device registry listener (worker or COM notification thread).
+        Never waits: re-activation is queued on the worker, coalesced, and
+        publishes and re-plans the timer from there (_reactivate)."""
+        if event == "default_changed":
+            flow, _ = args
+            retarget = (self.target in (DEFAULT_OUTPUT, DEFAULT_INPUT)
+                        and flow == self.registry.flow_of(self.target))
+        elif event == "removed":
+            retarget = args[0] == self._device_id
+        else:  # "added": maybe the device we were waiting for
+            retarget = self._endpoint is None
+        if not retarget:
+            return
+        self._audio.submit(self._reactivate, key=f"master_volume_activate_{self.target}")
+
+    def _on_notify(self, level, muted):
+        """Endpoint callback — on a COM notification thread, which must not
+        render or wait: listeners run on the worker. A burst of changes
+        coalesces into one publish of the latest state."""
+        self.stats["notifications"] += 1
+        self._audio.submit(self._publish, (level, muted), key=f"master_volume_notify_{self.target}")
+
+    def _publish(self, state):
+        if state is None:
+            return
+        level, muted = int(round(state[0] * 100)), bool(state[1])
+        with self._lock:
+            if (level, muted) == (self.level, self.muted):
+                return
+            self.level, self.muted = level, muted
+            listeners = list(self._listeners)
+        for cb in listeners:
+            try:
+                cb(level, muted)
+            except Exception as e:
+                Logger.error(f"[MasterVolume] listener error: {e}")
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_master_volume(target=DEFAULT_OUTPUT) -> MasterVolumeMonitor:
+    """The shared monitor for `target` (per device registry)."""
+    registry = get_device_registry()
+    with _monitors_lock:
+        monitor = _monitors.get(target)
+        if monitor is None or monitor.registry is not registry:
+            monitor = _monitors[target] = MasterVolumeMonitor(registry, target)
+        return monitor
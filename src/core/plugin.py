@@ -7,6 +7,8 @@ import sys
 from typing import Any, Dict, List, Optional
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from .timer import Timer
+from .power import PowerManager
+from .dial_input import DialInput
 from .action import Action
 from .logger import Logger
 
@@ -29,6 +31,8 @@ class Plugin:
         self.actions: Dict[str, Action] = {}
         self.global_settings: Any = None
         self.timer = Timer()
+        self.power = PowerManager(self.timer, info)
+        self.dial = DialInput(self._deliver_dial_rotate)
         self.plugin_uuid = plugin_uuid
         self.http_server = None
         self.http_server_thread = None
@@ -77,8 +81,11 @@ class Plugin:
         data = json.loads(message)
         event = data.get('event')
         Logger.debug(event)
+        self._track_power(event, data)
         if event == 'didReceiveGlobalSettings':
             self.global_settings = data.get('payload', {}).get('settings')
+            self.power.load(self.global_settings)
+            self.dial.load(self.global_settings)
             for action in self.actions.values():
                 if hasattr(action, 'on_did_receive_global_settings'):
                     action.on_did_receive_global_settings(self.global_settings)
@@ -127,11 +134,17 @@ class Plugin:
             'keyDown': 'on_key_down',
             'keyUp': 'on_key_up',
             'dialDown': 'on_dial_down',
-            'dialUp': 'on_dial_up',
-            'dialRotate': 'on_dial_rotate'
+            'dialUp': 'on_dial_up'
         }
         
-        if event in context_events:
+        if event == 'dialRotate':
+            # 旋钮转动先经过合并层：同一context在短窗口内的ticks合并成一次调用
+            context = data.get('context')
+            action = self.actions.get(context)
+            if action is not None and hasattr(action, 'on_dial_rotate'):
+                self.dial.push(context, data.get('payload', {}),
+                               getattr(action, 'DIAL_ACCELERATION', False))
+        elif event in context_events:
             context = data.get('context')
             if context in self.actions:
                 action = self.actions[context]
@@ -171,6 +184,33 @@ class Plugin:
                 if hasattr(action, 'on_send_to_plugin'):
                     action.on_send_to_plugin(data.get('payload', {}))
     
+    def _deliver_dial_rotate(self, context: str, payload: Dict[str, Any]):
+        """把合并后的旋钮转动事件交给对应的Action
+
+        Args:
+            context: Action的上下文标识符
+            payload: 合并后的dialRotate负载（ticks为合计值）
+        """
+        action = self.actions.get(context)
+        if action is not None and hasattr(action, 'on_dial_rotate'):
+            action.on_dial_rotate(payload)
+
+    def _track_power(self, event: str, data: Dict[str, Any]):
+        """把用户输入、设备连接/断开和系统唤醒事件转交给电源管理器
+
+        Args:
+            event: 事件类型
+            data: 完整的事件消息
+        """
+        if event in ('keyDown', 'keyUp', 'dialDown', 'dialUp', 'dialRotate', 'touchTap'):
+            self.power.note_input()
+        elif event == 'deviceDidConnect':
+            self.power.device_connected(data.get('device'))
+        elif event == 'deviceDidDisconnect':
+            self.power.device_disconnected(data.get('device'))
+        elif event == 'systemDidWakeUp':
+            self.power.system_woke()
+
     def set_global_settings(self, payload: Any):
         """更新插件的全局设置
         
@@ -0,0 +1,144 @@
+"""Plugin-wide power saving: suspend polling and animation nobody can see.
+
+Three modes:
+    ACTIVE    — normal cadence.
+    IDLE      — no key/dial input for `idle_timeout` seconds: animations pause,
+                poll intervals stretch by IDLE_POLL_FACTOR.
+    SUSPENDED — no StreamDock device connected (unplugged, or the system went
+                to sleep and the device dropped): animations and polls stop.
+
+The Timer does the throttling (intervals are tagged POLL / ANIMATION when
+registered). Untagged work, such as Game Volume enforcement, which controls
+audio rather than a display, always runs at its own cadence. Other
+components (DiscordRPC, to re-sync on resume) subscribe with
+add_listener(cb) and get cb(mode) on every change. Any input, device
+connect or systemDidWakeUp returns to ACTIVE immediately and fires every
+POLL interval on the next timer pass, so keys show fresh state at once
+instead of waiting out a stretched interval.
+
+The idle timeout is configurable via global settings:
+    {"power": {"idle_timeout": 300}}   # seconds, 0 disables idle mode
+"""
+
+import json
+import threading
+import time
+
+from .logger import Logger
+from .timer import POLL, ANIMATION
+
+ACTIVE = "active"
+IDLE = "idle"
+SUSPENDED = "suspended"
+
+DEFAULT_IDLE_TIMEOUT = 300.0  # seconds
+IDLE_POLL_FACTOR = 10         # 200ms polls -> 2s while idle
+
+
+class PowerManager:
+    def __init__(self, timer, info=None):
+        self.timer = timer
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._last_input = time.monotonic()
+        self._mode = ACTIVE
+        # devices known from the registration info; if it can't be parsed
+        # assume one is attached rather than starting suspended
+        self._devices = self._initial_devices(info)
+        self._unknown_devices = self._devices is None
+        if self._devices is None:
+            self._devices = set()
+        self.timer.set_interval("power_idle_check", 1000, self._check_idle)
+
+    @staticmethod
+    def _initial_devices(info):
+        try:
+            if isinstance(info, str):
+                info = json.loads(info)
+            return {d.get("id") for d in (info or {}).get("devices", [])}
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------------ API
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def add_listener(self, cb):
+        with self._lock:
+            if cb not in self._listeners:
+                self._listeners.append(cb)
+
+    def remove_listener(self, cb):
+        with self._lock:
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+    def load(self, settings):
+        power = (settings or {}).get("power") or {}
+        if "idle_timeout" in power:
+            try:
+                self.idle_timeout = max(0.0, float(power["idle_timeout"]))
+            except (TypeError, ValueError):
+                Logger.warning(f"[Power] Bad idle_timeout: {power['idle_timeout']!r}")
+
+    # -------------------------------------------------------------- signals
+
+    def note_input(self):
+        self._last_input = time.monotonic()
+        if self._mode == IDLE:
+            self._set_mode(ACTIVE)
+
+    def device_connected(self, device):
+        with self._lock:
+            self._devices.add(device)
+            self._unknown_devices = False
+        self._last_input = time.monotonic()
+        self._set_mode(ACTIVE)
+
+    def device_disconnected(self, device):
+        with self._lock:
+            self._devices.discard(device)
+            none_left = not self._devices and not self._unknown_devices
+        if none_left:
+            self._set_mode(SUSPENDED)
+
+    def system_woke(self):
+        self._last_input = time.monotonic()
+        with self._lock:
+            has_device = bool(self._devices) or self._unknown_devices
+        if has_device:
+            self._set_mode(ACTIVE)
+
+    # ------------------------------------------------------------ internals
+
+    def _check_idle(self):
+        if self._mode != ACTIVE or not self.idle_timeout:
+            return
+        if time.monotonic() - self._last_input >= self.idle_timeout:
+            self._set_mode(IDLE)
+
+    def _set_mode(self, mode):
+        with self._lock:
+            if mode == self._mode:
+                return
+            previous, self._mode = self._mode, mode
+            listeners = list(self._listeners)
+        Logger.info(f"[Power] {previous} -> {mode}")
+        if mode == ACTIVE:
+            self.timer.set_scale(ANIMATION, 1)
+            self.timer.set_scale(POLL, 1)
+            self.timer.run_soon(POLL)  # fresh state sync on resume
+        elif mode == IDLE:
+            self.timer.set_scale(ANIMATION, None)
+            self.timer.set_scale(POLL, IDLE_POLL_FACTOR)
+        else:
+            self.timer.set_scale(ANIMATION, None)
+            self.timer.set_scale(POLL, None)
+        for cb in listeners:
+            try:
+                cb(mode)
+            except Exception as e:
+                Logger.error(f"[Power] listener error: {e}")
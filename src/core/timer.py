@@ -1,37 +1,55 @@
 import threading
 import time
-from typing import Dict, Callable
+from typing import Dict, Callable, Optional
+
+# Interval kinds, throttled by the power manager (see power.py). Untagged
+# intervals always run at their own cadence.
+POLL = "poll"            # state polling: stretched when idle, stopped when suspended
+ANIMATION = "animation"  # frame stepping: paused whenever not active
+
 
 class Timer:
     def __init__(self):
         self._intervals: Dict[str, Dict] = {}
+        self._scale: Dict[str, Optional[float]] = {}  # kind -> delay multiplier, None = paused
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
     
     def _run(self):
-        # Timer callbacks (volume/game_volume) make COM audio calls
-        # on THIS thread. COM must be initialized per-thread, so do it once
-        # here — the actions' own CoInitialize() runs on a different thread.
-        try:
-            from comtypes import CoInitialize
-            CoInitialize()
-        except Exception:
-            pass
+        # no COM here: audio callbacks hand their COM work to the audio
+        # worker thread (audio_worker.py), which owns the apartment
         while True:
             current_time = time.time()
+            next_due = current_time + 0.1
             for uuid, data in list(self._intervals.items()):
-                if current_time - data['last_run'] >= data['delay']:
+                scale = self._scale.get(data['kind'], 1)
+                if scale is None:
+                    continue
+                if current_time - data['last_run'] >= data['delay'] * scale:
                     data['callback']()
                     data['last_run'] = current_time
-            time.sleep(0.1)
+                next_due = min(next_due, data['last_run'] + data['delay'] * scale)
+            # wake for the soonest interval (sub-100ms ones included), at most every 100ms
+            time.sleep(min(0.1, max(0.005, next_due - time.time())))
     
-    def set_interval(self, uuid: str, delay: float, callback: Callable):
+    def set_interval(self, uuid: str, delay: float, callback: Callable, kind: Optional[str] = None):
         self._intervals[uuid] = {
             'delay': delay / 1000,  # Convert ms to seconds
             'callback': callback,
-            'last_run': time.time()
+            'last_run': time.time(),
+            'kind': kind
         }
     
     def clear_interval(self, uuid: str):
         if uuid in self._intervals:
-            del self._intervals[uuid]
\ No newline at end of file
+            del self._intervals[uuid]
+
+    def set_scale(self, kind: str, scale: Optional[float]):
+        """Stretch every interval of `kind` by `scale` (None pauses them)."""
+        self._scale[kind] = scale
+
+    def run_soon(self, kind: str):
+        """Make every interval of `kind` due on the next pass."""
+        for data in list(self._intervals.values()):
+            if data['kind'] == kind:
+                data['last_run'] = 0.0
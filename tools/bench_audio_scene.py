@@ -0,0 +1,159 @@
+"""Time-to-apply benchmark for audio scenes.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_audio_scene.py [--apps 25] [--runs 20]
+
+Applies one scene over the simulated session backend, with realistic COM
+costs: three per-app rules for excluded apps, a Game Volume level, and
+Discord output volume + deafen + mute. Compared with the same result
+reached the old way, one action per setting. Each per-app press enumerates
+and writes in its own worker round trip. The Game Volume change runs its
+own enforcement pass. Every Discord field goes out as its own
+SET_VOICE_SETTINGS.
+Reports time-to-apply, enumerations, volume COM calls, worker commands and
+Discord sends, and checks both ways leave every session and Discord in the
+same state.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_sessions, game_volume
+from src.core.audio_scene import apply_scene, normalize
+from src.core.audio_sim import SimulatedSessionBackend
+from src.core.audio_worker import get_audio_worker
+from tools.bench_util import FakePlugin
+
+CALL_COST_S = 0.00003     # ~30us per ISimpleAudioVolume call
+ENUMERATE_COST_S = 0.004  # ~4ms per GetAllSessions()
+COM_CALLS = ("GetMasterVolume", "SetMasterVolume", "GetMute", "SetMute")
+EXCLUDE = ["Discord.exe", "Spotify.exe", "obs64.exe"]
+
+SCENE = normalize({
+    "apps": {"Discord.exe": {"level": 80}, "Spotify.exe": {"level": 30, "muted": False},
+             "obs64.exe": {"level": 100, "muted": True}},
+    "game_volume": {"level": 60, "muted": False},
+    "discord": {"output_volume": 120, "deaf": False, "mute": False},
+})
+
+
+class FakeTimer:
+    def set_interval(self, uuid, delay, callback, kind=None):
+        pass
+
+    def clear_interval(self, uuid):
+        pass
+
+
+class FakeRPC:
+    """DiscordRPC stand-in: every queued patch counts as one send."""
+
+    ready = True
+
+    def __init__(self):
+        self.voice = {"output_volume": 100.0, "deaf": True, "mute": True}
+        self.sends = 0
+
+    def set_local_voice(self, fields):
+        self.voice.update(fields)
+
+    def queue_voice_patch(self, patch):
+        self.sends += 1
+
+
+def setup(apps):
+    backend = SimulatedSessionBackend(ENUMERATE_COST_S, call_cost_s=CALL_COST_S)
+    audio_sessions.set_backend(backend)
+    game_volume._controller = None
+    for i in range(apps):
+        backend.add(f"game{i}.exe", level=0.5)
+    backend.add("Discord.exe", level=1.0)
+    backend.add("Discord.exe", audio_service=True, level=0.5)  # follows game volume
+    backend.add("Spotify.exe", level=1.0)
+    backend.add("obs64.exe", level=0.5)
+    audio_sessions.get_registry().sessions()  # warm: first enumeration + notifications
+    return backend
+
+
+def state(backend, rpc):
+    sessions = sorted(backend.enumerate(), key=lambda s: s.key)
+    return ([(round(s.SimpleAudioVolume.level, 2), s.SimpleAudioVolume.muted) for s in sessions],
+            dict(rpc.voice))
+
+
+def one_by_one(plugin, rpc):
+    """One action per setting, as without scenes."""
+    worker = get_audio_worker()
+    for name, rule in SCENE["apps"].items():
+        def press(name=name, rule=rule):
+            for s in audio_sessions.sessions_for_process([name], force=True):
+                vol = s.SimpleAudioVolume
+                if audio_sessions.is_audio_service(s):
+                    continue  # Discord's media session belongs to Game Volume
+                vol.SetMasterVolume(rule["level"] / 100.0, None)
+                if "muted" in rule:
+                    vol.SetMute(1 if rule["muted"] else 0, None)
+        worker.call(press)
+    controller = game_volume.get_controller()
+    controller.bind(plugin)
+    controller.set_target(**SCENE["game_volume"])
+    worker.call(controller.apply)
+    controller.commit()
+    discord = SCENE["discord"]
+    for field in ("output_volume", "deaf", "mute"):
+        rpc.set_local_voice({field: discord[field]})
+        rpc.queue_voice_patch({"output": {"volume": discord[field]}} if field == "output_volume"
+                              else {field: discord[field]})
+
+
+def measure(apps, runs, fn):
+    times, counts = [], None
+    for _ in range(runs):
+        backend = setup(apps)
+        plugin = FakePlugin({"game_volume": {"level": 50, "muted": False, "exclude": EXCLUDE}}, FakeTimer())
+        rpc = FakeRPC()
+        worker = get_audio_worker()
+        enumerations, calls = backend.enumerations, sum(backend.calls[k] for k in COM_CALLS)
+        commands = worker.stats["commands"]
+        start = time.perf_counter()
+        fn(plugin, rpc)
+        times.append((time.perf_counter() - start) * 1000.0)
+        counts = (backend.enumerations - enumerations,
+                  sum(backend.calls[k] for k in COM_CALLS) - calls,
+                  worker.stats["commands"] - commands, rpc.sends)
+        final = state(backend, rpc)
+    times.sort()
+    return times[len(times) // 2], counts, final
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    reports = []
+
+    def scene(plugin, rpc):
+        reports.append(apply_scene(SCENE, plugin, rpc))
+
+    print(f"{args.apps} game apps + Discord (voice + media), Spotify, OBS;"
+          f" scene = 3 app rules + game level + 3 Discord fields")
+    results = {}
+    for label, fn in (("one action per setting", one_by_one), ("scene transaction", scene)):
+        p50, (enums, calls, commands, sends), final = measure(args.apps, args.runs, fn)
+        results[label] = final
+        print(f"  {label + ':':24} {p50:6.2f} ms to apply, {enums} enumerations,"
+              f" {calls:3} volume COM calls, {commands} worker commands, {sends} Discord sends")
+    if len({repr(v) for v in results.values()}) != 1:
+        print(f"FAILED: end states differ: {results}")
+        sys.exit(1)
+    print(f"  report: {reports[-1].summary()}")
+    print("both ways leave every session and Discord in the same state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Offline check + benchmark for the notification-driven session registry.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_audio_sessions.py [--minutes 5] [--apps 25]
+
+Drives src/core/audio_sessions.py against the simulated backend for a
+simulated stretch of 200ms game-volume ticks while apps start and stop,
+verifies after every tick that the registry matches the backend exactly,
+and compares how many full session enumerations it needed against the old
+1s-TTL cache (one GetAllSessions() per TTL window). Enumeration is given a
+realistic per-call cost so the per-tick timings mean something.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_sessions
+from src.core.audio_sim import SimulatedSessionBackend
+
+TICK_S = 0.2
+ENUMERATE_COST_S = 0.004  # typical GetAllSessions() wall time with ~25 sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--apps", type=int, default=25)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    backend = SimulatedSessionBackend(enumerate_cost_s=ENUMERATE_COST_S)
+    live = [backend.add(f"app{i}.exe") for i in range(args.apps)]
+    registry = audio_sessions.set_backend(backend)
+
+    ticks = int(args.minutes * 60 / TICK_S)
+    churn = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if rng.random() < 0.02:  # an app starts or quits roughly every 10s
+            churn += 1
+            if live and rng.random() < 0.5:
+                backend.remove(live.pop(rng.randrange(len(live))))
+            else:
+                live.append(backend.add(f"app{args.apps + churn}.exe"))
+        got = {s.key for s in audio_sessions.get_all_sessions()}
+        if got != {s.key for s in live}:
+            print(f"MISMATCH at tick {tick}: registry={len(got)} backend={len(live)}")
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    ttl_enumerations = int(ticks * TICK_S / audio_sessions.SESSIONS_TTL)
+    print(f"{ticks} ticks ({args.minutes:g} min simulated), {churn} app start/stops — registry always matched")
+    print(f"enumerations: registry={backend.enumerations}  ttl-cache~={ttl_enumerations}")
+    print(f"registry stats: {registry.stats}")
+    print(f"avg get_all_sessions(): {elapsed / ticks * 1e6:.1f} us "
+          f"(one enumeration costs {ENUMERATE_COST_S * 1e6:.0f} us)")
+
+
+if __name__ == "__main__":
+    main()
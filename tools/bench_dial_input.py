@@ -0,0 +1,85 @@
+"""Dial input coalescing benchmark.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_dial_input.py [--spin-hz 100]
+
+Feeds DialInput (src/core/dial_input.py) real-time dialRotate messages —
+a fast spin of one-tick messages, then a slow turn — and counts how many
+on_dial_rotate calls (= volume writes) reach the action, against one per
+message before. With a 5% step starting at 50%, also reports how long the
+spin takes to reach 100% with and without velocity-aware stepping, and
+checks slow turns are never scaled.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.dial_input import DialInput
+
+STEP = 5
+
+
+class Knob:
+    """Volume-like receiver: 5% per delivered tick, clamped to 0..100."""
+
+    def __init__(self):
+        self.level = 50
+        self.calls = 0
+        self.reached_max = None
+        self.lock = threading.Lock()
+
+    def on_dial_rotate(self, context, payload):
+        with self.lock:
+            self.calls += 1
+            self.level = max(0, min(100, self.level + payload["ticks"] * STEP))
+            if self.level == 100 and self.reached_max is None:
+                self.reached_max = time.perf_counter()
+
+
+def spin(accelerate, hz, ticks):
+    knob = Knob()
+    dial = DialInput(knob.on_dial_rotate)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        dial.push("knob", {"ticks": 1}, accelerate)
+        time.sleep(1.0 / hz)
+    time.sleep(0.1)  # let the last window flush
+    reached = (knob.reached_max - start) * 1000 if knob.reached_max else float("nan")
+    return dial.stats["events"], knob.calls, reached
+
+
+def slow_turn():
+    knob = Knob()
+    dial = DialInput(knob.on_dial_rotate)
+    for _ in range(5):
+        dial.push("knob", {"ticks": 1}, True)
+        time.sleep(0.2)
+    time.sleep(0.1)
+    return knob.level
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spin-hz", type=float, default=100.0)
+    parser.add_argument("--ticks", type=int, default=40)
+    args = parser.parse_args()
+
+    events, calls, plain = spin(False, args.spin_hz, args.ticks)
+    _, accel_calls, accel = spin(True, args.spin_hz, args.ticks)
+    print(f"fast spin: {events} one-tick messages at {args.spin_hz:.0f}/s")
+    print(f"  handler calls (writes): {calls} coalesced, {accel_calls} with acceleration"
+          f" (was {events})")
+    print(f"  50% -> 100%: {plain:.0f} ms at fixed steps, {accel:.0f} ms with acceleration")
+    level = slow_turn()
+    if level != 50 + 5 * STEP:
+        print(f"FAILED: slow turn scaled (level {level}, want {50 + 5 * STEP})")
+        sys.exit(1)
+    print("slow turn (5 ticks at 5/s): one step per tick, unscaled")
+
+
+if __name__ == "__main__":
+    main()
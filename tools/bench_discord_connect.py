@@ -0,0 +1,70 @@
+"""Time-to-READY for DiscordRPC: pipelined post-auth requests vs one at a time.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_connect.py [--latency-ms 1 10 30] [--runs 7]
+
+Reconnects the real client to tools/fake_discord.py (stored token, so no
+AUTHORIZE) at each reply latency and reads DiscordRPC.last_connect: the
+handshake, AUTHENTICATE and post-auth sync (SUBSCRIBE + GET_VOICE_SETTINGS)
+phases and the total from opening the IPC connection to READY. Compared with
+the sync phase done as before: SUBSCRIBE, wait, GET_VOICE_SETTINGS, wait.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import READY, DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+
+PHASES = ("handshake_ms", "auth_ms", "sync_ms", "total_ms")
+
+
+class SerialRPC(DiscordRPC):
+    """The post-auth sequence as it was: one blocking request at a time."""
+
+    def _sync_after_auth(self):
+        self.request("SUBSCRIBE", {}, evt="VOICE_SETTINGS_UPDATE")
+        return self.request("GET_VOICE_SETTINGS")
+
+
+def measure(cls, runs):
+    samples = []
+    with connected(cls(FakePlugin()), stored_creds()) as rpc:  # warms imports and the fake
+        for _ in range(runs):
+            rpc.last_connect = {}
+            rpc._kill_connection()  # reconnect right away
+            rpc._wake.set()
+            if not wait_for(lambda: rpc.state == READY and rpc.last_connect):
+                print(f"FAILED: {cls.__name__} did not reconnect ({rpc.state})")
+                sys.exit(1)
+            samples.append(rpc.last_connect)
+    return {phase: statistics.median(s[phase] for s in samples) for phase in PHASES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[1.0, 10.0, 30.0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="show the client's log")
+    args = parser.parse_args()
+    if not args.verbose:
+        Logger.get_logger().setLevel(logging.ERROR)
+
+    with serve_fake_discord() as fake:
+        print(f"median of {args.runs} reconnects (stored token): handshake / authenticate /"
+              f" subscribe+get / total, ms")
+        for latency in args.latency_ms:
+            fake.latency_s = latency / 1000.0
+            for label, cls in (("one at a time", SerialRPC), ("pipelined", DiscordRPC)):
+                p = measure(cls, args.runs)
+                print(f"  {latency:4g} ms replies, {label + ':':14} {p['handshake_ms']:6.1f} /"
+                      f" {p['auth_ms']:6.1f} / {p['sync_ms']:6.1f} / {p['total_ms']:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Echo suppression: sequence-tagged writes vs the old 300 ms window.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_echo.py [--latency-ms 50 200 500] [--runs 5]
+
+Runs the real client against tools/fake_discord.py with injected reply
+latency. Two checks:
+- spin: 30 dial ticks at 50 Hz, always turning up, then let go. Counts the
+  times the displayed output volume stepped backwards (a stale echo shown),
+  and whether the display ends on the final value.
+- Discord UI change: right after one of our writes has been answered, the
+  volume is changed in Discord itself. Reports how long until the display
+  shows it ("lost" if it never does within 2 s).
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+
+ECHO_SUPPRESS_S = 0.3
+
+
+class Recorder:
+    """Records every output volume the display is told about."""
+
+    def __init__(self, plugin):
+        self.shown = []
+        super().__init__(plugin)
+
+    def _notify(self, changed):
+        if "output_volume" in changed:
+            self.shown.append(self._voice["output_volume"])
+        super()._notify(changed)
+
+
+class SequenceRPC(Recorder, DiscordRPC):
+    pass
+
+
+class TimeWindowRPC(Recorder, DiscordRPC):
+    """Echo suppression as it was: server values ignored for 300 ms after
+    any local write of the field."""
+
+    def __init__(self, plugin):
+        super().__init__(plugin)
+        self._local_ts = {}
+
+    def set_local_voice(self, fields):
+        now = time.monotonic()
+        with self._lock:
+            for field in fields:
+                self._local_ts[field] = now
+        super().set_local_voice(fields)
+
+    def _apply_server_voice(self, data):
+        now = time.monotonic()
+        out = data.get("output") or {}
+        changed = set()
+        with self._lock:
+            if "volume" in out and now - self._local_ts.get("output_volume", 0) > ECHO_SUPPRESS_S:
+                if self._voice["output_volume"] != float(out["volume"]):
+                    self._voice["output_volume"] = float(out["volume"])
+                    changed.add("output_volume")
+        self._notify(changed)
+
+
+def settled(rpc):
+    with rpc._lock:
+        return rpc._inflight is None and not rpc._pending_patch
+
+
+def spin(rpc, fake, latency_s):
+    """Returns (backward steps shown, display ended on the final value)."""
+    fake.set_voice(output_volume=20.0)
+    wait_for(lambda: rpc.voice_snapshot()["output_volume"] == 20.0)
+    time.sleep(ECHO_SUPPRESS_S + latency_s)
+    rpc.shown = []
+    for value in range(21, 51):
+        rpc.set_local_voice({"output_volume": float(value)})
+        rpc.queue_voice_patch({"output": {"volume": float(value)}})
+        time.sleep(0.02)
+    wait_for(lambda: settled(rpc) and fake.voice["output"]["volume"] == 50.0)
+    time.sleep(2 * latency_s + 0.05)  # trailing dispatches
+    shown = rpc.shown
+    backward = sum(1 for a, b in zip(shown, shown[1:]) if b < a)
+    return backward, rpc.voice_snapshot()["output_volume"] == 50.0
+
+
+def ui_change(rpc, fake):
+    """ms from a Discord-side change to the display showing it (None = lost)."""
+    rpc.set_local_voice({"output_volume": 60.0})
+    rpc.queue_voice_patch({"output": {"volume": 60.0}})
+    wait_for(lambda: settled(rpc))
+    start = time.monotonic()
+    fake.set_voice(output_volume=90.0)
+    if not wait_for(lambda: rpc.voice_snapshot()["output_volume"] == 90.0, timeout=2.0):
+        return None
+    return (time.monotonic() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[50.0, 200.0, 500.0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    Logger.get_logger().setLevel(logging.ERROR)
+
+    print(f"{args.runs} runs per row; spin = 30 ticks at 50 Hz, always up")
+    with serve_fake_discord() as fake:
+        for latency_ms in args.latency_ms:
+            print(f" {latency_ms:g} ms replies")
+            for label, cls in (("300 ms window (before)", TimeWindowRPC),
+                               ("sequence-tagged writes", SequenceRPC)):
+                fake.latency_s = 0.0
+                with connected(cls(FakePlugin()), stored_creds()) as rpc:
+                    fake.latency_s = latency_ms / 1000.0
+                    backward, final_ok, shown_ms = 0, 0, []
+                    for _ in range(args.runs):
+                        steps, ok = spin(rpc, fake, fake.latency_s)
+                        backward += steps
+                        final_ok += ok
+                        shown_ms.append(ui_change(rpc, fake))
+                seen = [ms for ms in shown_ms if ms is not None]
+                ui = f"{statistics.median(seen):6.1f} ms" if seen else "  n/a"
+                print(f"  {label + ':':24} {backward:3} backward steps, final value {final_ok}/{args.runs};"
+                      f" Discord UI change shown {len(seen)}/{args.runs}, p50 {ui}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""DiscordRPC io thread: readiness wait vs the old 20 ms poll.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_io.py [--idle 3] [--samples 40]
+
+Connects the real client to tools/fake_discord.py twice: once with the
+event-driven io loop, once with the loop as it was (every 20 ms: write,
+flush, read, sleep). Reports, per loop:
+- idle cost: io-thread passes and process CPU per second while connected
+  and nothing happens;
+- dial-to-Discord: queue_voice_patch() until the fake has the SET;
+- Discord-to-client: a change made in Discord until the client has it.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import SEND_SPACING_S, DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+
+LEGACY_POLL_S = 0.02
+
+
+class CountingRPC(DiscordRPC):
+    """Counts io-thread passes."""
+
+    def __init__(self, plugin):
+        super().__init__(plugin)
+        self.passes = 0
+
+    def _io_wait(self, transport, timeout):
+        self.passes += 1
+        super()._io_wait(transport, timeout)
+
+
+class PollingRPC(CountingRPC):
+    """The io loop before readiness waits: sleep 20 ms between passes."""
+
+    def _io_wait(self, transport, timeout):
+        self.passes += 1
+        time.sleep(LEGACY_POLL_S)
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def measure(cls, idle_s, samples):
+    heard = []
+
+    def on_status(status):
+        heard.append((time.monotonic(), status["voice"]["output_volume"]))
+
+    with serve_fake_discord() as fake, connected(cls(FakePlugin()), stored_creds(), [on_status]) as rpc:
+        time.sleep(0.2)
+
+        passes, cpu, start = rpc.passes, time.process_time(), time.monotonic()
+        time.sleep(idle_s)
+        elapsed = time.monotonic() - start
+        idle_passes = (rpc.passes - passes) / elapsed
+        idle_cpu = (time.process_time() - cpu) / elapsed * 1000.0
+
+        to_discord, to_client = [], []
+        for i in range(samples):
+            time.sleep(SEND_SPACING_S + 0.01)
+            sets = len(fake.sets)
+            start = time.monotonic()
+            rpc.queue_voice_patch({"output": {"volume": 10 + i}})
+            if not wait_for(lambda: len(fake.sets) > sets):
+                print("FAILED: SET never arrived")
+                sys.exit(1)
+            to_discord.append((fake.sets[sets][0] - start) * 1000.0)
+
+            time.sleep(0.03)
+            value = 150.0 + i
+            start = time.monotonic()
+            fake.set_voice(output_volume=value)
+            if not wait_for(lambda: heard and heard[-1][1] == value):
+                print("FAILED: Discord change never reached the client")
+                sys.exit(1)
+            to_client.append((heard[-1][0] - start) * 1000.0)
+        return idle_passes, idle_cpu, to_discord, to_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=3.0, help="seconds measured idle")
+    parser.add_argument("--samples", type=int, default=40)
+    parser.add_argument("--verbose", action="store_true", help="show the client's log")
+    args = parser.parse_args()
+    if not args.verbose:
+        Logger.get_logger().setLevel(logging.ERROR)
+
+    print(f"idle {args.idle:g} s, then {args.samples} dial ticks and {args.samples} Discord-side changes")
+    for label, cls in (("20 ms poll", PollingRPC), ("readiness wait", CountingRPC)):
+        passes, cpu, to_discord, to_client = measure(cls, args.idle, args.samples)
+        print(f"  {label + ':':16} idle {passes:6.1f} passes/s {cpu:6.2f} ms CPU/s;"
+              f" dial-to-Discord p50/p95 {pct(to_discord, 0.5):5.2f}/{pct(to_discord, 0.95):5.2f} ms;"
+              f" Discord-to-client p50/p95 {pct(to_client, 0.5):5.2f}/{pct(to_client, 0.95):5.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Time-to-READY after Discord starts, while the plugin is waiting for it.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_launch.py [--runs 7] [--closed 10] [--startup 2]
+
+The client runs with a stored token while tools/fake_discord.py is stopped
+for --closed to --closed + 5 seconds (Discord not running), long enough for the reconnect
+delay to reach its ceiling. Then Discord "launches": the applicationDidLaunch
+event arrives, and the IPC socket appears --startup seconds later, as the
+real client takes a moment to open it. Reports the median from the socket
+appearing to READY for:
+- the old fixed 5 s retry (and 3 s after a drop);
+- the jittered backoff alone (no launch event delivered);
+- the backoff plus the launch event.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import NO_DISCORD, READY, DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+
+
+class FixedRetryRPC(DiscordRPC):
+    """Retries as before: every 5 s, 3 s after a drop, no launch events."""
+
+    def _retry_delay(self):
+        return 3.0 if self._state == READY else 5.0
+
+    def note_app_launched(self, application):
+        pass
+
+
+class NoLaunchEventRPC(DiscordRPC):
+    """The backoff alone: the manifest doesn't monitor Discord."""
+
+    def note_app_launched(self, application):
+        pass
+
+
+def measure(cls, runs, closed_s, startup_s):
+    samples = []
+    with serve_fake_discord() as fake, connected(cls(FakePlugin()), stored_creds(), timeout=30.0) as rpc:
+        for _ in range(runs):
+            fake.stop()  # Discord quits
+            wait_for(lambda: rpc.state == NO_DISCORD, timeout=30.0)
+            time.sleep(closed_s + random.uniform(0.0, 5.0))  # any phase of the retry cycle
+            rpc.note_app_launched("C:\\Users\\me\\AppData\\Local\\Discord\\app-1.0.9\\Discord.exe")
+            time.sleep(startup_s)
+            fake.start()
+            opened = time.monotonic()
+            if not wait_for(lambda: rpc.state == READY, timeout=30.0):
+                print(f"FAILED: {cls.__name__} did not find Discord again ({rpc.state})")
+                sys.exit(1)
+            samples.append((time.monotonic() - opened) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--closed", type=float, default=10.0, help="seconds Discord stays closed")
+    parser.add_argument("--startup", type=float, default=2.0,
+                        help="seconds from the launch event to the IPC socket")
+    args = parser.parse_args()
+    Logger.get_logger().setLevel(logging.ERROR)
+    random.seed(1)
+
+    print(f"Discord closed for {args.closed:g}-{args.closed + 5:g} s, IPC socket up {args.startup:g} s after launch;"
+          f" median / worst of {args.runs}, socket up -> READY")
+    for label, cls in (("fixed 5 s retry (before)", FixedRetryRPC),
+                       ("backoff, no launch event", NoLaunchEventRPC),
+                       ("backoff + launch event", DiscordRPC)):
+        p50, worst = measure(cls, args.runs, args.closed, args.startup)
+        print(f"  {label + ':':27} {p50:7.1f} / {worst:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
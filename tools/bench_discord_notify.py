@@ -0,0 +1,113 @@
+"""Status fan-out: where DiscordRPC listeners run, and how often.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_notify.py [--keys 3] [--burst 20] [--bursts 10]
+
+Connects the real client to tools/fake_discord.py with --keys listeners that
+render like the Discord keys: discord_faces.icon_face(), which is PIL
+compositing plus a PNG encode. Discord then sends a burst of --burst
+VOICE_SETTINGS_UPDATEs, like someone dragging a slider in Discord: the
+output volume (shown on the keys), then the input volume (not shown).
+Reports per burst:
+- renders: listener calls;
+- io stall: time the io thread spent inside listeners;
+- settle: time from the burst's last update leaving Discord to the client's
+  snapshot holding it, i.e. how far the io thread fell behind.
+Compared: listeners called synchronously on the producing thread; the
+notify thread with every listener hearing every change; and with listeners
+subscribed to the fields the Discord keys show.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import discord_faces
+from src.core.discord_rpc import DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+
+
+# DiscordVoice.RPC_FIELDS / DiscordMute.RPC_FIELDS
+KEY_FIELDS = ("state", "detail", "user", "has_creds", "output_volume", "deaf", "mute")
+
+
+class SyncNotifyRPC(DiscordRPC):
+    """Listeners called as before: in turn, on the thread that changed the
+    status (the io thread for server updates), whatever changed."""
+
+    def _notify(self, changed):
+        with self._lock:
+            listeners = list(self._listeners)
+        status = self.status()
+        for cb in listeners:
+            cb(status)
+
+
+class KeyListener:
+    """Renders a face per status, like DiscordVoice / DiscordMute."""
+
+    def __init__(self, counters):
+        self.counters = counters
+
+    def __call__(self, status):
+        start = time.perf_counter()
+        voice = status["voice"]
+        discord_faces.icon_face("muted" if voice["mute"] else "mic", voice["output_volume"])
+        elapsed = time.perf_counter() - start
+        with self.counters["lock"]:
+            self.counters["renders"] += 1
+            if threading.current_thread().name == "discord-io":
+                self.counters["io_s"] += elapsed
+
+
+def measure(cls, fields, slider, fake, keys, burst, bursts):
+    counters = {"lock": threading.Lock(), "renders": 0, "io_s": 0.0}
+    listeners = [KeyListener(counters) for _ in range(keys)]
+    renders, stalls, settles = [], [], []
+    with connected(cls(FakePlugin()), stored_creds(), listeners, fields) as rpc:
+        time.sleep(0.3)
+        volume = 50.0
+        for _ in range(bursts):
+            before, io_before = counters["renders"], counters["io_s"]
+            for _ in range(burst):
+                volume = 50.0 + (volume + 7.0) % 100.0
+                fake.set_voice(**{slider: volume})
+            sent = time.monotonic()
+            if not wait_for(lambda: rpc.voice_snapshot()[slider] == volume, poll_s=0.0002):
+                print("FAILED: the last update never arrived")
+                sys.exit(1)
+            settles.append((time.monotonic() - sent) * 1000)
+            time.sleep(0.3)  # let every render finish
+            renders.append((counters["renders"] - before) / keys)
+            stalls.append((counters["io_s"] - io_before) * 1000)
+    return statistics.median(renders), statistics.median(stalls), statistics.median(settles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=3, help="listeners (Discord keys on screen)")
+    parser.add_argument("--burst", type=int, default=20, help="updates per burst")
+    parser.add_argument("--bursts", type=int, default=10)
+    args = parser.parse_args()
+    Logger.get_logger().setLevel(logging.ERROR)
+
+    print(f"{args.keys} keys, bursts of {args.burst} VOICE_SETTINGS_UPDATEs; medians over {args.bursts} bursts")
+    with serve_fake_discord() as fake:
+        for slider in ("output_volume", "input_volume"):
+            print(f" {slider} bursts")
+            for label, cls, fields in (("listeners on io thread", SyncNotifyRPC, None),
+                                       ("notify thread, all fields", DiscordRPC, None),
+                                       ("notify thread, key fields", DiscordRPC, KEY_FIELDS)):
+                renders, stall, settle = measure(cls, fields, slider, fake, args.keys, args.burst, args.bursts)
+                print(f"  {label + ':':27} {renders:4.1f} renders per key, io stall {stall:6.2f} ms,"
+                      f" settle {settle:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
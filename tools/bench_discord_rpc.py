@@ -0,0 +1,152 @@
+"""Offline DiscordRPC benchmark against tools/fake_discord.py.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_rpc.py [--latency-ms 2] [--dials 20] [--verbose]
+
+Runs the real DiscordRPC client (state machine, request layer, coalescer)
+over a Unix socket to FakeDiscord, with tokens from the local TokenStub.
+Measures:
+- time to READY on first connect (AUTHORIZE + token exchange) and after
+  Discord drops the connection (stored token);
+- dial-to-ack: queue_voice_patch() until Discord has the SET, and until its
+  reply is dispatched back in the client;
+- coalescing: a 200 Hz dial spin for one second, in SETs sent and whether
+  Discord ends on the last value;
+- the same spin under a rate limit and against a slow Discord (voice patch
+  counters: requested / merged / sent / rate_limited), and a SET while
+  another app owns the voice settings.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import OP_FRAME, READY, DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, wait_for
+from tools.fake_discord import FakeDiscord, TokenStub
+
+CLIENT_ID = "123456789012345678"
+
+
+class TimedRPC(DiscordRPC):
+    """Records when each SET_VOICE_SETTINGS reply reaches the client."""
+
+    def __init__(self, plugin):
+        super().__init__(plugin)
+        self.acks = []
+
+    def _dispatch(self, op, msg):
+        if op == OP_FRAME and msg.get("cmd") == "SET_VOICE_SETTINGS":
+            self.acks.append(time.monotonic())
+        super()._dispatch(op, msg)
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def dial_spin(rpc, fake, seconds=1.0, hz=200):
+    """Dial ticks at `hz`; returns (ticks, SETs Discord received, final ok)."""
+    sets_before = len(fake.sets)
+    ticks = int(seconds * hz)
+    value = 0
+    for i in range(ticks):
+        value = 20 + (i % 150)
+        rpc.set_local_voice({"output_volume": float(value)})
+        rpc.queue_voice_patch({"output": {"volume": value}})
+        time.sleep(1.0 / hz)
+    ok = wait_for(lambda: fake.voice["output"]["volume"] == value, timeout=3.0)
+    time.sleep(0.2)
+    return ticks, len(fake.sets) - sets_before, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="FakeDiscord reply latency")
+    parser.add_argument("--dials", type=int, default=20, help="spaced dial ticks for dial-to-ack")
+    parser.add_argument("--reconnects", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="show the client's log")
+    args = parser.parse_args()
+    if not args.verbose:
+        Logger.get_logger().setLevel(logging.ERROR)
+
+    with serve_fake_discord(FakeDiscord(client_ids=[CLIENT_ID])) as fake:
+        fake.latency_s = args.latency_ms / 1000.0
+        stub = TokenStub(fake).start()
+        rpc = TimedRPC(FakePlugin())
+        rpc.tokens.token_url = stub.url
+        try:
+            print(f"FakeDiscord with {args.latency_ms:g} ms reply latency")
+
+            rpc.save_credentials(CLIENT_ID, "secret")
+            rpc.begin_authorize()
+            start = time.monotonic()
+            with connected(rpc, timeout=15.0):
+                first_ms = (time.monotonic() - start) * 1000
+                print(f"  first connect (authorize + token):  {first_ms:7.1f} ms to READY")
+
+                reconnects = []
+                for _ in range(args.reconnects):
+                    fake.drop()
+                    start = time.monotonic()
+                    wait_for(lambda: rpc.state != READY, timeout=2.0)
+                    if not wait_for(lambda: rpc.state == READY and fake.connections, timeout=30.0):
+                        print(f"FAILED: no READY after a dropped connection (state={rpc.state})")
+                        sys.exit(1)
+                    reconnects.append((time.monotonic() - start) * 1000)
+                print(f"  reconnect after a drop (p50):       {statistics.median(reconnects):7.1f} ms to READY")
+
+                wire, acked = [], []
+                for i in range(args.dials):
+                    sets, acks = len(fake.sets), len(rpc.acks)
+                    time.sleep(0.08)  # past SEND_SPACING_S: every tick is its own SET
+                    start = time.monotonic()
+                    rpc.set_local_voice({"output_volume": float(40 + i)})
+                    rpc.queue_voice_patch({"output": {"volume": 40 + i}})
+                    if not wait_for(lambda: len(rpc.acks) > acks, timeout=3.0):
+                        print("FAILED: a SET was never acknowledged")
+                        sys.exit(1)
+                    wire.append((fake.sets[sets][0] - start) * 1000)
+                    acked.append((rpc.acks[acks] - start) * 1000)
+                print(f"  dial-to-Discord  (p50 / p95):       {pct(wire, 0.5):7.1f} / {pct(wire, 0.95):6.1f} ms")
+                print(f"  dial-to-ack      (p50 / p95):       {pct(acked, 0.5):7.1f} / {pct(acked, 0.95):6.1f} ms")
+
+                ticks, sets, ok = dial_spin(rpc, fake)
+                print(f"  200 Hz spin, 1 s: {ticks} ticks -> {sets} SETs"
+                      f" ({ticks / max(1, sets):.1f} ticks per SET), final value {'delivered' if ok else 'LOST'}")
+
+                fake.rate_limit = (5, 1.0)
+                limited = fake.stats["rate_limited"]
+                ticks, sets, ok = dial_spin(rpc, fake)
+                print(f"  same spin, rate limit 5/s: {sets} SETs, {fake.stats['rate_limited'] - limited} rejected,"
+                      f" final value {'delivered' if ok else 'LOST'}")
+                fake.rate_limit = None
+                time.sleep(1.0)
+
+                latency, fake.latency_s = fake.latency_s, 0.15
+                ticks, sets, ok = dial_spin(rpc, fake)
+                print(f"  same spin, 150 ms replies: {sets} SETs, final value {'delivered' if ok else 'LOST'}")
+                fake.latency_s = latency
+                print(f"  voice patches: {rpc.patch_stats()}")
+
+                fake.owned_by_other = True
+                errors = fake.stats["errors"]
+                rpc.queue_voice_patch({"deaf": True})
+                wait_for(lambda: fake.stats["errors"] > errors, timeout=3.0)
+                time.sleep(0.1)
+                print(f"  SET while another app owns voice:   detail={rpc.status()['detail']!r},"
+                      f" local deaf={rpc.voice_snapshot()['deaf']} (Discord: {fake.voice['deaf']})")
+                fake.owned_by_other = False
+                print(f"Discord saw: {dict(fake.stats)}")
+        finally:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Reconnect time-to-READY when the stored Discord token is close to expiry.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/bench_discord_tokens.py [--latency-ms 150] [--runs 7]
+
+Runs the real client against tools/fake_discord.py, with the local TokenStub
+as the OAuth2 token endpoint. --latency-ms stands in for the round trip to
+discord.com; TLS would add more. Each run ages the stored token to 30 min
+left while connected, then Discord drops the connection. Compares:
+- refresh on connect (before): the reconnect refreshes the token itself,
+  with a new HTTP connection for every request;
+- background refresh: TokenManager refreshed the token a day ahead, which
+  here happens as soon as it is aged, while still connected. The reconnect
+  only reads it.
+Reports DiscordRPC.last_connect total (IPC open -> READY) and the HTTP
+connections the token endpoint saw per refresh.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import READY, DiscordRPC
+from src.core.logger import Logger
+from tools.bench_util import FakePlugin, connected, serve_fake_discord, stored_creds, wait_for
+from tools.fake_discord import TokenStub
+
+
+class RefreshOnConnectRPC(DiscordRPC):
+    """Token handling as it was: refreshed inside the connect, one
+    requests.post (one new connection) per refresh, no background thread."""
+
+    def __init__(self, plugin):
+        super().__init__(plugin)
+        self.tokens.start = lambda: None
+
+    def _ensure_token(self, creds):
+        token = creds.get("access_token")
+        if token and time.time() < (creds.get("expires_at") or 0) - 3600:
+            return token
+        resp = requests.post(self.tokens.token_url, data={
+            "grant_type": "refresh_token", "refresh_token": creds["refresh_token"],
+            "client_id": str(creds["client_id"]), "client_secret": creds["client_secret"],
+        }, timeout=10)
+        resp.raise_for_status()
+        return self._store_token_response(resp.json())
+
+
+def measure(cls, fake, stub, runs):
+    rpc = cls(FakePlugin())
+    rpc.tokens.token_url = stub.url
+    creds = stored_creds(refresh_token="refresh-0", expires_at=time.time() + 7 * 86400)
+    totals = []
+    connections, refreshes = stub.connections, stub.requests["refresh_token"]
+    with connected(rpc, creds):
+        for _ in range(runs):
+            with rpc._lock:
+                rpc._creds["expires_at"] = time.time() + 1800  # a week went by
+            refreshed = rpc.tokens.stats["refreshed"]
+            rpc.tokens._retry_at = 0.0  # ...and so did the last refresh
+            rpc.tokens.kick()
+            if cls is DiscordRPC and not wait_for(lambda: rpc.tokens.stats["refreshed"] > refreshed):
+                print("FAILED: no background refresh")
+                sys.exit(1)
+            rpc.last_connect = {}
+            fake.drop()
+            if not wait_for(lambda: rpc.state == READY and rpc.last_connect):
+                print(f"FAILED: {cls.__name__} did not reconnect ({rpc.state})")
+                sys.exit(1)
+            totals.append(rpc.last_connect["total_ms"])
+    refreshes = stub.requests["refresh_token"] - refreshes
+    return statistics.median(totals), max(totals), stub.connections - connections, refreshes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="token endpoint latency")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    Logger.get_logger().setLevel(logging.ERROR)
+
+    print(f"token endpoint latency {args.latency_ms:g} ms; {args.runs} reconnects,"
+          f" each with the token 30 min from expiry")
+    with serve_fake_discord() as fake:
+        stub = TokenStub(fake).start()
+        stub.latency_s = args.latency_ms / 1000.0
+        try:
+            for label, cls in (("refresh on connect (before)", RefreshOnConnectRPC),
+                               ("background refresh", DiscordRPC)):
+                p50, worst, connections, refreshes = measure(cls, fake, stub, args.runs)
+                print(f"  {label + ':':29} reconnect p50 {p50:6.1f} ms, worst {worst:6.1f} ms;"
+                      f" {refreshes} refreshes over {connections} HTTP connections")
+        finally:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
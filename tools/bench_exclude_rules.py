@@ -0,0 +1,106 @@
+"""Benchmark for compiled Game Volume exclude rules (globs + process trees).
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_exclude_rules.py [--sessions 60] [--ticks 1500]
+
+Runs the 200ms game-volume filter against the simulated backend with a rule
+list mixing plain names, globs and a tree: rule (a launcher whose children,
+and their children, play audio). Compares evaluating the rules naively on
+every tick (fnmatch per rule per session, walking each process's parents
+each time) with the compiled matcher (decisions cached per (pid,
+create_time)), in process queries and time per tick. Also checks both give
+the same sessions: tree children excluded, globs matched, and Discord's
+audio-service session still controlled.
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_sessions
+from src.core.audio_sessions import MAX_TREE_DEPTH, TREE_PREFIX, VOICE_SPLIT_APPS, is_audio_service
+from src.core.audio_sim import SimProcess, SimulatedSessionBackend
+
+RULES = ["Discord.exe", "obs64.exe", "*launcher*.exe", "voice?.exe", "tree:Steam.exe"]
+QUERIES = ("Process.name", "Process.cmdline", "Process.parent")
+
+
+def naive_sessions_excluding(sessions, rules):
+    """Every rule checked against every session on every call."""
+    rules = [r.lower() for r in rules]
+    plain = [r for r in rules if not r.startswith(TREE_PREFIX)]
+    tree = [r[len(TREE_PREFIX):] for r in rules if r.startswith(TREE_PREFIX)]
+    matched = []
+    for s in sessions:
+        proc = s.Process
+        if proc:
+            name = os.path.basename(proc.name()).lower()
+            chain, p = [name], proc
+            for _ in range(MAX_TREE_DEPTH):
+                p = p.parent()
+                if p is None:
+                    break
+                chain.append(p.name().lower())
+            if any(fnmatch.fnmatchcase(n, r) for n in chain for r in tree):
+                continue
+            if any(fnmatch.fnmatchcase(name, r) for r in plain):
+                if not (name in VOICE_SPLIT_APPS and is_audio_service(s)):
+                    continue
+        matched.append(s)
+    return matched
+
+
+def run(label, ticks, backend, fn):
+    before = dict(backend.calls)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    queries = sum(backend.calls[k] - before.get(k, 0) for k in QUERIES)
+    print(f"{label:>9}: {queries / ticks:7.2f} process queries/tick  {elapsed / ticks * 1e6:8.1f} us/tick")
+    return {s.key for s in result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--ticks", type=int, default=1500)
+    args = parser.parse_args()
+
+    backend = SimulatedSessionBackend()
+    steam = SimProcess("steam.exe", calls=backend.calls)
+    helper = SimProcess("steamwebhelper.exe", parent=steam, calls=backend.calls)
+    explorer = SimProcess("explorer.exe", calls=backend.calls)
+    expected_out = {
+        backend.add("Discord.exe").key,                      # voice: excluded
+        backend.add("obs64.exe").key,
+        backend.add("EpicGamesLauncher.exe").key,            # glob
+        backend.add("voice1.exe").key,                       # glob
+        backend.add("steamwebhelper.exe", parent=steam).key,  # tree child
+        backend.add("game.exe", parent=helper).key,          # tree grandchild
+    }
+    kept = {
+        backend.add(None).key,                               # system sounds
+        backend.add("Discord.exe", audio_service=True).key,  # carve-out: controlled
+        backend.add("voice12.exe").key,                      # ? is one character
+        backend.add("other.exe", parent=explorer).key,
+    }
+    for i in range(args.sessions - len(expected_out) - len(kept)):
+        kept.add(backend.add(f"app{i}.exe", parent=explorer).key)
+    registry = audio_sessions.set_backend(backend)
+    sessions = registry.sessions()
+
+    old = run("naive", args.ticks, backend, lambda: naive_sessions_excluding(sessions, RULES))
+    new = run("compiled", args.ticks, backend, lambda: audio_sessions.sessions_excluding(RULES))
+    if old != new or new != kept:
+        print(f"MISMATCH: naive={len(old)} compiled={len(new)} expected={len(kept)}")
+        sys.exit(1)
+    print(f"{args.sessions} sessions, {len(new)} controlled — results identical;"
+          f" tree children, globs and the Discord carve-out behave")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Discord IPC frame parser: fuzz check + burst benchmark.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_frame_parser.py [--fuzz 300] [--burst 4000] [--seed 1]
+
+Fuzz: random frame streams (random opcodes, nested JSON with non-ASCII text,
+empty and 200 KB bodies) cut into random chunks, down to single bytes, must
+decode to exactly the frames sent, in order, and match the parser this one
+replaced. Garbage (huge lengths, bad UTF-8, bad JSON) must raise
+ConnectionError, never hang or return junk.
+
+Burst: `--burst` VOICE_SETTINGS_UPDATE frames arriving in one read (what a
+busy Discord does to a client that was briefly descheduled), then a burst of
+200 KB frames, through the old parser (two body copies + `del buf[:n]` per
+frame) and FrameReader. (CPython drops a bytearray prefix by moving its start
+pointer, so the old per-frame `del` never went quadratic there; what remains
+is the copying, which shows on large bodies.)
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_ipc import FrameReader, MAX_FRAME, pack_frame
+from src.core.discord_rpc import OP_FRAME
+
+
+class LegacyParser:
+    """_poll_incoming's parsing as it was (for comparison only)."""
+
+    def __init__(self):
+        self.buf = bytearray()
+
+    def feed(self, data):
+        self.buf += data
+
+    def frames(self):
+        while len(self.buf) >= 8:
+            op, length = struct.unpack("<II", self.buf[:8])
+            if len(self.buf) < 8 + length:
+                break
+            body = bytes(self.buf[8:8 + length])
+            del self.buf[:8 + length]
+            yield op, json.loads(body.decode("utf-8"))
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.randint(-2 ** 40, 2 ** 40)
+    if kind == 1:
+        return rng.random() * 200
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return "".join(rng.choice("aZ09 _-\"\\é中\U0001f3a7") for _ in range(rng.randrange(12)))
+    if kind == 4:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randrange(5))}
+
+
+def random_stream(rng):
+    frames = []
+    for _ in range(rng.randrange(1, 40)):
+        roll = rng.random()
+        if roll < 0.05:
+            msg = {}
+        elif roll < 0.08:
+            msg = {"blob": "x" * rng.randrange(50_000, 200_000)}
+        else:
+            msg = {"cmd": "DISPATCH", "evt": "VOICE_SETTINGS_UPDATE", "data": random_value(rng)}
+        frames.append((rng.randrange(5), msg))
+    return frames, b"".join(pack_frame(op, msg) for op, msg in frames)
+
+
+def chunks(rng, data):
+    i = 0
+    while i < len(data):
+        n = rng.choice([1, 2, 7, 8, 9, rng.randrange(1, 4096), rng.randrange(1, 100_000)])
+        yield data[i:i + n]
+        i += n
+
+
+def drain(parser, pieces):
+    out = []
+    for piece in pieces:
+        parser.feed(piece)
+        out.extend(parser.frames())
+    return out
+
+
+def fuzz(runs, rng):
+    for run in range(runs):
+        frames, data = random_stream(rng)
+        pieces = list(chunks(rng, data))
+        reader = FrameReader()
+        got = drain(reader, pieces)
+        if got != frames or drain(LegacyParser(), pieces) != frames or len(reader):
+            print(f"FAILED: stream {run} decoded differently")
+            sys.exit(1)
+    garbage = [
+        struct.pack("<II", OP_FRAME, MAX_FRAME + 1),
+        struct.pack("<II", OP_FRAME, 4) + b"\xff\xfe{}",
+        struct.pack("<II", OP_FRAME, 5) + b"{nope",
+        pack_frame(OP_FRAME, {"ok": 1}) + struct.pack("<II", OP_FRAME, 3) + b"{]}",
+    ]
+    for data in garbage:
+        reader = FrameReader()
+        reader.feed(data)
+        try:
+            list(reader.frames())
+        except ConnectionError:
+            continue
+        print(f"FAILED: garbage {data[:16]!r} was not rejected")
+        sys.exit(1)
+    print(f"fuzz: {runs} random streams decode identically (chunks down to 1 byte);"
+          f" {len(garbage)} garbage streams rejected")
+
+
+UPDATE = {"cmd": "DISPATCH", "evt": "VOICE_SETTINGS_UPDATE", "nonce": None,
+              "data": {"input": {"volume": 100.0, "device_id": "default"},
+                       "output": {"volume": 87.5, "device_id": "default"},
+                       "mode": {"type": "VOICE_ACTIVITY", "auto_threshold": True, "threshold": -60},
+                       "automatic_gain_control": True, "echo_cancellation": True,
+                       "noise_suppression": True, "qos": False, "silence_warning": True,
+                       "deaf": False, "mute": False}}
+LARGE = {"cmd": "GET_VOICE_SETTINGS", "nonce": "n", "data": {"blob": "x" * 200_000}}
+
+
+def burst(label, msg, count, repeats):
+    data = pack_frame(OP_FRAME, msg) * count
+    print(f"burst: {count} {label} frames ({len(data) / 1024:.0f} KB) in one read")
+    for label, make in (("legacy", LegacyParser), ("FrameReader", FrameReader)):
+        best = float("inf")
+        for _ in range(repeats):
+            parser = make()
+            start = time.perf_counter()
+            parser.feed(data)
+            n = sum(1 for _ in parser.frames())
+            best = min(best, time.perf_counter() - start)
+        assert n == count
+        print(f"  {label + ':':13} {best * 1000:8.2f} ms  ({best / count * 1e6:6.2f} us/frame)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fuzz", type=int, default=300)
+    parser.add_argument("--burst", type=int, default=4000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    fuzz(args.fuzz, random.Random(args.seed))
+    for count in (args.burst // 8, args.burst):
+        burst("VOICE_SETTINGS_UPDATE", UPDATE, count, args.repeats)
+    burst("200 KB", LARGE, 100, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
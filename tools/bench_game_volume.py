@@ -0,0 +1,191 @@
+"""COM-call benchmark for Game Volume enforcement.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_game_volume.py [--apps 25] [--minutes 1]
+
+Runs _GameVolumeController.apply() on the 200ms enforcement cadence
+against the simulated session backend and counts ISimpleAudioVolume calls
+per simulated minute, for a steady state and for a minute with some dial
+turns, an app launch and a volume change made in the Windows mixer. The
+"legacy" figure is the old enforcement (GetMasterVolume + GetMute on every
+session every tick). Also checks every session ends at the shared level.
+
+A second run drives the adaptive cadence through _tick() on a simulated
+clock: enforcement ticks per minute once stable, and how long a newly
+launched app plays at the wrong level before it conforms.
+
+Finally, dial-to-volume latency with realistic COM costs: the input path
+that writes straight to the cached handles (queued to the audio worker
+thread, hand-off included) vs a full apply() on the input thread (what the
+dial used to run), and vs apply() having to re-enumerate (the old TTL lapse
+/ retry-with-force case). A fast spin of queued inputs shows how many
+writes the worker's coalescing saves.
+"""
+import argparse
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_sessions
+from src.core.audio_sim import SimulatedSessionBackend
+from src.core.audio_worker import get_audio_worker
+from src.core.game_volume import _GameVolumeController
+from tools.bench_util import FakePlugin
+
+TICK_S = 0.2
+CALL_COST_S = 0.00003     # ~30us per ISimpleAudioVolume call
+ENUMERATE_COST_S = 0.004  # ~4ms per GetAllSessions()
+COM_CALLS = ("GetMasterVolume", "SetMasterVolume", "GetMute", "SetMute")
+
+
+def com_calls(backend):
+    return sum(backend.calls[k] for k in COM_CALLS)
+
+
+def drain():
+    """Wait until every command queued on the audio worker has run."""
+    get_audio_worker().call(lambda: None)
+
+
+class FakeTimer:
+    """Plugin.timer stand-in that just records the current cadence."""
+
+    def __init__(self):
+        self.delay_ms = None
+
+    def set_interval(self, uuid, delay, callback, kind=None):
+        self.delay_ms = delay
+
+    def clear_interval(self, uuid):
+        self.delay_ms = None
+
+
+class FakeAction:
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def render(self, level, muted):
+        pass
+
+
+def cadence(backend, clock):
+    """Adaptive cadence on a simulated clock (no real sleeping)."""
+    plugin = FakePlugin(timer=FakeTimer())
+    ctl = _GameVolumeController()
+    ctl.attach(FakeAction(plugin))
+    ctl.boost()  # as if the knob was just turned
+
+    def advance(seconds, on_tick=None):
+        ticks, end = 0, clock[0] + seconds
+        while clock[0] < end:
+            clock[0] += plugin.timer.delay_ms / 1000.0
+            ctl._tick()
+            ticks += 1
+            if on_tick and on_tick():
+                break
+        return ticks
+
+    advance(30)  # settle
+    stable = advance(60)
+    launched = backend.add("justlaunched.exe", level=1.0)
+    t0 = clock[0]
+    advance(10, lambda: launched.SimpleAudioVolume.level == ctl.level / 100.0)
+    return stable, (clock[0] - t0) * 1000, plugin.timer.delay_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=25)
+    parser.add_argument("--minutes", type=float, default=1.0)
+    args = parser.parse_args()
+
+    backend = SimulatedSessionBackend()
+    backend.add("Discord.exe")
+    sessions = [backend.add(f"app{i}.exe") for i in range(args.apps)]
+    registry = audio_sessions.set_backend(backend)
+
+    ctl = _GameVolumeController()
+    registry.add_listener(ctl._on_session_event)
+    ticks = int(args.minutes * 60 / TICK_S)
+    clock = [0.0]
+
+    def run(events):
+        start = com_calls(backend)
+        for tick in range(ticks):
+            clock[0] += TICK_S
+            if tick in events:
+                events[tick]()
+                drain()
+            ctl.apply()
+        return com_calls(backend) - start
+
+    with mock.patch("src.core.game_volume.time.monotonic", lambda: clock[0]):
+        ctl.apply(force=True)  # first contact: reads + writes everything
+        steady = run({})
+        busy = run({
+            10: lambda: ctl.set_level_delta(-1),
+            11: lambda: ctl.set_level_delta(-1),
+            40: lambda: sessions.append(backend.add("newgame.exe")),
+            120: lambda: backend.external_set(sessions[3], level=1.0),
+            200: lambda: ctl.toggle_mute(),
+        })
+
+    want = (ctl.level / 100.0, ctl.muted)
+    wrong = [s.key for s in sessions if (s.SimpleAudioVolume.level, s.SimpleAudioVolume.muted) != want]
+    if wrong:
+        print(f"FAILED: {len(wrong)} sessions not at level {ctl.level} muted={ctl.muted}")
+        sys.exit(1)
+
+    with mock.patch("src.core.game_volume.time.monotonic", lambda: clock[0]):
+        stable_ticks, conform_ms, cadence_ms = cadence(backend, clock)
+
+    # notifications run on their own thread on Windows — keep them off the
+    # input path being timed here
+    registry._listeners.clear()
+    backend.call_cost_s, backend.enumerate_cost_s = CALL_COST_S, ENUMERATE_COST_S
+    ctl._latency_ms.clear()
+    for i in range(100):
+        ctl.set_level_delta(1 if i % 2 else -1)
+        drain()
+    n, p50, p95, _ = ctl.latency_report()
+
+    # a fast spin: 100 inputs queued back to back, worker coalesces them
+    worker = get_audio_worker()
+    passes, coalesced = worker.stats["commands"], worker.stats["coalesced"]
+    for i in range(100):
+        ctl.set_level_delta(1 if i % 2 else -1)
+    drain()
+    passes = worker.stats["commands"] - passes - 1  # minus drain()'s own command
+    coalesced = worker.stats["coalesced"] - coalesced
+
+    def timed(force):
+        samples = []
+        for i in range(100):
+            start = time.perf_counter()
+            ctl.level = 40 + (i % 2) * 5
+            ctl.apply(force=force)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        return sorted(samples)
+    old, enum = timed(False), timed(True)
+
+    per_min = 60 / (ticks * TICK_S)
+    legacy = 2 * len(sessions) * ticks
+    print(f"{len(sessions)} controlled sessions, {ticks} ticks per run")
+    print(f"  legacy (2 reads/session/tick): {legacy * per_min:8.0f} COM calls/min")
+    print(f"  diff-based, steady state:      {steady * per_min:8.0f} COM calls/min")
+    print(f"  diff-based, with activity:     {busy * per_min:8.0f} COM calls/min")
+    print("all sessions at the shared level")
+    print(f"adaptive cadence: {stable_ticks} enforcement ticks/min when stable (fixed 200ms: 300);"
+          f" new app conformed after {conform_ms:.0f} ms; cadence now {cadence_ms} ms")
+    print(f"dial->volume latency over {n} ticks (p50 / p95):")
+    print(f"  cached handles:            {p50:6.2f} / {p95:6.2f} ms")
+    print(f"  apply() on input:          {old[50]:6.2f} / {old[95]:6.2f} ms")
+    print(f"  apply() with enumeration:  {enum[50]:6.2f} / {enum[95]:6.2f} ms")
+    print(f"fast spin: 100 inputs -> {passes} worker write passes ({coalesced} coalesced)")
+
+
+if __name__ == "__main__":
+    main()
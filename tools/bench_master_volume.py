@@ -0,0 +1,138 @@
+"""COM-call benchmark for the shared master-volume monitor.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_master_volume.py [--keys 4] [--minutes 1]
+
+Attaches `--keys` Volume-like listeners to the default-output monitor (and
+one key to the default microphone) over the simulated device backend and
+runs the timers on a simulated clock, with mixer changes, dial turns, a
+default-device switch and the new default being unplugged along the way.
+Counts COM calls per minute with device + volume notifications and in the
+polling fallbacks, against the old per-key polling (2 reads per key every
+200ms plus a re-activation per key every second). Also checks every key
+shows its device's final state, and how stale a key is after a change.
+"""
+import argparse
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_devices, master_volume
+from src.core.audio_devices import DEFAULT_INPUT, DEFAULT_OUTPUT, RENDER, CAPTURE
+from src.core.audio_sim import SimulatedDeviceBackend
+from src.core.audio_worker import get_audio_worker
+from tools.bench_util import FakePlugin
+
+
+class SimTimer:
+    """Plugin.timer stand-in driven by a simulated clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.intervals = {}
+
+    def set_interval(self, uuid, delay, callback, kind=None):
+        self.intervals[uuid] = [delay / 1000.0, callback, self.clock[0]]
+
+    def clear_interval(self, uuid):
+        self.intervals.pop(uuid, None)
+
+    def advance(self, seconds, step=0.005):
+        end = self.clock[0] + seconds
+        while self.clock[0] < end:
+            self.clock[0] += step
+            for data in list(self.intervals.values()):
+                if self.clock[0] - data[2] >= data[0] - 1e-9:
+                    data[2] = self.clock[0]
+                    data[1]()
+
+
+class FakeKey:
+    def __init__(self, plugin, clock):
+        self.plugin = plugin
+        self.clock = clock
+        self.state = None
+        self.changed_at = None
+
+    def render(self, level, muted):
+        self.state = (level, muted)
+        self.changed_at = self.clock[0]
+
+
+def settle():
+    """Run what the change queued on the worker (notification fan-out,
+    re-activation) before the simulated clock moves on."""
+    get_audio_worker().call(lambda: None)
+
+
+def run(notifications, volume_notifications, keys, minutes):
+    clock = [0.0]
+    backend = SimulatedDeviceBackend(notifications, volume_notifications)
+    audio_devices.set_device_backend(backend)
+    output = master_volume.get_master_volume(DEFAULT_OUTPUT)
+    mic = master_volume.get_master_volume(DEFAULT_INPUT)
+    plugin = FakePlugin(timer=SimTimer(clock))
+    with mock.patch("src.core.audio_devices.time.monotonic", lambda: clock[0]):
+        fleet = [FakeKey(plugin, clock) for _ in range(keys)]
+        for key in fleet:
+            output.attach(key)
+        mic_key = FakeKey(plugin, clock)
+        mic.attach(mic_key)
+        start = sum(backend.calls.values())
+        stale = []
+        for i in range(int(minutes * 6)):  # something happens every 10s
+            t0 = clock[0]
+            if i % 3 == 0:
+                backend.external_set(level=0.2 + 0.1 * (i % 5))
+            elif i % 3 == 1:
+                output.change_level(5)
+                mic.change_level(-5)
+            else:
+                backend.external_set(muted=not backend.endpoints[backend.defaults[RENDER]].muted)
+            settle()
+            plugin.timer.advance(0.5)
+            stale.append(max(k.changed_at for k in fleet) - t0)
+            if i == 1:
+                backend.add_device("headset", RENDER, "Headset", level=0.3)
+            if i == 2:
+                backend.set_default("headset")
+            if i == 4:
+                backend.remove_device("headset")  # unplugged: back to speakers
+            settle()
+            plugin.timer.advance(9.5)
+        calls = sum(backend.calls.values()) - start
+
+    def state(flow):
+        endpoint = backend.endpoints[backend.defaults[flow]]
+        return int(round(endpoint.level * 100)), endpoint.muted
+    if any(k.state != state(RENDER) for k in fleet) or mic_key.state != state(CAPTURE):
+        print(f"FAILED: keys show {[k.state for k in fleet]} / mic {mic_key.state},"
+              f" devices are {state(RENDER)} / {state(CAPTURE)}")
+        sys.exit(1)
+    return calls / minutes, max(stale) * 1000, output.stats["activations"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=4)
+    parser.add_argument("--minutes", type=float, default=1.0)
+    args = parser.parse_args()
+
+    keys = args.keys + 1  # the mic key polled like any other in the legacy design
+    legacy = keys * (300 * 2 + 60 * 2)  # 2 reads/200ms + GetSpeakers/Activate per second
+    print(f"{args.keys} output keys + 1 mic key, one simulated minute with 6 changes,"
+          f" a device plugged in, made default and unplugged")
+    print(f"  legacy (per-key polling):  {legacy:6.0f} COM calls/min")
+    for label, flags in (("all notifications", (True, True)),
+                         ("no device notifications", (False, True)),
+                         ("no notifications at all", (False, False))):
+        calls, stale, activations = run(*flags, args.keys, args.minutes)
+        print(f"  {label + ':':26} {calls:6.0f} COM calls/min, keys stale <= {stale:3.0f} ms,"
+              f" {activations} output activations")
+    print("every key shows its device's final state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Peak meter sampling + rendering benchmark.
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_peak_meter.py [--keys 6] [--sessions 12] [--seconds 10]
+
+Runs `--keys` Peak Meter keys (half on "master", half on "game") over the
+simulated device, session and meter backends, driving the frame timer on a
+simulated clock with levels changing every frame. Compares the shared reader
+(one worker command per frame for every key) with one reader per key, in
+worker commands and meter COM calls per second, and times one frame of
+sprite-table lookups against drawing + PNG-encoding each bar. Also checks
+the bars land on the expected segments and that the hold marker falls back
+after HOLD_S.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_devices, audio_meters, audio_sessions
+from src.core.audio_meters import GAME, MASTER, FRAME_MS, HOLD_S, MeterReader, SpriteTable
+from src.core.audio_sim import SimulatedDeviceBackend, SimulatedMeterBackend, SimulatedSessionBackend
+from src.core.audio_worker import get_audio_worker
+from tools.bench_util import FakePlugin
+
+
+class SimTimer:
+    """Plugin.timer stand-in: tick() runs every interval once."""
+
+    def __init__(self):
+        self.intervals = {}
+
+    def set_interval(self, uuid, delay, callback, kind=None):
+        self.intervals[uuid] = callback
+
+    def clear_interval(self, uuid):
+        self.intervals.pop(uuid, None)
+
+    def tick(self):
+        for callback in list(self.intervals.values()):
+            callback()
+
+
+class FakeKey:
+    def __init__(self, plugin, sprites):
+        self.plugin = plugin
+        self.sprites = sprites
+        self.frame = None
+        self.images = 0
+
+    def render(self, level, hold):
+        if (level, hold) != self.frame:
+            self.frame = (level, hold)
+            self.sprites.frame(level, hold)
+            self.images += 1
+
+
+def setup(sessions):
+    devices = SimulatedDeviceBackend()
+    audio_devices.set_device_backend(devices)
+    session_backend = SimulatedSessionBackend()
+    audio_sessions.set_backend(session_backend)
+    game = [session_backend.add(f"game{i}.exe") for i in range(sessions)]
+    voice = session_backend.add("Discord.exe")
+    meters = SimulatedMeterBackend(devices)
+    return devices, game, voice, meters
+
+
+def run(shared, keys, sessions, seconds, sprites):
+    devices, game, voice, meters = setup(sessions)
+    plugin = FakePlugin(timer=SimTimer())
+    fleet = [FakeKey(plugin, sprites) for _ in range(keys)]
+    readers = []
+    for n, key in enumerate(fleet):
+        if shared and readers:
+            reader = readers[0]
+        else:
+            reader = MeterReader(meters)
+            reader.set_game_exclude(lambda: ["Discord.exe"])
+            if not shared:
+                key.plugin = FakePlugin(timer=SimTimer())  # its own frame timer, like a per-key loop
+            readers.append(reader)
+        reader.attach(key, MASTER if n % 2 == 0 else GAME)
+    timers = {id(k.plugin): k.plugin.timer for k in fleet}.values()
+    worker = get_audio_worker()
+    clock = [0.0]
+    frames = int(seconds * 1000 / FRAME_MS)
+    start_commands = worker.stats["commands"]
+    start_calls = sum(meters.calls.values())
+    with mock.patch("src.core.audio_meters.time.monotonic", lambda: clock[0]):
+        for f in range(frames):
+            clock[0] += FRAME_MS / 1000.0
+            wave = abs(math.sin(f / 7.0))
+            devices.endpoints["speakers"].peak = wave
+            for i, s in enumerate(game):
+                s.peak = wave * (i + 1) / (sessions + 1)
+            voice.peak = 1.0  # excluded: must never show on the game meter
+            for timer in timers:
+                timer.tick()
+        commands = worker.stats["commands"] - start_commands
+        calls = sum(meters.calls.values()) - start_calls
+
+        # correctness: silence with the hold marker up, then past HOLD_S
+        devices.endpoints["speakers"].peak = 1.0
+        for s in game:
+            s.peak = 1.0
+        for timer in timers:
+            timer.tick()
+        devices.endpoints["speakers"].peak = 0.0
+        for s in game:
+            s.peak = 10 ** (-30 / 20.0)  # -30 dBFS: 8 segments
+        for timer in timers:
+            timer.tick()
+        full = [k.frame for k in fleet]
+        clock[0] += HOLD_S + 3.0
+        for timer in timers:
+            timer.tick()
+        settled = [k.frame for k in fleet]
+    for reader, key in zip(readers, fleet):
+        reader.detach(key)
+    if shared:
+        for key in fleet:
+            readers[0].detach(key)
+    ok = (all(f[1] == audio_meters.SEGMENTS for f in full)
+          and all(f == ((0, 0) if n % 2 == 0 else (8, 8)) for n, f in enumerate(settled)))
+    if not ok:
+        print(f"FAILED: frames after a peak {full}, after HOLD_S {settled}")
+        sys.exit(1)
+    return commands / seconds, calls / seconds, sum(k.images for k in fleet) / seconds
+
+
+def draw_bar(level, hold, size=72):
+    """What a per-frame renderer would do: draw the bar and PNG-encode it."""
+    lit, dim = SpriteTable._strips(audio_meters.SEGMENTS, size)
+    pitch = size / audio_meters.SEGMENTS
+    img = dim.copy()
+    top = size - int(round(level * pitch))
+    img.paste(lit.crop((0, top, size, size)), (0, top))
+    if hold > level:
+        t, b = size - int(round(hold * pitch)), size - int(round((hold - 1) * pitch))
+        img.paste(lit.crop((0, t, size, b)), (0, t))
+    return SpriteTable._encode(img)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=6)
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    sprites = SpriteTable()
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"sprite table: {len(sprites)} frames built once in {build_ms:.0f} ms")
+
+    print(f"{args.keys} keys (half master, half game), {args.sessions} game sessions + Discord,"
+          f" {1000 // FRAME_MS} fps")
+    for label, shared in (("one reader per key", False), ("shared reader", True)):
+        commands, calls, images = run(shared, args.keys, args.sessions, args.seconds, sprites)
+        print(f"  {label + ':':20} {commands:6.0f} worker commands/s, {calls:6.0f} meter COM calls/s,"
+              f" {images:4.0f} images/s")
+
+    frames = [(l, min(audio_meters.SEGMENTS, l + 2)) for l in range(audio_meters.SEGMENTS)]
+    t0 = time.perf_counter()
+    for _ in range(20):
+        for level, hold in frames[:args.keys]:
+            sprites.frame(level, hold)
+    lookup_us = (time.perf_counter() - t0) / 20 * 1e6
+    t0 = time.perf_counter()
+    for _ in range(20):
+        for level, hold in frames[:args.keys]:
+            draw_bar(level, hold)
+    draw_us = (time.perf_counter() - t0) / 20 * 1e6
+    print(f"  one frame for {args.keys} keys: sprite lookup {lookup_us:8.1f} us,"
+          f" draw + encode {draw_us:8.1f} us")
+    print("bars and hold markers land on the expected segments; Discord never shows on game")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark for the per-session metadata index behind sessions_excluding().
+
+Usage (from repo root, with the venv active; runs on any OS):
+    python tools/bench_session_index.py [--sessions 60] [--ticks 1500]
+
+Runs the 200ms game-volume filter against the simulated backend and counts
+process queries (Process.name / cmdline — real syscalls on Windows) per
+tick, comparing the pre-index implementation (name() for every session
+on every call, cmdline() behind a cache cleared wholesale past 64 pids)
+with the index (metadata computed once per (pid, create_time)). Also checks
+both return the same sessions, Discord's audio-service carve-out included.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import audio_sessions
+from src.core.audio_sessions import VOICE_SPLIT_APPS, _AUDIO_SERVICE_ARG
+from src.core.audio_sim import SimulatedSessionBackend
+
+EXCLUDE = ["Discord.exe", "obs64.exe"]
+
+
+def legacy_sessions_excluding(sessions, names, cache):
+    """The filter as it was before the index (for comparison only)."""
+    excluded = {n.lower() for n in names}
+    matched = []
+    for s in sessions:
+        if s.Process:
+            basename = os.path.basename(s.Process.name()).lower()
+            if basename in excluded:
+                if basename not in VOICE_SPLIT_APPS:
+                    continue
+                proc = s.Process
+                hit = cache.get(proc.pid)
+                if not (hit and hit[0] == proc.create_time()):
+                    if len(cache) > 64:
+                        cache.clear()
+                    hit = (proc.create_time(), any(_AUDIO_SERVICE_ARG in a for a in proc.cmdline()))
+                    cache[proc.pid] = hit
+                if not hit[1]:
+                    continue
+        matched.append(s)
+    return matched
+
+
+def run(label, ticks, backend, fn):
+    before = dict(backend.calls)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        result = fn()
+    elapsed = time.perf_counter() - start
+    queries = sum(backend.calls[k] - before.get(k, 0) for k in ("Process.name", "Process.cmdline"))
+    print(f"{label:>8}: {queries / ticks:7.2f} process queries/tick  {elapsed / ticks * 1e6:8.1f} us/tick")
+    return {s.key for s in result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--ticks", type=int, default=1500)
+    args = parser.parse_args()
+
+    backend = SimulatedSessionBackend()
+    backend.add(None)                                  # system sounds
+    backend.add("Discord.exe")                         # voice: excluded
+    backend.add("Discord.exe", audio_service=True)     # media: controlled
+    backend.add("obs64.exe")
+    for i in range(args.sessions - 4):
+        backend.add(f"app{i}.exe")
+    registry = audio_sessions.set_backend(backend)
+    sessions = registry.sessions()
+
+    cache = {}
+    old = run("legacy", args.ticks, backend, lambda: legacy_sessions_excluding(sessions, EXCLUDE, cache))
+    new = run("indexed", args.ticks, backend, lambda: audio_sessions.sessions_excluding(EXCLUDE))
+    if old != new:
+        print(f"MISMATCH: legacy={len(old)} indexed={len(new)}")
+        sys.exit(1)
+    print(f"{args.sessions} sessions, {len(new)} controlled — results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Stand-ins shared by the tools/bench_*.py scripts (not runnable itself).
+
+FakePlugin replaces the StreamDock Plugin object: global settings live in
+memory and `timer` is whatever Plugin.timer stand-in the bench needs (None
+for code that never schedules). wait_for polls a condition the code under
+test flips on its own threads.
+
+The Discord benches run the real client against tools/fake_discord.py:
+
+    with serve_fake_discord() as fake, connected(DiscordRPC(FakePlugin()), stored_creds()) as rpc:
+        ...  # rpc is READY
+
+serve_fake_discord() points the IPC transport at the fake; connected() holds
+the client's connection open and, on the way out, shuts the client down for
+good so it can't reconnect to the fake during the next measurement. Discord
+modules are imported on first use: the audio benches don't need requests.
+"""
+import contextlib
+import sys
+import time
+
+STORED_TOKEN = "token"  # the access token stored_creds() holds; the fake accepts it
+
+
+class FakePlugin:
+    """Stands in for the StreamDock Plugin object; persists settings in memory."""
+
+    def __init__(self, global_settings=None, timer=None):
+        self.global_settings = dict(global_settings or {})
+        self.timer = timer
+
+    def set_global_settings(self, payload):
+        self.global_settings = payload
+
+    def get_global_settings(self):
+        pass
+
+
+def wait_for(predicate, timeout=10.0, poll_s=0.0005):
+    """Poll `predicate` until it is true; False if `timeout` seconds pass first."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(poll_s)
+    return True
+
+
+def stored_creds(**overrides):
+    """Credentials with a valid stored token: connects without AUTHORIZE."""
+    return dict({"client_id": "1", "client_secret": "s", "access_token": STORED_TOKEN,
+                 "expires_at": time.time() + 30 * 86400}, **overrides)
+
+
+@contextlib.contextmanager
+def serve_fake_discord(fake=None):
+    """Start `fake` (a new FakeDiscord by default) and serve it to every
+    client opened inside the block; stopped and unhooked on exit."""
+    from src.core import discord_ipc
+    from tools.fake_discord import FakeDiscord
+
+    fake = fake or FakeDiscord()
+    fake.tokens.add(STORED_TOKEN)
+    fake.start()
+    discord_ipc.set_transport_factory(lambda: discord_ipc.UnixSocketTransport.connect([fake.path]))
+    try:
+        yield fake
+    finally:
+        discord_ipc.set_transport_factory(None)
+        fake.stop()
+
+
+def _ignore(status):
+    pass
+
+
+@contextlib.contextmanager
+def connected(rpc, creds=None, listeners=(_ignore,), fields=None, timeout=10.0):
+    """Acquire `rpc` (after handing it `creds`, if given) and yield it once
+    READY; the bench exits if it never gets there. On exit the listeners
+    are released and the client is stopped for good."""
+    from src.core.discord_rpc import READY
+
+    if creds is not None:
+        rpc.update_credentials(creds)
+    for listener in listeners:
+        rpc.acquire(listener, fields)
+    try:
+        if not wait_for(lambda: rpc.state == READY, timeout=timeout):
+            detail = rpc.status()["detail"]
+            print(f"FAILED: {type(rpc).__name__} never reached READY"
+                  f" ({rpc.state}{': ' + detail if detail else ''})")
+            sys.exit(1)
+        yield rpc
+    finally:
+        for listener in listeners:
+            rpc.release(listener)
+        rpc._stop = True  # or the manager reconnects within RETRY_S
+        rpc._kill_connection()
+        rpc._wake.set()
@@ -9,34 +9,47 @@ http://localhost). On first run Discord shows a consent popup — approve it.
 The script authorizes, authenticates, prints the live voice settings, then
 listens for changes: move the Output Volume slider or toggle mute/deafen in
 Discord and watch the events print. Ctrl+C to quit.
+
+    python tools/discord_rpc_harness.py --fake
+
+runs the same flow offline against tools/fake_discord.py (any id/secret;
+the fake user approves at once and "changes" the volume after a few seconds).
 """
 import os
 import sys
+import threading
 import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.discord_rpc import get_discord_rpc, READY, NEEDS_CONNECT
+from tools.bench_util import FakePlugin
 
 
-class FakePlugin:
-    """Stands in for the StreamDock Plugin object; persists creds in memory."""
-    global_settings = {}
-
-    def set_global_settings(self, payload):
-        self.global_settings = payload
-
-    def get_global_settings(self):
-        pass
+def start_fake(rpc):
+    """Point rpc at a FakeDiscord + TokenStub; returns the FakeDiscord."""
+    from src.core import discord_ipc
+    from tools.fake_discord import FakeDiscord, TokenStub
+    fake = FakeDiscord().start()
+    rpc.tokens.token_url = TokenStub(fake).start().url
+    discord_ipc.set_transport_factory(lambda: discord_ipc.UnixSocketTransport.connect([fake.path]))
+    threading.Timer(5.0, fake.set_voice, kwargs={"output_volume": 42, "mute": True}).start()
+    return fake
 
 
 def main():
-    if len(sys.argv) < 3:
+    fake = "--fake" in sys.argv
+    if fake:
+        client_id, client_secret = "1", "fake-secret"
+    elif len(sys.argv) < 3:
         print(__doc__)
         sys.exit(1)
-    client_id, client_secret = sys.argv[1], sys.argv[2]
+    else:
+        client_id, client_secret = sys.argv[1], sys.argv[2]
 
     rpc = get_discord_rpc(FakePlugin())
+    if fake:
+        start_fake(rpc)
     rpc.acquire(lambda s: print(
         f"[status] {s['state']}  voice={s['voice']}"
         + (f"  detail={s['detail']}" if s['detail'] else ""), flush=True))
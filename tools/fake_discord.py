@@ -0,0 +1,433 @@
+"""Scriptable stand-in for the Discord desktop client's local RPC.
+
+Usage (from repo root, with the venv active; Linux/macOS, or WSL):
+    python tools/fake_discord.py [--latency-ms 0] [--rate-limit 5/1]
+
+Serves discord-ipc-0 on a Unix socket in a temp directory and an OAuth2 token
+endpoint on 127.0.0.1, prints both and runs until Ctrl+C. Run the plugin (or
+tools/discord_rpc_harness.py) with XDG_RUNTIME_DIR set to the printed
+directory to talk to it instead of Discord. Tools import FakeDiscord and
+TokenStub directly to script scenarios (see tools/bench_discord_rpc.py).
+
+What it speaks:
+- framing: OP_HANDSHAKE (answered with the READY dispatch, or OP_CLOSE for an
+  unknown client_id), OP_FRAME, OP_PING (sent by ping()), OP_PONG, OP_CLOSE;
+- AUTHORIZE, AUTHENTICATE, SUBSCRIBE, GET_VOICE_SETTINGS and
+  SET_VOICE_SETTINGS, with VOICE_SETTINGS_UPDATE dispatched to every
+  subscribed connection whenever the settings change (our own SETs included,
+  like Discord).
+
+What can go wrong, on demand:
+- latency_s         every reply / dispatch is delayed by this much
+- rate_limit        (count, window_s): SETs past it get an ERROR carrying
+                    retry_after, and are not applied
+- owned_by_other    SETs get "another app has control of voice settings"
+- deny_authorize    AUTHORIZE fails as if the user clicked Cancel
+- drop()            closes every connection (close_frame=True sends OP_CLOSE)
+- set_voice()       a change made in Discord's UI
+"""
+import argparse
+import collections
+import http.server
+import itertools
+import json
+import os
+import queue
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.discord_rpc import OP_CLOSE, OP_FRAME, OP_HANDSHAKE, OP_PING, OP_PONG
+
+# RPC error codes (Discord's table)
+UNKNOWN_ERROR = 1000
+INVALID_COMMAND = 4002
+INVALID_PERMISSIONS = 4006   # not authenticated / missing scope
+INVALID_TOKEN = 4009
+OAUTH2_ERROR = 5000
+# OP_CLOSE codes
+CLOSE_NORMAL = 1000
+CLOSE_INVALID_CLIENT_ID = 4000
+
+USER = {"id": "100000000000000001", "username": "fake-user", "discriminator": "0"}
+
+
+class _Connection:
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.client_id = None
+        self.authed = False
+        self.subs = set()
+        self._out = queue.Queue()
+        self.alive = True
+        threading.Thread(target=self._write_loop, daemon=True, name="fake-discord-write").start()
+        threading.Thread(target=self._read_loop, daemon=True, name="fake-discord-read").start()
+
+    def send(self, op, payload):
+        """Queue a frame; it leaves after the server's latency, in order."""
+        data = json.dumps(payload).encode("utf-8")
+        self._out.put((time.monotonic() + self.server.latency_s, struct.pack("<II", op, len(data)) + data))
+
+    def close(self, close_frame=None):
+        if close_frame is not None:
+            self.send(OP_CLOSE, close_frame)
+            self._out.put((time.monotonic() + self.server.latency_s, None))
+        else:
+            self._shutdown()
+
+    def _shutdown(self):
+        if not self.alive:
+            return
+        self.alive = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self._out.put((0, None))
+        self.server._forget(self)
+
+    def _write_loop(self):
+        while self.alive:
+            due, frame = self._out.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if frame is None:
+                self._shutdown()
+                return
+            try:
+                self.sock.sendall(frame)
+            except OSError:
+                self._shutdown()
+                return
+
+    def _read_loop(self):
+        buf = bytearray()
+        try:
+            while self.alive:
+                chunk = self.sock.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+                while len(buf) >= 8:
+                    op, length = struct.unpack_from("<II", buf)
+                    if len(buf) < 8 + length:
+                        break
+                    msg = json.loads(bytes(buf[8:8 + length]).decode("utf-8"))
+                    del buf[:8 + length]
+                    self.server._handle(self, op, msg)
+        except (OSError, ValueError):
+            pass
+        self._shutdown()
+
+
+class FakeDiscord:
+    """The IPC server. Attributes are the knobs; change them at any time."""
+
+    def __init__(self, directory=None, slot=0, client_ids=None):
+        self.directory = directory or tempfile.mkdtemp(prefix="fake-discord-")
+        self.path = os.path.join(self.directory, f"discord-ipc-{slot}")
+        self.client_ids = set(client_ids) if client_ids else None  # None = any
+        self.latency_s = 0.0
+        self.rate_limit = None          # (count, window_s) for SET_VOICE_SETTINGS
+        self.owned_by_other = False
+        self.deny_authorize = False
+        self.approve_delay_s = 0.0      # how long the "user" takes to click Authorize
+
+        self.voice = {"input": {"volume": 100.0}, "output": {"volume": 100.0},
+                      "deaf": False, "mute": False}
+        self.tokens = set()             # access tokens AUTHENTICATE accepts
+        self.codes = {}                 # AUTHORIZE code -> client_id (for TokenStub)
+        self.stats = collections.Counter()
+        self.sets = []                  # (monotonic, args) for every SET received
+        self.handshakes = []            # monotonic time of every handshake
+        self._set_times = collections.deque()
+        self._lock = threading.RLock()
+        self._connections = []
+        self._codes = itertools.count(1)
+        self._listener = None
+
+    # ------------------------------------------------------------- control
+
+    def start(self):
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.path)
+        self._listener.listen()
+        threading.Thread(target=self._accept_loop, daemon=True, name="fake-discord-accept").start()
+        return self
+
+    def stop(self):
+        listener, self._listener = self._listener, None
+        if listener:
+            try:
+                listener.shutdown(socket.SHUT_RDWR)  # wakes accept() on Linux
+            except OSError:
+                pass
+            listener.close()
+        self.drop()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def drop(self, close_frame=False):
+        """Close every connection, like Discord restarting."""
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            conn.close({"code": CLOSE_NORMAL, "message": "closed"} if close_frame else None)
+
+    def ping(self):
+        for conn in self._live():
+            conn.send(OP_PING, {"nonce": str(time.monotonic())})
+
+    def set_voice(self, **fields):
+        """A change made in Discord itself: output_volume, input_volume, deaf, mute."""
+        patch = {}
+        for name in ("output", "input"):
+            if f"{name}_volume" in fields:
+                patch[name] = {"volume": float(fields[f"{name}_volume"])}
+        for name in ("deaf", "mute"):
+            if name in fields:
+                patch[name] = bool(fields[name])
+        self._apply(patch)
+
+    @property
+    def connections(self):
+        return len(self._live())
+
+    # ------------------------------------------------------------ protocol
+
+    def _live(self):
+        with self._lock:
+            return [c for c in self._connections if c.alive]
+
+    def _forget(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+
+    def _accept_loop(self):
+        while self._listener is not None:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.stats["connects"] += 1
+                self._connections.append(_Connection(self, sock))
+
+    def _handle(self, conn, op, msg):
+        if op == OP_HANDSHAKE:
+            self.handshakes.append(time.monotonic())
+            client_id = str(msg.get("client_id"))
+            if self.client_ids is not None and client_id not in self.client_ids:
+                conn.close({"code": CLOSE_INVALID_CLIENT_ID, "message": "Invalid Client ID"})
+                return
+            conn.client_id = client_id
+            conn.send(OP_FRAME, {"cmd": "DISPATCH", "evt": "READY", "nonce": None,
+                                 "data": {"v": 1, "user": USER,
+                                          "config": {"api_endpoint": "//discord.com/api"}}})
+        elif op == OP_PING:
+            conn.send(OP_PONG, msg)
+        elif op == OP_PONG:
+            self.stats["pongs"] += 1
+        elif op == OP_CLOSE:
+            conn.close()
+        elif op == OP_FRAME:
+            cmd = msg.get("cmd")
+            self.stats[cmd] += 1
+            handler = getattr(self, f"_cmd_{str(cmd).lower()}", None)
+            if handler is None:
+                self._error(conn, msg, INVALID_COMMAND, f"Invalid command: {cmd}")
+                return
+            handler(conn, msg, msg.get("args") or {})
+
+    def _reply(self, conn, msg, data, evt=None):
+        conn.send(OP_FRAME, {"cmd": msg.get("cmd"), "evt": evt, "nonce": msg.get("nonce"), "data": data})
+
+    def _error(self, conn, msg, code, message, **extra):
+        self.stats["errors"] += 1
+        self._reply(conn, msg, dict({"code": code, "message": message}, **extra), evt="ERROR")
+
+    def _cmd_authorize(self, conn, msg, args):
+        def answer():
+            if self.deny_authorize:
+                self._error(conn, msg, OAUTH2_ERROR, "OAuth2 Error: access_denied")
+                return
+            code = f"code-{next(self._codes)}"
+            self.codes[code] = str(args.get("client_id"))
+            self._reply(conn, msg, {"code": code})
+        if self.approve_delay_s:
+            threading.Timer(self.approve_delay_s, answer).start()
+        else:
+            answer()
+
+    def _cmd_authenticate(self, conn, msg, args):
+        if args.get("access_token") not in self.tokens:
+            self._error(conn, msg, INVALID_TOKEN, "Invalid access token")
+            return
+        conn.authed = True
+        self._reply(conn, msg, {"user": USER, "scopes": ["rpc", "rpc.voice.read", "rpc.voice.write"],
+                                "application": {"id": conn.client_id}})
+
+    def _cmd_subscribe(self, conn, msg, args):
+        evt = msg.get("evt")
+        if not conn.authed:
+            self._error(conn, msg, INVALID_PERMISSIONS, "Not authenticated or invalid scope")
+            return
+        conn.subs.add(evt)
+        self._reply(conn, msg, {"evt": evt})
+
+    def _cmd_get_voice_settings(self, conn, msg, args):
+        if not conn.authed:
+            self._error(conn, msg, INVALID_PERMISSIONS, "Not authenticated or invalid scope")
+            return
+        with self._lock:
+            self._reply(conn, msg, json.loads(json.dumps(self.voice)))
+
+    def _cmd_set_voice_settings(self, conn, msg, args):
+        now = time.monotonic()
+        self.sets.append((now, args))
+        if not conn.authed:
+            self._error(conn, msg, INVALID_PERMISSIONS, "Not authenticated or invalid scope")
+            return
+        if self.owned_by_other:
+            self._error(conn, msg, UNKNOWN_ERROR, "Another application has control of voice settings")
+            return
+        if self.rate_limit:
+            count, window = self.rate_limit
+            while self._set_times and now - self._set_times[0] >= window:
+                self._set_times.popleft()
+            if len(self._set_times) >= count:
+                self.stats["rate_limited"] += 1
+                retry_after = window - (now - self._set_times[0])
+                self._error(conn, msg, UNKNOWN_ERROR, "You are being rate limited.",
+                            retry_after=round(retry_after, 3))
+                return
+            self._set_times.append(now)
+        self._apply(args, reply=(conn, msg))
+
+    def _apply(self, patch, reply=None):
+        with self._lock:
+            for key, value in patch.items():
+                if key not in self.voice:
+                    continue
+                if isinstance(value, dict):
+                    self.voice[key].update(value)
+                else:
+                    self.voice[key] = value
+            voice = json.loads(json.dumps(self.voice))
+        if reply:
+            self._reply(*reply, voice)
+        for conn in self._live():
+            if "VOICE_SETTINGS_UPDATE" in conn.subs:
+                conn.send(OP_FRAME, {"cmd": "DISPATCH", "evt": "VOICE_SETTINGS_UPDATE",
+                                     "nonce": None, "data": voice})
+
+
+class TokenStub:
+    """Local stand-in for https://discord.com/api/oauth2/token. Issues tokens
+    the FakeDiscord accepts; `fail_next` answers the next N requests with 500.
+    Speaks HTTP/1.1 keep-alive; `connections` counts the TCP connections."""
+
+    def __init__(self, discord, expires_in=604800):
+        self.discord = discord
+        self.expires_in = expires_in
+        self.latency_s = 0.0
+        self.fail_next = 0
+        self.requests = collections.Counter()
+        self.connections = 0
+        self._tokens = itertools.count(1)
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, data = stub._answer(dict(urllib.parse.parse_qsl(body.decode("utf-8"))))
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/api/oauth2/token"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True, name="token-stub").start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _answer(self, form):
+        grant = form.get("grant_type")
+        self.requests[grant] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.fail_next:
+            self.fail_next -= 1
+            return 500, {"error": "server_error"}
+        if grant == "authorization_code" and form.get("code") not in self.discord.codes:
+            return 400, {"error": "invalid_grant"}
+        if grant not in ("authorization_code", "refresh_token"):
+            return 400, {"error": "unsupported_grant_type"}
+        n = next(self._tokens)
+        token = f"access-{n}"
+        self.discord.tokens.add(token)
+        return 200, {"access_token": token, "token_type": "Bearer", "expires_in": self.expires_in,
+                     "refresh_token": f"refresh-{n}", "scope": "rpc rpc.voice.read rpc.voice.write"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", default=None, help="COUNT/SECONDS for SET_VOICE_SETTINGS")
+    parser.add_argument("--owned-by-other", action="store_true")
+    args = parser.parse_args()
+
+    discord = FakeDiscord()
+    discord.latency_s = args.latency_ms / 1000.0
+    discord.owned_by_other = args.owned_by_other
+    if args.rate_limit:
+        count, window = args.rate_limit.split("/")
+        discord.rate_limit = (int(count), float(window))
+    discord.start()
+    stub = TokenStub(discord).start()
+    print(f"IPC socket:     {discord.path}")
+    print(f"token endpoint: {stub.url}")
+    print(f"export XDG_RUNTIME_DIR={discord.directory}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"connections={discord.connections} voice={discord.voice} stats={dict(discord.stats)}",
+                  flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        discord.stop()
+
+
+if __name__ == "__main__":
+    main()